@@ -1,136 +1,92 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, and_
+from sqlalchemy import func, desc
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-import csv
-import io
-from ..core.database import get_db
-from ..models.user import User, Platform, UserPlatformAccount
+from ..core.database import get_db, SessionLocal
+from ..models.user import User
 from ..models.connection import Connection
-from ..models.analytics import NetworkAnalytics
+from ..models.analytics import NetworkAnalytics, UserNetworkStats
 from ..api.auth import get_current_admin_user
+from ..services.event_rollups import query_event_counts
+from ..services.exports import FORMATS as EXPORT_FORMATS, stream_export
+from ..services.kpi_snapshots import compute_platform_stats, get_snapshot, snapshot_headers
+from ..services.timeseries import bucket_counts, floor_bucket
+from ..services.user_search import search_filter, typeahead
 
 router = APIRouter()
 
+EXPORT_BATCH_ROWS = 1000
+
+USER_EXPORT_HEADERS = [
+    'ID', 'Username', 'Email', 'First Name', 'Last Name',
+    'Subscription Tier', 'Subscription Status', 'Is Active', 'Is Verified', 'Is Admin',
+    'Connection Count', 'Connected Platforms', 'Created At', 'Updated At'
+]
+USER_EXPORT_KEYS = [
+    'id', 'username', 'email', 'first_name', 'last_name',
+    'subscription_tier', 'subscription_status', 'is_active', 'is_verified', 'is_admin',
+    'connection_count', 'connected_platforms', 'created_at', 'updated_at'
+]
+
+def _filter_users(query, search: Optional[str], subscription_tier: Optional[str], is_active: Optional[bool]):
+    """Search and filter options shared by the user list and export"""
+    if search:
+        query = query.filter(search_filter(query.session, search))
+    
+    if subscription_tier:
+        query = query.filter(User.subscription_tier == subscription_tier)
+    
+    if is_active is not None:
+        query = query.filter(User.is_active == is_active)
+    
+    return query
+
 @router.get("/dashboard/overview",
     summary="Get admin dashboard overview",
-    description="Get high-level business metrics and KPIs for the admin dashboard"
+    description="Get high-level business metrics and KPIs for the admin dashboard. Served from a periodic snapshot; pass fresh=true to recompute."
 )
 def get_dashboard_overview(
+    response: Response,
+    fresh: bool = Query(False, description="Recompute instead of reading the latest snapshot"),
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
     """Get dashboard overview metrics"""
     
-    # Total users
-    total_users = db.query(User).count()
-    
-    # Active users (last 30 days)
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    active_users = db.query(User).filter(
-        User.updated_at >= thirty_days_ago
-    ).count()
-    
-    # New users this month
-    start_of_month = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    new_users_this_month = db.query(User).filter(
-        User.created_at >= start_of_month
-    ).count()
-    
-    # Total connections
-    total_connections = db.query(Connection).count()
-    
-    # Connections this month
-    new_connections_this_month = db.query(Connection).filter(
-        Connection.created_at >= start_of_month
-    ).count()
+    overview, as_of = get_snapshot(db, "dashboard_overview", fresh=fresh)
+    response.headers.update(snapshot_headers(as_of))
     
-    # Platform distribution
-    platform_stats = db.query(
-        Platform.name,
-        func.count(UserPlatformAccount.id).label('connected_users')
-    ).join(UserPlatformAccount).group_by(Platform.name).all()
-    
-    # User growth over last 12 months
-    user_growth = []
-    for i in range(12):
-        month_start = (datetime.utcnow().replace(day=1) - timedelta(days=30*i)).replace(hour=0, minute=0, second=0, microsecond=0)
-        month_end = month_start.replace(month=month_start.month % 12 + 1) if month_start.month < 12 else month_start.replace(year=month_start.year + 1, month=1)
-        
-        users_count = db.query(User).filter(
-            and_(User.created_at >= month_start, User.created_at < month_end)
-        ).count()
-        
-        user_growth.append({
-            "month": month_start.strftime("%Y-%m"),
-            "new_users": users_count
-        })
-    
-    user_growth.reverse()  # Show oldest to newest
-    
-    return {
-        "total_users": total_users,
-        "active_users": active_users,
-        "new_users_this_month": new_users_this_month,
-        "total_connections": total_connections,
-        "new_connections_this_month": new_connections_this_month,
-        "platform_distribution": [
-            {"platform": stat.name, "users": stat.connected_users}
-            for stat in platform_stats
-        ],
-        "user_growth": user_growth,
-        "activity_rate": round((active_users / total_users * 100) if total_users > 0 else 0, 1)
-    }
+    return {**overview, "as_of": as_of.isoformat()}
 
 @router.get("/users/analytics",
     summary="Get detailed user analytics",
     description="Get comprehensive user analytics including signup trends, engagement, and retention"
 )
 def get_user_analytics(
-    days: int = Query(30, description="Number of days to analyze"),
+    response: Response,
+    days: int = Query(30, ge=1, description="Number of days to analyze"),
+    interval: str = Query("day", pattern="^(day|week|month)$", description="Signup chart bucket size"),
+    fresh: bool = Query(False, description="Recompute distributions instead of reading the latest snapshot"),
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
     """Get detailed user analytics"""
     
+    # The last `days` calendar days, including today
     end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days)
-    
-    # Daily signups
-    daily_signups = []
-    for i in range(days):
-        day = start_date + timedelta(days=i)
-        day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day_start + timedelta(days=1)
-        
-        signups = db.query(User).filter(
-            and_(User.created_at >= day_start, User.created_at < day_end)
-        ).count()
-        
-        daily_signups.append({
-            "date": day.strftime("%Y-%m-%d"),
-            "signups": signups
-        })
-    
-    # Subscription tier distribution
-    subscription_stats = db.query(
-        User.subscription_tier,
-        func.count(User.id).label('count')
-    ).group_by(User.subscription_tier).all()
+    start_date = floor_bucket(end_date, "day") - timedelta(days=days - 1)
     
-    # User status distribution
-    status_stats = db.query(
-        User.is_active,
-        User.is_verified,
-        func.count(User.id).label('count')
-    ).group_by(User.is_active, User.is_verified).all()
+    # Signups per bucket
+    daily_signups = [
+        {"date": bucket, "signups": count}
+        for bucket, count in bucket_counts(db, User.created_at, start_date, end_date, interval=interval)
+    ]
     
-    # Average connections per user - fix SQL aggregate issue
-    total_users_with_connections = db.query(func.count(func.distinct(Connection.user_id))).scalar() or 1
-    total_connections = db.query(func.count(Connection.id)).scalar() or 0
-    avg_connections = round(total_connections / total_users_with_connections, 2) if total_users_with_connections > 0 else 0
+    # Tier, status and average-size distributions come from the snapshot
+    distributions, as_of = get_snapshot(db, "user_distributions", fresh=fresh)
+    response.headers.update(snapshot_headers(as_of))
     
     return {
         "period": {
@@ -139,19 +95,8 @@ def get_user_analytics(
             "days": days
         },
         "daily_signups": daily_signups,
-        "subscription_distribution": [
-            {"tier": stat.subscription_tier, "count": stat.count}
-            for stat in subscription_stats
-        ],
-        "user_status": [
-            {
-                "active": stat.is_active,
-                "verified": stat.is_verified,
-                "count": stat.count
-            }
-            for stat in status_stats
-        ],
-        "average_connections_per_user": avg_connections
+        **distributions,
+        "as_of": as_of.isoformat()
     }
 
 @router.get("/connections/analytics",
@@ -159,58 +104,28 @@ def get_user_analytics(
     description="Get insights about connections and network activity"
 )
 def get_connection_analytics(
-    days: int = Query(30, description="Number of days to analyze"),
+    response: Response,
+    days: int = Query(30, ge=1, description="Number of days to analyze"),
+    interval: str = Query("day", pattern="^(day|week|month)$", description="Connection chart bucket size"),
+    fresh: bool = Query(False, description="Recompute distributions instead of reading the latest snapshot"),
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
     """Get connection analytics"""
     
+    # The last `days` calendar days, including today
     end_date = datetime.utcnow()
-    start_date = end_date - timedelta(days=days)
-    
-    # Daily connections created
-    daily_connections = []
-    for i in range(days):
-        day = start_date + timedelta(days=i)
-        day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day_start + timedelta(days=1)
-        
-        connections = db.query(Connection).filter(
-            and_(Connection.created_at >= day_start, Connection.created_at < day_end)
-        ).count()
-        
-        daily_connections.append({
-            "date": day.strftime("%Y-%m-%d"),
-            "connections": connections
-        })
+    start_date = floor_bucket(end_date, "day") - timedelta(days=days - 1)
     
-    # Platform distribution of connections - handle case where no platforms exist
-    try:
-        platform_connections = db.query(
-            Platform.name,
-            func.count(Connection.id).label('count')
-        ).join(Connection).group_by(Platform.name).all()
-    except:
-        platform_connections = []
-    
-    # Top users by connections
-    try:
-        top_users = db.query(
-            User.username,
-            User.first_name,
-            User.last_name,
-            func.count(Connection.id).label('connection_count')
-        ).join(Connection).group_by(
-            User.id, User.username, User.first_name, User.last_name
-        ).order_by(desc('connection_count')).limit(10).all()
-    except:
-        top_users = []
+    # Connections created per bucket
+    daily_connections = [
+        {"date": bucket, "connections": count}
+        for bucket, count in bucket_counts(db, Connection.created_at, start_date, end_date, interval=interval)
+    ]
     
-    # Connection strength distribution
-    strength_distribution = db.query(
-        Connection.relationship_strength,
-        func.count(Connection.id).label('count')
-    ).group_by(Connection.relationship_strength).all()
+    # Platform, top-user and strength distributions come from the snapshot
+    distributions, as_of = get_snapshot(db, "connection_distributions", fresh=fresh)
+    response.headers.update(snapshot_headers(as_of))
     
     return {
         "period": {
@@ -219,22 +134,8 @@ def get_connection_analytics(
             "days": days
         },
         "daily_connections": daily_connections,
-        "platform_distribution": [
-            {"platform": stat.name, "connections": stat.count}
-            for stat in platform_connections
-        ],
-        "top_users_by_connections": [
-            {
-                "username": user.username,
-                "name": f"{user.first_name} {user.last_name}",
-                "connection_count": user.connection_count
-            }
-            for user in top_users
-        ],
-        "relationship_strength_distribution": [
-            {"strength": stat.relationship_strength, "count": stat.count}
-            for stat in strength_distribution
-        ]
+        **distributions,
+        "as_of": as_of.isoformat()
     }
 
 @router.get("/users/list",
@@ -252,42 +153,22 @@ def get_users_list(
 ):
     """Get paginated user list with filters"""
     
-    # Base query
-    query = db.query(User)
-    
-    # Apply search filter
-    if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            User.username.ilike(search_filter) |
-            User.email.ilike(search_filter) |
-            User.first_name.ilike(search_filter) |
-            User.last_name.ilike(search_filter)
-        )
-    
-    # Apply filters
-    if subscription_tier:
-        query = query.filter(User.subscription_tier == subscription_tier)
-    
-    if is_active is not None:
-        query = query.filter(User.is_active == is_active)
+    query = _filter_users(db.query(User), search, subscription_tier, is_active)
     
     # Get total count
     total_count = query.count()
     
     # Apply pagination
     offset = (page - 1) * limit
-    users = query.order_by(desc(User.created_at)).offset(offset).limit(limit).all()
+    users = query.add_columns(
+        UserNetworkStats.connection_count, UserNetworkStats.active_platform_count
+    ).outerjoin(UserNetworkStats, UserNetworkStats.user_id == User.id).order_by(
+        desc(User.created_at)
+    ).offset(offset).limit(limit).all()
     
-    # Get connection counts for each user
+    # Counters are maintained on user_network_stats by every write path
     user_data = []
-    for user in users:
-        connection_count = db.query(Connection).filter(Connection.user_id == user.id).count()
-        platform_count = db.query(UserPlatformAccount).filter(
-            UserPlatformAccount.user_id == user.id,
-            UserPlatformAccount.is_active == True
-        ).count()
-        
+    for user, connection_count, platform_count in users:
         user_data.append({
             "id": user.id,
             "username": user.username,
@@ -300,8 +181,8 @@ def get_users_list(
             "is_verified": user.is_verified,
             "created_at": user.created_at,
             "updated_at": user.updated_at,
-            "connection_count": connection_count,
-            "connected_platforms": platform_count
+            "connection_count": connection_count or 0,
+            "connected_platforms": platform_count or 0
         })
     
     return {
@@ -315,6 +196,41 @@ def get_users_list(
         }
     }
 
+@router.get("/users/search",
+    summary="Typeahead user search",
+    description="Top matches for a partial username, email or name; every word is matched as a prefix"
+)
+def search_users(
+    q: str = Query(..., min_length=1, max_length=100, description="Partial username, email or name"),
+    limit: int = Query(10, ge=1, le=10, description="Maximum matches"),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Typeahead search over users"""
+    
+    return {"query": q, "results": typeahead(db, q, limit=limit)}
+
+@router.get("/events/summary",
+    summary="Get analytics event totals",
+    description="Event counts per type and dimension over a time range, read from daily and hourly rollups where they cover the range"
+)
+def get_event_summary(
+    start: Optional[datetime] = Query(None, description="Range start (UTC), defaults to 30 days before end"),
+    end: Optional[datetime] = Query(None, description="Range end (UTC, exclusive), defaults to now"),
+    event_type: Optional[str] = Query(None, description="Only this event type"),
+    user_id: Optional[int] = Query(None, description="Only this user's events"),
+    current_admin: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Get analytics event totals for a time range"""
+    
+    end = (end or datetime.utcnow()).replace(tzinfo=None)
+    start = (start or end - timedelta(days=30)).replace(tzinfo=None)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    return query_event_counts(db, start, end, event_type=event_type, user_id=user_id)
+
 @router.get("/platforms/stats",
     summary="Get platform statistics",
     description="Get detailed statistics about platform usage and engagement"
@@ -325,42 +241,12 @@ def get_platform_stats(
 ):
     """Get platform usage statistics"""
     
-    # Platform connection stats
-    platform_stats = db.query(
-        Platform.id,
-        Platform.name,
-        func.count(UserPlatformAccount.id).label('connected_users'),
-        func.count(Connection.id).label('total_connections')
-    ).outerjoin(UserPlatformAccount).outerjoin(Connection).group_by(
-        Platform.id, Platform.name
-    ).all()
-    
-    # Recent platform connections (last 30 days)
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recent_connections = db.query(
-        Platform.name,
-        func.count(UserPlatformAccount.id).label('new_connections')
-    ).join(UserPlatformAccount).filter(
-        UserPlatformAccount.last_sync_at >= thirty_days_ago
-    ).group_by(Platform.name).all()
-    
-    recent_dict = {stat.name: stat.new_connections for stat in recent_connections}
-    
-    return {
-        "platform_overview": [
-            {
-                "platform_id": stat.id,
-                "platform_name": stat.name,
-                "connected_users": stat.connected_users,
-                "total_connections": stat.total_connections,
-                "recent_connections": recent_dict.get(stat.name, 0)
-            }
-            for stat in platform_stats
-        ],
-        "total_platforms": len(platform_stats),
-        "most_popular_platform": max(platform_stats, key=lambda x: x.connected_users).name if platform_stats else None
-    }
+    return compute_platform_stats(db)
 
+@router.get("/users/export",
+    summary="Export users list",
+    description="Stream all matching users as CSV or NDJSON, optionally gzip-compressed"
+)
 @router.get("/users/export/csv",
     summary="Export users list as CSV",
     description="Download all users data as a CSV file for analysis or backup"
@@ -369,82 +255,47 @@ def export_users_csv(
     search: Optional[str] = Query(None, description="Search by username, email, or name"),
     subscription_tier: Optional[str] = Query(None, description="Filter by subscription tier"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Output format"),
+    gzip: bool = Query(False, description="Gzip-compress the stream"),
     current_admin: User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Export users data as CSV file"""
-    
-    # Base query - same as get_users_list but without pagination
-    query = db.query(User)
-    
-    # Apply search filter
-    if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            User.username.ilike(search_filter) |
-            User.email.ilike(search_filter) |
-            User.first_name.ilike(search_filter) |
-            User.last_name.ilike(search_filter)
-        )
-    
-    # Apply filters
-    if subscription_tier:
-        query = query.filter(User.subscription_tier == subscription_tier)
-    
-    if is_active is not None:
-        query = query.filter(User.is_active == is_active)
-    
-    # Get all users (no pagination for export)
-    users = query.order_by(desc(User.created_at)).all()
-    
-    # Create CSV content
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write CSV headers
-    headers = [
-        'ID', 'Username', 'Email', 'First Name', 'Last Name',
-        'Subscription Tier', 'Subscription Status', 'Is Active', 'Is Verified', 'Is Admin',
-        'Connection Count', 'Connected Platforms', 'Created At', 'Updated At'
-    ]
-    writer.writerow(headers)
-    
-    # Write user data
-    for user in users:
-        # Get connection and platform counts for each user
-        connection_count = db.query(Connection).filter(Connection.user_id == user.id).count()
-        platform_count = db.query(UserPlatformAccount).filter(
-            UserPlatformAccount.user_id == user.id,
-            UserPlatformAccount.is_active == True
-        ).count()
-        
-        row = [
-            user.id,
-            user.username,
-            user.email,
-            user.first_name,
-            user.last_name,
-            user.subscription_tier,
-            user.subscription_status,
-            user.is_active,
-            user.is_verified,
-            user.is_admin,
-            connection_count,
-            platform_count,
-            user.created_at.isoformat() if user.created_at else '',
-            user.updated_at.isoformat() if user.updated_at else ''
-        ]
-        writer.writerow(row)
-    
-    # Create response
-    output.seek(0)
-    
-    # Generate filename with current timestamp
+    """Stream users data as a CSV or NDJSON file"""
+    
+    # Plain columns plus the maintained counters; no ORM objects, no per-user queries
+    query = _filter_users(db.query(
+        User.id,
+        User.username,
+        User.email,
+        User.first_name,
+        User.last_name,
+        User.subscription_tier,
+        User.subscription_status,
+        User.is_active,
+        User.is_verified,
+        User.is_admin,
+        func.coalesce(UserNetworkStats.connection_count, 0),
+        func.coalesce(UserNetworkStats.active_platform_count, 0),
+        User.created_at,
+        User.updated_at
+    ).outerjoin(UserNetworkStats, UserNetworkStats.user_id == User.id), search, subscription_tier, is_active)
+    query = query.order_by(desc(User.created_at))
+    
+    def rows():
+        # The request session may be closed before streaming ends, so the export reads on its own
+        export_db = SessionLocal()
+        try:
+            yield from query.with_session(export_db).yield_per(EXPORT_BATCH_ROWS)
+        finally:
+            export_db.close()
+    
+    media_type, extension = EXPORT_FORMATS[format]
     timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    filename = f"users_export_{timestamp}.csv"
+    filename = f"users_export_{timestamp}.{extension}" + (".gz" if gzip else "")
     
     return StreamingResponse(
-        io.BytesIO(output.getvalue().encode('utf-8')),
-        media_type="text/csv",
+        stream_export(rows(), USER_EXPORT_HEADERS, USER_EXPORT_KEYS, fmt=format, compress=gzip,
+                      batch_rows=EXPORT_BATCH_ROWS),
+        media_type="application/gzip" if gzip else media_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
\ No newline at end of file
+    )
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from typing import List, Dict, Any
 from ..core.database import get_db
 from ..core.security import get_current_user
-from ..models import User, NetworkAnalytics, Connection, Company
+from ..models import User, NetworkAnalytics, NetworkRecommendation, Connection, Company
+from ..services.analytics_cache import (
+    analytics_cache, get_analytics_version, bump_connections_version, make_etag, etag_matches
+)
+from ..services.network_rollups import get_growth_series
+from ..services.network_health import compute_network_metrics
+from ..services.insights import get_active_insights
+from ..services.locations import UNKNOWN_LOCATION
+from ..services.industries import classify_industry
+from ..services.events import track_event
 from datetime import datetime, timedelta
 import json
 
@@ -11,11 +21,24 @@ router = APIRouter()
 
 @router.get("/network-health")
 async def get_network_health(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get comprehensive network health analytics for the current user"""
     
+    # Unchanged analytics since the client's last fetch (same connections, data version and day) cost two lookups
+    version = get_analytics_version(db, current_user.id)
+    etag = make_etag("network-health", current_user.id, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    
+    cached = analytics_cache.get(current_user.id, "network-health", version)
+    if cached is not None:
+        return cached
+    
     # Get or create analytics record
     analytics = db.query(NetworkAnalytics).filter(
         NetworkAnalytics.user_id == current_user.id
@@ -29,11 +52,11 @@ async def get_network_health(
     connections = db.query(Connection).filter(Connection.user_id == current_user.id).all()
     
     # Calculate additional metrics
-    growth_data = calculate_growth_metrics(connections)
+    growth_data = calculate_growth_metrics(current_user.id, db)
     industry_distribution = calculate_industry_distribution(connections, db)
-    geographic_distribution = calculate_geographic_distribution(connections)
+    geographic_distribution = calculate_geographic_distribution(current_user.id, db)
     
-    return {
+    payload = {
         "healthScore": analytics.health_score,
         "diversityScore": analytics.diversity_score,
         "strengthScore": analytics.strength_score,
@@ -48,25 +71,63 @@ async def get_network_health(
         "geographicDistribution": geographic_distribution,
         "recommendations": get_network_recommendations(current_user.id, analytics)
     }
+    
+    analytics_cache.set(current_user.id, "network-health", version, payload)
+    track_event("analysis_run", current_user.id, {"analysis": "network-health"})
+    return payload
+
+@router.get("/growth")
+def get_network_growth(
+    days: int = Query(180, ge=1, le=3650, description="Number of days to chart"),
+    interval: str = Query("month", pattern="^(day|month)$", description="Bucket size: day or month"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get network growth over an arbitrary window from the daily rollups"""
+    
+    return {
+        "days": days,
+        "interval": interval,
+        "series": get_growth_series(db, current_user.id, days=days, interval=interval)
+    }
 
 @router.get("/insights")
 async def get_network_insights(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get network insights and recommendations"""
+    """Get network insights and recommendations (precomputed by scripts/generate_insights.py)"""
     
-    connections = db.query(Connection).filter(Connection.user_id == current_user.id).all()
+    return get_active_insights(db, current_user.id)
+
+@router.get("/recommendations")
+def get_stored_recommendations(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get pending recommendations generated by the daily recommendations job"""
     
-    insights = {
-        "connectionOpportunities": generate_connection_opportunities(connections, db),
-        "networkGaps": identify_network_gaps(connections, db),
-        "strengthenConnections": suggest_connection_strengthening(connections),
-        "industryExpansion": suggest_industry_expansion(connections, db),
-        "careerOpportunities": identify_career_opportunities(connections, db)
-    }
+    recommendations = db.query(NetworkRecommendation).filter(
+        NetworkRecommendation.user_id == current_user.id,
+        NetworkRecommendation.status == "pending",
+        NetworkRecommendation.expires_at > datetime.utcnow()
+    ).order_by(NetworkRecommendation.id).all()
     
-    return insights
+    return [
+        {
+            "id": rec.id,
+            "type": rec.recommendation_type,
+            "title": rec.title,
+            "description": rec.description,
+            "actionItems": rec.action_items,
+            "priority": rec.priority,
+            "potentialImpact": rec.potential_impact,
+            "difficulty": rec.difficulty,
+            "estimatedTime": rec.estimated_time,
+            "expiresAt": rec.expires_at.isoformat()
+        }
+        for rec in recommendations
+    ]
 
 @router.post("/recalculate")
 async def recalculate_network_health(
@@ -77,6 +138,11 @@ async def recalculate_network_health(
     
     analytics = await calculate_network_health(current_user.id, db)
     
+    # Scores changed, so roll the version forward like a connection write would
+    bump_connections_version(db, current_user.id)
+    db.commit()
+    track_event("analysis_run", current_user.id, {"analysis": "recalculate"})
+    
     return {
         "message": "Network health recalculated successfully",
         "healthScore": analytics.health_score,
@@ -86,99 +152,30 @@ async def recalculate_network_health(
 async def calculate_network_health(user_id: int, db: Session) -> NetworkAnalytics:
     """Calculate comprehensive network health score"""
     
-    connections = db.query(Connection).filter(Connection.user_id == user_id).all()
-    
-    if not connections:
-        # No connections - create default analytics
-        analytics = NetworkAnalytics(
-            user_id=user_id,
-            health_score=0,
-            diversity_score=0,
-            strength_score=0,
-            network_size=0,
-            industries_count=0,
-            companies_count=0,
-            senior_connections=0,
-            growth_rate=0.0
-        )
-        db.add(analytics)
-        db.commit()
-        return analytics
-    
-    # Calculate metrics
-    network_size = len(connections)
-    industries = set()
-    companies = set()
-    senior_connections = 0
-    total_strength = 0
-    
-    for conn in connections:
-        if conn.company:
-            if conn.company.industry:
-                industries.add(conn.company.industry)
-            companies.add(conn.company.name)
-        
-        # Count senior connections (titles containing senior, director, vp, etc.)
-        if conn.title and any(title in conn.title.lower() for title in 
-                             ['senior', 'director', 'vp', 'vice president', 'head', 'lead', 'manager']):
-            senior_connections += 1
-        
-        # Use relationship strength (default to 5 if not set)
-        total_strength += getattr(conn, 'relationship_strength', 5)
-    
-    # Calculate scores
-    diversity_score = min(len(industries) * 8, 100)  # Cap at 100
-    strength_score = min((total_strength / network_size) * 10, 100) if network_size > 0 else 0
-    size_score = min(network_size * 2, 100)  # 50 connections = 100 score
-    
-    # Overall health score (weighted average)
-    health_score = round((diversity_score * 0.3 + strength_score * 0.4 + size_score * 0.3))
-    
-    # Calculate growth rate (mock for now - would need historical data)
-    growth_rate = min(network_size * 0.5, 15.0)  # Cap at 15%
+    metrics = compute_network_metrics(db, [user_id])[user_id]
     
     # Update or create analytics record
     analytics = db.query(NetworkAnalytics).filter(
         NetworkAnalytics.user_id == user_id
     ).first()
     
-    if analytics:
-        analytics.health_score = health_score
-        analytics.diversity_score = round(diversity_score)
-        analytics.strength_score = round(strength_score)
-        analytics.network_size = network_size
-        analytics.industries_count = len(industries)
-        analytics.companies_count = len(companies)
-        analytics.senior_connections = senior_connections
-        analytics.growth_rate = growth_rate
-        analytics.last_calculated = datetime.utcnow()
-    else:
-        analytics = NetworkAnalytics(
-            user_id=user_id,
-            health_score=health_score,
-            diversity_score=round(diversity_score),
-            strength_score=round(strength_score),
-            network_size=network_size,
-            industries_count=len(industries),
-            companies_count=len(companies),
-            senior_connections=senior_connections,
-            growth_rate=growth_rate,
-            last_calculated=datetime.utcnow()
-        )
+    if not analytics:
+        analytics = NetworkAnalytics(user_id=user_id)
         db.add(analytics)
     
+    for field, value in metrics.items():
+        setattr(analytics, field, value)
+    analytics.last_calculated = datetime.utcnow()
+    
     db.commit()
     db.refresh(analytics)
     return analytics
 
-def calculate_growth_metrics(connections: List) -> List[Dict]:
-    """Calculate network growth over time (mock data for now)"""
+def calculate_growth_metrics(user_id: int, db: Session) -> List[Dict]:
+    """Calculate monthly network growth over the last 150 days from the daily rollups"""
     return [
-        {"month": "Jan", "connections": 15},
-        {"month": "Feb", "connections": 23},
-        {"month": "Mar", "connections": 35},
-        {"month": "Apr", "connections": 42},
-        {"month": "May", "connections": len(connections)}
+        {"month": point["month"], "connections": point["connections"]}
+        for point in get_growth_series(db, user_id, days=150, interval="month")
     ]
 
 def calculate_industry_distribution(connections: List, db: Session) -> List[Dict]:
@@ -186,8 +183,8 @@ def calculate_industry_distribution(connections: List, db: Session) -> List[Dict
     industry_count = {}
     
     for conn in connections:
-        if conn.company and conn.company.industry:
-            industry = conn.company.industry
+        if conn.connection_company:
+            industry = classify_industry(conn.connection_company)
             industry_count[industry] = industry_count.get(industry, 0) + 1
     
     return [
@@ -195,14 +192,30 @@ def calculate_industry_distribution(connections: List, db: Session) -> List[Dict
         for industry, count in sorted(industry_count.items(), key=lambda x: x[1], reverse=True)
     ]
 
-def calculate_geographic_distribution(connections: List) -> List[Dict]:
-    """Calculate geographic distribution (mock data for now)"""
+def calculate_geographic_distribution(user_id: int, db: Session, top_n: int = 5) -> List[Dict]:
+    """Calculate geographic distribution from the normalized location column"""
+    rows = db.query(
+        Connection.connection_location_normalized,
+        func.count(Connection.id).label('count')
+    ).filter(
+        Connection.user_id == user_id,
+        Connection.connection_location_normalized.isnot(None)
+    ).group_by(Connection.connection_location_normalized).order_by(func.count(Connection.id).desc()).all()
+    
+    total = sum(row.count for row in rows)
+    if not total:
+        return []
+    
+    # Keep the largest regions and fold the long tail into "Other"
+    top = [(row.connection_location_normalized, row.count) for row in rows
+           if row.connection_location_normalized != UNKNOWN_LOCATION][:top_n]
+    other = total - sum(count for _, count in top)
+    if other:
+        top.append((UNKNOWN_LOCATION, other))
+    
     return [
-        {"location": "San Francisco Bay Area", "count": 15, "percentage": 35.7},
-        {"location": "New York", "count": 8, "percentage": 19.0},
-        {"location": "Los Angeles", "count": 6, "percentage": 14.3},
-        {"location": "Seattle", "count": 4, "percentage": 9.5},
-        {"location": "Other", "count": 9, "percentage": 21.4}
+        {"location": location, "count": count, "percentage": round((count / total) * 100, 1)}
+        for location, count in top
     ]
 
 def get_network_recommendations(user_id: int, analytics: NetworkAnalytics) -> List[Dict]:
@@ -238,92 +251,3 @@ def get_network_recommendations(user_id: int, analytics: NetworkAnalytics) -> Li
             })
     
     return recommendations
-
-def generate_connection_opportunities(connections: List, db: Session) -> List[Dict]:
-    """Generate connection opportunities"""
-    return [
-        {
-            "type": "mutual_connection",
-            "title": "Connect through mutual connections",
-            "description": "5 potential connections through existing network",
-            "priority": "high"
-        },
-        {
-            "type": "industry_expansion", 
-            "title": "Expand into AI/ML industry",
-            "description": "Growing sector with high opportunity potential",
-            "priority": "medium"
-        }
-    ]
-
-def identify_network_gaps(connections: List, db: Session) -> List[Dict]:
-    """Identify gaps in network coverage"""
-    return [
-        {
-            "gap": "Senior Leadership",
-            "description": "Limited connections at C-level and VP level",
-            "impact": "high",
-            "suggestions": ["Target VPs at portfolio companies", "Attend executive networking events"]
-        },
-        {
-            "gap": "International Presence",
-            "description": "Most connections are US-based",
-            "impact": "medium", 
-            "suggestions": ["Connect with European tech hubs", "Join international professional groups"]
-        }
-    ]
-
-def suggest_connection_strengthening(connections: List) -> List[Dict]:
-    """Suggest ways to strengthen existing connections"""
-    return [
-        {
-            "connection": "Sarah Chen",
-            "lastInteraction": "3 months ago",
-            "suggestion": "Congratulate on recent promotion to VP",
-            "priority": "high"
-        },
-        {
-            "connection": "Michael Rodriguez",
-            "lastInteraction": "6 months ago", 
-            "suggestion": "Share relevant industry article about AI trends",
-            "priority": "medium"
-        }
-    ]
-
-def suggest_industry_expansion(connections: List, db: Session) -> List[Dict]:
-    """Suggest industry expansion opportunities"""
-    return [
-        {
-            "industry": "Artificial Intelligence",
-            "currentConnections": 3,
-            "targetConnections": 8,
-            "reasoning": "High growth sector with strong job market",
-            "priority": "high"
-        },
-        {
-            "industry": "FinTech",
-            "currentConnections": 1,
-            "targetConnections": 5,
-            "reasoning": "Emerging opportunities in blockchain and digital payments",
-            "priority": "medium"
-        }
-    ]
-
-def identify_career_opportunities(connections: List, db: Session) -> List[Dict]:
-    """Identify potential career opportunities through connections"""
-    return [
-        {
-            "company": "TechCorp",
-            "position": "Senior Product Manager",
-            "connections": ["Alex Thompson", "Maria Garcia"],
-            "matchScore": 92,
-            "reasoning": "Strong PM background + 2 connections at company"
-        },
-        {
-            "company": "StartupCo",
-            "position": "VP of Engineering", 
-            "connections": ["David Chen"],
-            "matchScore": 88,
-            "reasoning": "Leadership experience + connection to hiring manager"
-        }
-    ]
\ No newline at end of file
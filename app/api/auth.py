@@ -6,6 +6,7 @@ from ..core.database import get_db
 from ..core.security import verify_password, get_password_hash, create_access_token, verify_token
 from ..core.config import settings
 from ..core.security_middleware import limiter, validate_email, validate_username, validate_string_input
+from ..services.events import track_event
 from ..models.user import User
 from ..schemas.user import UserCreate, UserResponse, Token, UserLogin
 
@@ -144,6 +145,7 @@ def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestFor
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
+    track_event("login", user.id)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/login", response_model=Token,
@@ -196,6 +198,7 @@ def login(user_login: UserLogin, db: Session = Depends(get_db)):
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
+    track_event("login", user.id)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse,
@@ -6,110 +6,129 @@ import requests
 from ..core.database import get_db
 from ..models.user import User
 from ..models.connection import Connection, Company, JobOpportunity
+from ..services.company_resolver import resolve_company_id
+from ..services.connection_writes import resolve_missing_company_ids
+from ..services.industries import classify_many
+from ..services.job_catalog import company_listing, company_listings, default_careers_url
 from .auth import get_current_user
 
 router = APIRouter()
 
-# Mock industry data - in production you'd use a proper API
-INDUSTRY_MAP = {
-    "technology": ["google", "microsoft", "apple", "meta", "amazon", "netflix", "tesla", "spotify", "airbnb", "uber", "linkedin", "salesforce", "adobe", "intel", "oracle", "slack", "zoom", "dropbox", "square", "twilio", "procore", "revolut", "blueflame", "nasdaq"],
-    "finance": ["goldman sachs", "jpmorgan", "morgan stanley", "blackrock", "vanguard", "fidelity", "charles schwab", "robinhood", "stripe", "fintech", "capital", "investments", "bank", "credit", "allstate", "ivg", "ipd capital"],
-    "consulting": ["mckinsey", "deloitte", "accenture", "boston consulting", "bain", "pwc", "ey", "kpmg", "metis search", "barrett group"],
-    "healthcare": ["johnson & johnson", "pfizer", "roche", "novartis", "merck", "abbvie", "bristol myers", "gilead", "amgen", "biogen"],
-    "retail": ["walmart", "amazon", "target", "costco", "home depot", "nike", "adidas", "michael kors", "zara", "h&m"],
-    "energy": ["exxon", "chevron", "shell", "bp", "conocophillips", "total", "equinor", "schlumberger", "halliburton"],
-    "manufacturing": ["general electric", "boeing", "ford", "general motors", "tesla", "3m", "caterpillar", "honeywell", "lockheed martin"],
-    "media": ["disney", "comcast", "netflix", "warner", "viacom", "fox", "cbs", "nbc", "espn"],
-    "telecommunications": ["verizon", "at&t", "t-mobile", "sprint", "comcast", "charter", "vodafone"],
-    "transportation": ["fedex", "ups", "dhl", "uber", "lyft", "dp world", "logistics"],
-    "real_estate": ["cbre", "jones lang lasalle", "cushman", "colliers", "real estate", "realty"],
-    "recruiting": ["robert half", "randstad", "adecco", "manpower", "korn ferry", "heidrick", "russell reynolds"]
+COMPANY_SORTS = {
+    "connections": lambda stats: stats.c.connection_count,
+    "strength": lambda stats: stats.c.avg_relationship_strength,
+    "name": lambda stats: func.lower(stats.c.name),
 }
 
-def classify_industry(company_name: str) -> str:
-    """Classify company into industry based on name"""
-    if not company_name:
-        return "other"
-    
-    company_lower = company_name.lower()
-    
-    for industry, keywords in INDUSTRY_MAP.items():
-        if any(keyword in company_lower for keyword in keywords):
-            return industry
-    
-    return "other"
-
 @router.get("/analytics")
 def get_company_analytics(
     industry: Optional[str] = Query(None, description="Filter by industry"),
     min_connections: int = Query(1, description="Minimum number of connections per company"),
+    sort: str = Query("connections", pattern="^(connections|strength|name)$", description="Sort companies by"),
+    order: str = Query("desc", pattern="^(asc|desc)$", description="Sort direction"),
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(50, ge=1, le=200, description="Companies per page"),
+    sample_size: int = Query(5, ge=0, le=20, description="Sample connections per company"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get analytics about companies in user's network"""
     
-    # Get company data from connections
-    query = db.query(
-        Connection.connection_company,
+    if resolve_missing_company_ids(db, current_user.id):
+        db.commit()
+    
+    # Per-company totals, merging spelling variants by canonical company
+    stats = db.query(
+        Company.id.label('company_id'),
+        Company.name.label('name'),
+        Company.industry.label('industry'),
         func.count(Connection.id).label('connection_count'),
-        func.group_concat(Connection.connection_name).label('connection_names'),
-        func.group_concat(Connection.connection_title).label('connection_titles'),
         func.avg(Connection.relationship_strength).label('avg_relationship_strength')
-    ).filter(
-        Connection.user_id == current_user.id,
-        Connection.connection_company.isnot(None),
-        Connection.connection_company != ""
-    ).group_by(Connection.connection_company)
-    
-    # Apply minimum connections filter
-    query = query.having(func.count(Connection.id) >= min_connections)
-    
-    companies_data = query.all()
-    
-    # Process and classify companies
+    ).join(Company, Company.id == Connection.company_id).filter(
+        Connection.user_id == current_user.id
+    ).group_by(Company.id, Company.name, Company.industry).having(
+        func.count(Connection.id) >= min_connections
+    )
+    
+    # Apply industry filter if specified (industries are classified when a company is created)
+    if industry:
+        stats = stats.filter(Company.industry == industry)
+    stats = stats.subquery()
+    
+    # Industry summary and totals cover every matching company, not just this page
+    summary_rows = db.query(
+        stats.c.industry,
+        func.count(stats.c.company_id).label('company_count'),
+        func.sum(stats.c.connection_count).label('total_connections')
+    ).group_by(stats.c.industry).all()
+    industry_summary = {}
+    for row in summary_rows:
+        industry_summary[row.industry or "other"] = {
+            "company_count": row.company_count,
+            "total_connections": int(row.total_connections or 0)
+        }
+    total_companies = sum(row.company_count for row in summary_rows)
+    total_connections = sum(int(row.total_connections or 0) for row in summary_rows)
+    
+    # Apply sorting and pagination
+    sort_column = COMPANY_SORTS[sort](stats)
+    offset = (page - 1) * limit
+    companies_data = db.query(stats).order_by(
+        sort_column.desc() if order == "desc" else sort_column.asc(),
+        stats.c.company_id
+    ).offset(offset).limit(limit).all()
+    
+    # Strongest sample_size connections of each company on this page, picked in SQL
+    samples = {company_data.company_id: [] for company_data in companies_data}
+    if samples and sample_size:
+        ranked = db.query(
+            Connection.company_id,
+            Connection.connection_name,
+            Connection.connection_title,
+            func.row_number().over(
+                partition_by=Connection.company_id,
+                order_by=(Connection.relationship_strength.desc(), Connection.id)
+            ).label('sample_rank')
+        ).filter(
+            Connection.user_id == current_user.id,
+            Connection.company_id.in_(list(samples))
+        ).subquery()
+        sample_rows = db.query(ranked).filter(ranked.c.sample_rank <= sample_size).order_by(
+            ranked.c.company_id, ranked.c.sample_rank
+        ).all()
+        for row in sample_rows:
+            samples[row.company_id].append(row)
+    
+    listings = company_listings(db, samples)
+    industries_by_name = classify_many(
+        company_data.name for company_data in companies_data if not company_data.industry
+    )
     companies = []
     for company_data in companies_data:
-        company_name = company_data.connection_company
-        company_industry = classify_industry(company_name)
-        
-        # Apply industry filter if specified
-        if industry and company_industry != industry:
-            continue
-            
-        # Get sample connection names and titles
-        connection_names = company_data.connection_names.split(',')[:5] if company_data.connection_names else []
-        connection_titles = company_data.connection_titles.split(',')[:5] if company_data.connection_titles else []
-        
+        sample = samples[company_data.company_id]
         companies.append({
-            "name": company_name,
-            "industry": company_industry,
+            "company_id": company_data.company_id,
+            "name": company_data.name,
+            "industry": company_data.industry or industries_by_name[company_data.name],
             "connection_count": company_data.connection_count,
             "avg_relationship_strength": round(float(company_data.avg_relationship_strength or 0), 1),
-            "sample_connections": connection_names,
-            "sample_titles": connection_titles,
-            "has_jobs": False  # Will be populated with real job data later
+            "sample_connections": [row.connection_name for row in sample],
+            "sample_titles": [row.connection_title for row in sample if row.connection_title],
+            "has_jobs": bool(listings.get(company_data.company_id, {}).get("jobs"))
         })
     
-    # Sort by connection count descending
-    companies.sort(key=lambda x: x['connection_count'], reverse=True)
-    
-    # Get industry summary
-    industry_summary = {}
-    for company in companies:
-        industry = company['industry']
-        if industry not in industry_summary:
-            industry_summary[industry] = {
-                "company_count": 0,
-                "total_connections": 0
-            }
-        industry_summary[industry]["company_count"] += 1
-        industry_summary[industry]["total_connections"] += company['connection_count']
-    
     return {
         "companies": companies,
         "industry_summary": industry_summary,
-        "total_companies": len(companies),
-        "total_connections": sum(c['connection_count'] for c in companies)
+        "total_companies": total_companies,
+        "total_connections": total_connections,
+        "pagination": {
+            "current_page": page,
+            "total_pages": (total_companies + limit - 1) // limit,
+            "total_count": total_companies,
+            "has_next": offset + limit < total_companies,
+            "has_previous": page > 1
+        }
     }
 
 @router.get("/industries")
@@ -119,17 +138,21 @@ def get_industries(
 ):
     """Get list of industries represented in user's network"""
     
-    # Get all companies from user's connections
-    companies = db.query(distinct(Connection.connection_company)).filter(
+    if resolve_missing_company_ids(db, current_user.id):
+        db.commit()
+    
+    # Get all canonical companies from user's connections
+    company_ids = db.query(distinct(Connection.company_id)).filter(
         Connection.user_id == current_user.id,
-        Connection.connection_company.isnot(None),
-        Connection.connection_company != ""
-    ).all()
+        Connection.company_id.isnot(None)
+    )
+    companies = db.query(Company.name, Company.industry).filter(Company.id.in_(company_ids)).all()
     
     # Classify into industries
+    industries_by_name = classify_many(name for name, industry in companies if not industry)
     industry_counts = {}
-    for (company_name,) in companies:
-        industry = classify_industry(company_name)
+    for name, industry in companies:
+        industry = industry or industries_by_name[name]
         industry_counts[industry] = industry_counts.get(industry, 0) + 1
     
     # Format for frontend
@@ -150,76 +173,18 @@ def get_company_jobs(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Get job opportunities for a specific company (mock data for MVP)"""
-    
-    # Real company career page URLs
-    COMPANY_CAREER_URLS = {
-        "Google": "https://careers.google.com/jobs/results/",
-        "Microsoft": "https://careers.microsoft.com/professionals/us/en/search-results",
-        "Apple": "https://jobs.apple.com/en-us/search",
-        "Meta": "https://www.metacareers.com/jobs/",
-        "Amazon": "https://www.amazon.jobs/en/search",
-        "Netflix": "https://jobs.netflix.com/search",
-        "Tesla": "https://www.tesla.com/careers/search/",
-        "Salesforce": "https://careers.salesforce.com/en/jobs/",
-        "Adobe": "https://careers.adobe.com/us/en/search-results",
-        "LinkedIn": "https://careers.linkedin.com/jobs",
-        "Uber": "https://www.uber.com/us/en/careers/list/",
-        "Airbnb": "https://careers.airbnb.com/",
-        "Spotify": "https://www.lifeatspotify.com/jobs",
-        "Goldman Sachs": "https://www.goldmansachs.com/careers/",
-        "JPMorgan": "https://careers.jpmorgan.com/global/en/students/programs",
-        "Morgan Stanley": "https://www.morganstanley.com/careers",
-        "McKinsey": "https://www.mckinsey.com/careers",
-        "Deloitte": "https://jobs.deloitte.com/",
-        "Accenture": "https://www.accenture.com/us-en/careers/jobsearch",
-        "Robert Half": "https://www.roberthalf.com/work-with-us/our-company/careers",
-        "Revolut": "https://www.revolut.com/careers/",
-        "Procore": "https://careers.procore.com/",
-        "Nasdaq": "https://www.nasdaq.com/about/careers"
-    }
+    """Get job opportunities for a specific company from the job catalog"""
     
-    # Get the real career page URL for this company
-    career_url = COMPANY_CAREER_URLS.get(company_name, f"https://www.google.com/search?q={company_name.replace(' ', '+')}+careers")
-    
-    # For now, return mock job data with real URLs
-    mock_jobs = [
-        {
-            "id": f"{company_name.lower().replace(' ', '-')}-1",
-            "title": "Senior Software Engineer",
-            "department": "Engineering",
-            "location": "San Francisco, CA",
-            "type": "Full-time",
-            "posted_date": "2025-07-10",
-            "description": "We're looking for a senior software engineer to join our growing team...",
-            "url": career_url
-        },
-        {
-            "id": f"{company_name.lower().replace(' ', '-')}-2", 
-            "title": "Product Manager",
-            "department": "Product",
-            "location": "New York, NY",
-            "type": "Full-time",
-            "posted_date": "2025-07-08",
-            "description": "Join our product team to help shape the future of our platform...",
-            "url": career_url
-        },
-        {
-            "id": f"{company_name.lower().replace(' ', '-')}-3",
-            "title": "Business Development Representative", 
-            "department": "Sales",
-            "location": "Remote",
-            "type": "Full-time",
-            "posted_date": "2025-07-05",
-            "description": "Help us expand our customer base as a Business Development Representative...",
-            "url": career_url
-        }
-    ]
+    company_id = resolve_company_id(db, company_name, create=False)
+    listing = company_listing(db, company_id) if company_id else None
+    if not listing:
+        listing = {"name": company_name, "careers_url": default_careers_url(company_name), "jobs": []}
     
     return {
-        "company": company_name,
-        "jobs": mock_jobs,
-        "total_jobs": len(mock_jobs)
+        "company": listing["name"],
+        "careers_url": listing["careers_url"],
+        "jobs": listing["jobs"],
+        "total_jobs": len(listing["jobs"])
     }
 
 @router.get("/{company_name}/connections")
@@ -230,10 +195,17 @@ def get_company_connections(
 ):
     """Get all connections at a specific company"""
     
-    connections = db.query(Connection).filter(
-        Connection.user_id == current_user.id,
-        Connection.connection_company.ilike(f"%{company_name}%")
-    ).all()
+    if resolve_missing_company_ids(db, current_user.id):
+        db.commit()
+    
+    query = db.query(Connection).filter(Connection.user_id == current_user.id)
+    company_id = resolve_company_id(db, company_name, create=False)
+    if company_id:
+        query = query.filter(Connection.company_id == company_id)
+    else:
+        # Not a known company name; fall back to a substring match on the raw strings
+        query = query.filter(Connection.connection_company.ilike(f"%{company_name}%"))
+    connections = query.all()
     
     return {
         "company": company_name,
@@ -7,6 +7,11 @@ from ..core.database import get_db
 from ..models.user import User
 from ..models.connection import Connection
 from ..schemas.connection import ConnectionCreate, ConnectionResponse, ConnectionUpdate
+from ..services.connection_writes import (
+    prepare_connection_values, prepare_connection_rows, refresh_derived_fields, record_connection_changes
+)
+from ..services.events import track_event
+from ..services.insights import delete_connection_insights
 from .auth import get_current_user
 
 router = APIRouter()
@@ -37,11 +42,13 @@ def create_connection(
 ):
     db_connection = Connection(
         user_id=current_user.id,
-        **connection.dict()
+        **prepare_connection_values(db, connection.dict())
     )
     db.add(db_connection)
+    record_connection_changes(db, current_user.id, added=1)
     db.commit()
     db.refresh(db_connection)
+    track_event("connection_add", current_user.id, {"source": "manual", "count": 1})
     return db_connection
 
 @router.get("/{connection_id}", response_model=ConnectionResponse)
@@ -80,7 +87,9 @@ def update_connection(
     
     for field, value in connection_update.dict(exclude_unset=True).items():
         setattr(connection, field, value)
+    refresh_derived_fields(db, connection)
     
+    record_connection_changes(db, current_user.id)
     db.commit()
     db.refresh(connection)
     return connection
@@ -101,7 +110,9 @@ def delete_connection(
             detail="Connection not found"
         )
     
+    delete_connection_insights(db, [connection.id])
     db.delete(connection)
+    record_connection_changes(db, current_user.id, removed=1)
     db.commit()
     return {"message": "Connection deleted successfully"}
 
@@ -171,6 +182,7 @@ def import_connections(
                     relationship_strength=conn_data.get("relationship_strength", 3),
                     mutual_connections_count=conn_data.get("mutual_connections", 0)
                 )
+                refresh_derived_fields(db, new_connection)
                 db.add(new_connection)
                 platform_imported += 1
         
@@ -184,7 +196,11 @@ def import_connections(
         from datetime import datetime
         account.last_sync_at = datetime.utcnow()
     
+    if imported_count:
+        record_connection_changes(db, current_user.id, added=imported_count)
     db.commit()
+    if imported_count:
+        track_event("connection_add", current_user.id, {"source": "import", "count": imported_count})
     
     return {
         "message": f"Successfully imported {imported_count} connections",
@@ -297,9 +313,12 @@ def upload_csv_connections(
         
         # Bulk insert all new connections at once
         if new_connections:
-            db.bulk_insert_mappings(Connection, new_connections)
+            db.bulk_insert_mappings(Connection, prepare_connection_rows(db, new_connections))
+            record_connection_changes(db, current_user.id, added=len(new_connections))
         
         db.commit()
+        if new_connections:
+            track_event("connection_add", current_user.id, {"source": "csv", "count": len(new_connections)})
         
         return {
             "message": f"Successfully imported {imported_count} connections from CSV",
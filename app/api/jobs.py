@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..core.database import get_db
+from ..models.user import User
+from ..services.company_resolver import resolve_company_id
+from ..services.connection_writes import resolve_missing_company_ids
+from ..services.job_facets import connected_company_job_count, read_facets
+from ..services.job_search import search_jobs
+from .auth import get_current_user
+
+router = APIRouter()
+
+@router.get("/search",
+    summary="Search the job catalog",
+    description="Filter active jobs, newest first, with keyset pagination and catalog-wide facet counts"
+)
+def search_job_catalog(
+    q: Optional[str] = Query(None, description="Words to match in title, department or description"),
+    location: Optional[str] = Query(None, description="Region, as listed in the location facet"),
+    experience_level: Optional[str] = Query(None, description="Experience level"),
+    employment_type: Optional[str] = Query(None, description="Employment type, e.g. Full-time"),
+    company_id: Optional[int] = Query(None, description="Company id"),
+    company: Optional[str] = Query(None, description="Company name, matched like connection companies"),
+    has_connections: bool = Query(False, description="Only companies where you have connections"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(20, ge=1, le=100, description="Jobs per page"),
+    facets: bool = Query(True, description="Include facet counts"),
+    facet_limit: int = Query(20, ge=1, le=100, description="Values per facet"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Search jobs with filters, facets and cursor pagination"""
+    
+    if resolve_missing_company_ids(db, current_user.id):
+        db.commit()
+    
+    if company and not company_id:
+        company_id = resolve_company_id(db, company, create=False)
+        if not company_id:
+            # Unknown company: nothing can match
+            company_id = -1
+    
+    try:
+        jobs, next_cursor = search_jobs(
+            db, current_user.id,
+            query=q, location=location, experience_level=experience_level,
+            employment_type=employment_type, company_id=company_id,
+            has_connections=has_connections, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    response = {
+        "jobs": jobs,
+        "pagination": {
+            "limit": limit,
+            "next_cursor": next_cursor,
+            "has_next": next_cursor is not None
+        }
+    }
+    if facets:
+        facet_counts = read_facets(db, limit=facet_limit)
+        facet_counts["has_connections"] = [
+            {"value": "true", "count": connected_company_job_count(db, current_user.id)}
+        ]
+        response["facets"] = facet_counts
+    return response
@@ -6,6 +6,7 @@ from ..models.user import User, Platform, UserPlatformAccount
 from ..schemas.user import (
     PlatformResponse, UserPlatformAccountCreate, UserPlatformAccountResponse
 )
+from ..services.network_stats import adjust_platform_count
 from .auth import get_current_user
 
 router = APIRouter()
@@ -63,6 +64,8 @@ def connect_platform(
     )
     
     db.add(db_account)
+    if db_account.is_active:
+        adjust_platform_count(db, current_user.id, 1)
     db.commit()
     db.refresh(db_account)
     return db_account
@@ -86,6 +89,8 @@ def disconnect_platform(
         )
     
     db.delete(account)
+    if account.is_active:
+        adjust_platform_count(db, current_user.id, -1)
     db.commit()
     return {"message": "Platform disconnected successfully"}
 
@@ -1,87 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_
 from typing import List, Optional
 import os
 import uuid
 import re
 from datetime import datetime
-import PyPDF2
-import io
-from docx import Document
 
 from ..core.database import get_db
 from ..models.user import User
-from ..models.connection import Connection
+from ..models.connection import Connection, Company, JobOpportunity
 from ..models.resume import Resume, JobMatch, Skill
+from ..services.connection_writes import resolve_missing_company_ids
+from ..services.job_catalog import default_careers_url
+from ..services.job_matching import job_matcher, network_score
+from ..services.resume_cache import content_hash, extractor_version, get_cached_parse, store_parse
+from ..services.resume_parsing import (
+    ResumeParseCancelled, ResumeParseError, ResumeParserBusy, ResumeParseMemoryExceeded, ResumeParseTimeout,
+    parser_pool
+)
+from ..services.skills import extract_skills
 from .auth import get_current_user
 
 router = APIRouter()
 
-# Skills database for matching
-TECH_SKILLS = [
-    "python", "javascript", "java", "react", "node.js", "sql", "aws", "docker", "kubernetes", "git",
-    "html", "css", "typescript", "angular", "vue", "mongodb", "postgresql", "redis", "elasticsearch",
-    "machine learning", "data science", "ai", "tensorflow", "pytorch", "pandas", "numpy", "scikit-learn",
-    "fastapi", "django", "flask", "express", "spring", "laravel", "ruby on rails", "php", "c++", "c#",
-    "go", "rust", "swift", "kotlin", "flutter", "react native", "ios", "android", "unity", "unreal",
-    "azure", "gcp", "terraform", "jenkins", "ci/cd", "devops", "microservices", "apis", "graphql", "rest"
-]
-
-BUSINESS_SKILLS = [
-    "project management", "agile", "scrum", "kanban", "leadership", "team management", "communication",
-    "problem solving", "analytical thinking", "strategic planning", "budget management", "stakeholder management",
-    "product management", "marketing", "sales", "business development", "consulting", "negotiation",
-    "customer service", "account management", "relationship building", "presentation skills", "public speaking",
-    "writing", "research", "data analysis", "financial analysis", "risk management", "compliance",
-    "operations", "supply chain", "logistics", "quality assurance", "process improvement", "change management"
-]
-
-SOFT_SKILLS = [
-    "leadership", "teamwork", "communication", "problem solving", "creativity", "adaptability", "time management",
-    "critical thinking", "attention to detail", "multitasking", "collaboration", "interpersonal skills",
-    "customer focus", "results driven", "self motivated", "innovative", "reliable", "organized", "flexible",
-    "positive attitude", "work ethic", "emotional intelligence", "conflict resolution", "decision making"
-]
-
-ALL_SKILLS = TECH_SKILLS + BUSINESS_SKILLS + SOFT_SKILLS
-
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text from PDF file"""
-    try:
-        pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text
-    except Exception as e:
-        print(f"Error extracting PDF text: {e}")
-        return ""
-
-def extract_text_from_docx(file_content: bytes) -> str:
-    """Extract text from DOCX file"""
-    try:
-        doc = Document(io.BytesIO(file_content))
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text
-    except Exception as e:
-        print(f"Error extracting DOCX text: {e}")
-        return ""
-
-def extract_skills_from_text(text: str) -> List[str]:
-    """Extract skills from resume text using keyword matching"""
-    text_lower = text.lower()
-    found_skills = []
-    
-    for skill in ALL_SKILLS:
-        if skill.lower() in text_lower:
-            found_skills.append(skill)
-    
-    # Remove duplicates and return
-    return list(set(found_skills))
-
 def extract_experience_from_text(text: str) -> List[dict]:
     """Extract work experience from resume text"""
     experience = []
@@ -112,36 +54,9 @@ def extract_experience_from_text(text: str) -> List[dict]:
     
     return experience
 
-def calculate_job_match_score(resume_skills: List[str], job_description: str, network_connections: List[dict]) -> dict:
-    """Calculate how well a job matches the user's resume and network"""
-    job_desc_lower = job_description.lower()
-    
-    # Skill matching (60% of score)
-    matching_skills = []
-    for skill in resume_skills:
-        if skill.lower() in job_desc_lower:
-            matching_skills.append(skill)
-    
-    skill_score = min(len(matching_skills) * 10, 60)  # Max 60 points for skills
-    
-    # Network connection bonus (40% of score)
-    network_score = 0
-    if network_connections:
-        # Higher score for more connections and stronger relationships
-        total_strength = sum(conn.get('relationship_strength', 0) for conn in network_connections)
-        network_score = min(total_strength * 8, 40)  # Max 40 points for network
-    
-    total_score = skill_score + network_score
-    
-    return {
-        'total_score': min(total_score, 100),
-        'skill_score': skill_score,
-        'network_score': network_score,
-        'matching_skills': matching_skills
-    }
-
 @router.post("/upload")
 async def upload_resume(
+    request: Request,
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -164,15 +79,42 @@ async def upload_resume(
             detail="File size must be less than 5MB"
         )
     
-    try:
-        # Extract text from file
-        if file.content_type == 'application/pdf':
-            raw_text = extract_text_from_pdf(file_content)
-            file_type = 'pdf'
-        else:
-            raw_text = extract_text_from_docx(file_content)
-            file_type = 'docx'
+    file_type = 'pdf' if file.content_type == 'application/pdf' else 'docx'
+    file_hash = content_hash(file_content)
+    version = extractor_version(db)
+    
+    # An identical file parsed before by the same extractors is served from the cache
+    cached = get_cached_parse(db, file_hash, version)
+    if cached is not None:
+        raw_text = cached.raw_text
+        extracted_skills = cached.extracted_skills or []
+        extracted_experience = cached.extracted_experience or []
+        extraction = dict(cached.extraction or {}, cached=True)
+    else:
+        # Parse in the worker pool so the event loop keeps serving other requests
+        try:
+            extracted = await parser_pool.parse(file_content, file_type, is_disconnected=request.is_disconnected)
+        except ResumeParserBusy:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Resume processing is busy. Please try again shortly.",
+                headers={"Retry-After": "5"}
+            )
+        except ResumeParseCancelled:
+            # The client is gone; nobody reads this response
+            raise HTTPException(status_code=499, detail="Client closed request")
+        except (ResumeParseTimeout, ResumeParseMemoryExceeded) as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Could not process this file: {e}. Please upload a simpler or smaller document."
+            )
+        except ResumeParseError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error processing resume: {str(e)}"
+            )
         
+        raw_text = extracted.text
         if not raw_text or len(raw_text.strip()) < 100:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -180,8 +122,20 @@ async def upload_resume(
             )
         
         # Extract skills and experience
-        extracted_skills = extract_skills_from_text(raw_text)
+        extracted_skills = extract_skills(db, raw_text)
         extracted_experience = extract_experience_from_text(raw_text)
+        extraction = {
+            "unit": 'pages' if file_type == 'pdf' else 'paragraphs',
+            "total": extracted.chunks,
+            "read": extracted.chunks_read,
+            "truncated": extracted.truncated,
+            "elapsed_ms": round(extracted.elapsed_ms, 1)
+        }
+    
+    try:
+        if cached is None:
+            store_parse(db, file_hash, version, file_type, raw_text, extracted_skills, extracted_experience, extraction)
+            extraction = dict(extraction, cached=False)
         
         # Extract job titles and companies
         job_titles = [exp.get('title', '') for exp in extracted_experience if exp.get('title')]
@@ -198,6 +152,7 @@ async def upload_resume(
             companies=companies,
             file_size=len(file_content),
             file_type=file_type,
+            content_hash=file_hash,
             processed=True
         )
         
@@ -212,7 +167,8 @@ async def upload_resume(
             "extracted_skills": extracted_skills[:10],  # Show first 10 skills
             "experience_count": len(extracted_experience),
             "file_type": file_type,
-            "file_size": len(file_content)
+            "file_size": len(file_content),
+            "extraction": extraction
         }
         
     except Exception as e:
@@ -282,6 +238,8 @@ def get_job_matches(
     resume_id: int,
     industry: Optional[str] = Query(None, description="Filter by industry"),
     min_score: int = Query(50, description="Minimum match score"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum matches returned"),
+    sample_size: int = Query(5, ge=0, le=20, description="Network connections listed per match"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -303,131 +261,109 @@ def get_job_matches(
             detail="Resume has not been processed or no skills were extracted"
         )
     
-    # Get user's connections grouped by company
+    if resolve_missing_company_ids(db, current_user.id):
+        db.commit()
+    
+    # Get user's connections grouped by canonical company
     connections_query = db.query(
-        Connection.connection_company,
+        Company.id,
+        Company.name,
         func.count(Connection.id).label('connection_count'),
-        func.avg(Connection.relationship_strength).label('avg_strength'),
-        func.group_concat(Connection.connection_name).label('connection_names')
-    ).filter(
-        and_(
-            Connection.user_id == current_user.id,
-            Connection.connection_company.isnot(None),
-            Connection.connection_company != ""
+        func.avg(Connection.relationship_strength).label('avg_strength')
+    ).join(Company, Company.id == Connection.company_id).filter(
+        Connection.user_id == current_user.id
+    ).group_by(Company.id, Company.name).all()
+    network = {company_data.id: company_data for company_data in connections_query}
+    
+    # Score the resume against the whole catalog in one pass
+    matches, total_matches = job_matcher.index(db).match(
+        resume.extracted_skills,
+        resume.job_titles or [],
+        {company_id: network_score(data.connection_count, data.avg_strength) for company_id, data in network.items()},
+        industry=industry,
+        min_score=min_score,
+        limit=limit
+    )
+    
+    jobs = {
+        job.id: job for job in db.query(
+            JobOpportunity.id,
+            JobOpportunity.company_id,
+            JobOpportunity.title,
+            JobOpportunity.description,
+            JobOpportunity.location,
+            JobOpportunity.employment_type,
+            JobOpportunity.source_url,
+            Company.name.label('company_name'),
+            Company.careers_url
+        ).join(Company, Company.id == JobOpportunity.company_id).filter(
+            JobOpportunity.id.in_([job_id for job_id, *_ in matches]),
+            # The index may predate the last catalog change while it is rebuilt
+            JobOpportunity.is_active.is_(True),
+            or_(JobOpportunity.expires_at.is_(None), JobOpportunity.expires_at > datetime.utcnow())
         )
-    ).group_by(Connection.connection_company).all()
+    } if matches else {}
+    
+    # Strongest sample_size connections at each matched company, picked in SQL
+    samples = {job.company_id: [] for job in jobs.values() if job.company_id in network}
+    if samples and sample_size:
+        ranked = db.query(
+            Connection.company_id,
+            Connection.connection_name,
+            Connection.relationship_strength,
+            func.row_number().over(
+                partition_by=Connection.company_id,
+                order_by=(Connection.relationship_strength.desc(), Connection.id)
+            ).label('sample_rank')
+        ).filter(
+            Connection.user_id == current_user.id,
+            Connection.company_id.in_(list(samples))
+        ).subquery()
+        sample_rows = db.query(ranked).filter(ranked.c.sample_rank <= sample_size).order_by(
+            ranked.c.company_id, ranked.c.sample_rank
+        ).all()
+        for row in sample_rows:
+            samples[row.company_id].append(row)
     
-    # Generate job matches for companies in user's network
     job_matches = []
-    
-    # Real company career page URLs and job data
-    COMPANY_CAREER_URLS = {
-        "Google": "https://careers.google.com/jobs/results/",
-        "Microsoft": "https://careers.microsoft.com/professionals/us/en/search-results",
-        "Apple": "https://jobs.apple.com/en-us/search",
-        "Meta": "https://www.metacareers.com/jobs/",
-        "Amazon": "https://www.amazon.jobs/en/search",
-        "Netflix": "https://jobs.netflix.com/search",
-        "Tesla": "https://www.tesla.com/careers/search/",
-        "Salesforce": "https://careers.salesforce.com/en/jobs/",
-        "Adobe": "https://careers.adobe.com/us/en/search-results",
-        "LinkedIn": "https://careers.linkedin.com/jobs",
-        "Uber": "https://www.uber.com/us/en/careers/list/",
-        "Airbnb": "https://careers.airbnb.com/",
-        "Spotify": "https://www.lifeatspotify.com/jobs",
-        "Goldman Sachs": "https://www.goldmansachs.com/careers/",
-        "JPMorgan": "https://careers.jpmorgan.com/global/en/students/programs",
-        "Morgan Stanley": "https://www.morganstanley.com/careers",
-        "McKinsey": "https://www.mckinsey.com/careers",
-        "Deloitte": "https://jobs.deloitte.com/",
-        "Accenture": "https://www.accenture.com/us-en/careers/jobsearch",
-        "Robert Half": "https://www.roberthalf.com/work-with-us/our-company/careers",
-        "Revolut": "https://www.revolut.com/careers/",
-        "Procore": "https://careers.procore.com/",
-        "Nasdaq": "https://www.nasdaq.com/about/careers"
-    }
-
-    # Mock job data with realistic job descriptions
-    mock_jobs_by_company = {
-        "Google": [
-            {"title": "Senior Software Engineer", "description": "Python, JavaScript, machine learning, data science, cloud computing, microservices, distributed systems", "location": "Mountain View, CA", "type": "Full-time"},
-            {"title": "Product Manager", "description": "Product management, agile, stakeholder management, data analysis, user research, strategic thinking", "location": "San Francisco, CA", "type": "Full-time"},
-            {"title": "Data Scientist", "description": "Python, machine learning, tensorflow, pandas, sql, statistics, data visualization, A/B testing", "location": "New York, NY", "type": "Full-time"}
-        ],
-        "Microsoft": [
-            {"title": "Cloud Solution Architect", "description": "Azure, cloud computing, devops, kubernetes, docker, microservices, leadership, customer success", "location": "Seattle, WA", "type": "Full-time"},
-            {"title": "Software Development Engineer", "description": "C#, .NET, Azure, sql server, agile, teamwork, problem solving, scalable systems", "location": "Redmond, WA", "type": "Full-time"}
-        ],
-        "Apple": [
-            {"title": "iOS Developer", "description": "Swift, iOS development, mobile apps, user experience, agile, teamwork, performance optimization", "location": "Cupertino, CA", "type": "Full-time"},
-            {"title": "Product Designer", "description": "UI/UX design, user research, prototyping, creativity, collaboration, design systems", "location": "Cupertino, CA", "type": "Full-time"}
-        ],
-        "Goldman Sachs": [
-            {"title": "Investment Banking Analyst", "description": "Financial analysis, modeling, client management, teamwork, analytical thinking, presentation skills", "location": "New York, NY", "type": "Full-time"},
-            {"title": "Technology Analyst", "description": "Python, Java, financial systems, data analysis, problem solving, agile development", "location": "New York, NY", "type": "Full-time"}
-        ],
-        "Revolut": [
-            {"title": "Backend Developer", "description": "Python, Java, microservices, AWS, database design, API development, fintech experience", "location": "London, UK", "type": "Full-time"},
-            {"title": "Product Manager", "description": "Product management, fintech, user research, data analysis, agile, stakeholder management", "location": "New York, NY", "type": "Full-time"}
-        ]
-    }
-    
-    for company_data in connections_query:
-        company_name = company_data.connection_company
-        
-        # Get connection details for this company
-        network_connections = []
-        if company_data.connection_names:
-            connection_names = company_data.connection_names.split(',')
-            for name in connection_names:
-                network_connections.append({
-                    'name': name.strip(),
-                    'relationship_strength': company_data.avg_strength or 3
-                })
+    for job_id, total_score, skill_score, score_from_network, matching_skills in matches:
+        job = jobs.get(job_id)
+        if job is None:
+            continue  # deactivated or expired since the match index was built
         
-        # Get jobs for this company (using mock data)
-        company_jobs = mock_jobs_by_company.get(company_name, [
-            {"title": f"Open Position at {company_name}", "description": "Great opportunity to join our team with your skills and experience", "location": "Various", "type": "Full-time"}
-        ])
-        
-        # Get the real career page URL for this company
-        career_url = COMPANY_CAREER_URLS.get(company_name, f"https://www.google.com/search?q={company_name.replace(' ', '+')}+careers")
+        company_data = network.get(job.company_id)
+        network_connections = [
+            {
+                'name': row.connection_name,
+                'relationship_strength': row.relationship_strength or 3
+            }
+            for row in samples.get(job.company_id, [])
+        ]
         
-        for job in company_jobs:
-            # Calculate match score
-            match_data = calculate_job_match_score(
-                resume.extracted_skills,
-                job['description'],
-                network_connections
-            )
-            
-            if match_data['total_score'] >= min_score:
-                job_matches.append({
-                    "company_name": company_name,
-                    "job_title": job['title'],
-                    "job_description": job['description'],
-                    "job_location": job['location'],
-                    "job_type": job['type'],
-                    "job_url": career_url,
-                    "match_score": match_data['total_score'],
-                    "skill_score": match_data['skill_score'],
-                    "network_score": match_data['network_score'],
-                    "matching_skills": match_data['matching_skills'],
-                    "network_connections": network_connections,
-                    "connection_count": len(network_connections)
-                })
-    
-    # Sort by match score descending
-    job_matches.sort(key=lambda x: x['match_score'], reverse=True)
+        job_matches.append({
+            "company_name": job.company_name,
+            "job_title": job.title,
+            "job_description": job.description,
+            "job_location": job.location,
+            "job_type": job.employment_type,
+            "job_url": job.source_url or job.careers_url or default_careers_url(job.company_name),
+            "match_score": round(total_score, 1),
+            "skill_score": round(skill_score, 1),
+            "network_score": round(score_from_network, 1),
+            "matching_skills": matching_skills,
+            "network_connections": network_connections,
+            "connection_count": company_data.connection_count if company_data is not None else 0
+        })
     
     return {
         "resume_id": resume_id,
         "job_matches": job_matches,
-        "total_matches": len(job_matches),
+        "total_matches": total_matches,
         "resume_skills": resume.extracted_skills,
         "filters_applied": {
             "industry": industry,
-            "min_score": min_score
+            "min_score": min_score,
+            "limit": limit
         }
     }
 
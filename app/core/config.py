@@ -28,6 +28,43 @@ class Settings(BaseSettings):
         return [origin.strip() for origin in self.allowed_origins.split(",")]
     environment: str = Field(default="development", env="ENVIRONMENT")
     
+    # Caching
+    redis_url: Optional[str] = Field(default=None, env="REDIS_URL")  # enables the shared cache tier
+    analytics_cache_size: int = 1024  # users kept in the in-process LRU
+    analytics_cache_ttl_seconds: int = 3600
+    
+    # Batch-computed analytics
+    insights_ttl_hours: int = 48
+    
+    # Analytics event ingestion
+    events_enabled: bool = Field(default=True, env="EVENTS_ENABLED")
+    events_buffer_size: int = 10000  # events held in memory before dropping
+    events_flush_batch: int = 500  # flush early once this many are waiting
+    events_flush_interval_ms: int = 1000
+    events_busy_sample_rate: float = 0.1  # fraction kept once the buffer is 80% full
+    events_raw_retention_days: int = 30  # raw events older than this are purged once rolled up
+    events_hourly_retention_days: int = 90  # daily rollups are kept indefinitely
+    
+    # Admin KPI snapshots
+    kpi_snapshot_refresh_seconds: int = 300  # refresh interval of scripts/refresh_kpi_snapshots.py --loop
+    kpi_snapshot_max_age_seconds: int = 900  # older snapshots are flagged stale
+    
+    # Job catalog
+    job_catalog_cache_size: int = 4096  # company listings kept in the in-process LRU
+    job_feed_concurrency: int = 32  # feeds fetched at once across all hosts
+    job_feed_host_connections: int = 4  # connection pool size per feed host
+    job_feed_host_rate: float = 2.0  # requests per second per feed host
+    job_feed_timeout_seconds: float = 20.0
+    
+    # Resume parsing
+    resume_parse_workers: int = 2  # parser processes per app process
+    resume_parse_queue: int = 4  # uploads that may wait for a free parser before 503s
+    resume_parse_timeout_seconds: float = 10.0
+    resume_parse_memory_mb: int = 512  # address space a parser may grow by
+    resume_parse_tasks_per_child: int = 100  # parses before a worker is replaced
+    resume_max_pages: int = 10  # PDF pages read; later pages are skipped
+    resume_max_chars: int = 100000  # extracted text is cut here
+    
     class Config:
         env_file = ".env"
         extra = "ignore"  # Allow extra fields in .env without validation errors
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
@@ -16,4 +16,100 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def add_missing_columns(bind=engine):
+    """Add nullable columns and indexes that create_all skips on tables that already exist"""
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+        with bind.begin() as conn:
+            for column in table.columns:
+                if column.name not in existing_columns and column.nullable:
+                    column_type = column.type.compile(dialect=bind.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+def bulk_upsert(db, model, rows, key_columns, batch_size=500):
+    """Insert rows, updating the non-key columns of rows whose key already exists"""
+    if not rows:
+        return
+    update_columns = [name for name in rows[0] if name not in key_columns]
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        for row in rows:
+            updated = db.query(model).filter(
+                *[getattr(model, key) == row[key] for key in key_columns]
+            ).update({name: row[name] for name in update_columns}, synchronize_session=False)
+            if not updated:
+                db.add(model(**row))
+        return
+
+    # One statement executed over each batch of parameter sets, so it compiles once
+    stmt = insert(model.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={name: stmt.excluded[name] for name in update_columns}
+    )
+    for start in range(0, len(rows), batch_size):
+        db.execute(stmt, rows[start:start + batch_size])
+
+def insert_or_increment(db, model, row, key_columns, increments):
+    """Insert a row, or add ``increments`` to the columns of the row whose key already exists
+
+    Unlike a query-then-insert, two transactions creating the same key both succeed.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        updated = db.query(model).filter(
+            *[getattr(model, key) == row[key] for key in key_columns]
+        ).update(
+            {getattr(model, name): getattr(model, name) + delta for name, delta in increments.items()},
+            synchronize_session=False
+        )
+        if not updated:
+            db.add(model(**row))
+            db.flush()
+        return
+
+    table = model.__table__
+    stmt = insert(table).values(**row).on_conflict_do_update(
+        index_elements=key_columns,
+        set_={name: table.c[name] + delta for name, delta in increments.items()}
+    )
+    db.execute(stmt)
+
+def bulk_insert_ignore(db, model, rows, key_columns, batch_size=500):
+    """Insert rows, skipping any whose key already exists"""
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        for row in rows:
+            exists = db.query(model).filter(
+                *[getattr(model, key) == row[key] for key in key_columns]
+            ).first()
+            if not exists:
+                db.add(model(**row))
+        db.flush()
+        return
+
+    stmt = insert(model.__table__).on_conflict_do_nothing(index_elements=key_columns)
+    for start in range(0, len(rows), batch_size):
+        db.execute(stmt, rows[start:start + batch_size])
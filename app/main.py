@@ -1,14 +1,27 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .core.config import settings
-from .core.database import engine, Base
+from .core.database import engine, Base, SessionLocal, add_missing_columns
 from .core.security_middleware import limiter, custom_rate_limit_handler
+from .services.company_resolver import register_company_aliases
+from .services.events import EventContextMiddleware, event_buffer
+from .services.job_search import ensure_job_search_index
+from .services.resume_parsing import parser_pool
+from .services.user_search import ensure_search_index
 from slowapi.errors import RateLimitExceeded
-from .api import auth, users, platforms, connections, companies, resumes, analytics, referrals, payments, admin
+from .api import auth, users, platforms, connections, companies, jobs, resumes, analytics, referrals, payments, admin
 from .models import *
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+add_missing_columns(engine)
+ensure_search_index(engine)
+ensure_job_search_index(engine)
+
+# Companies that predate the alias table claim their own names, so connections resolved on read find them
+with SessionLocal() as db:
+    register_company_aliases(db, only_missing=True)
+    db.commit()
 
 # Create FastAPI app
 app = FastAPI(
@@ -71,12 +84,32 @@ app.add_middleware(
     allow_headers=["Authorization", "Content-Type"],
 )
 
+# Request metadata for buffered analytics events
+app.add_middleware(EventContextMiddleware)
+
+@app.on_event("startup")
+def start_event_flusher():
+    event_buffer.start()
+
+@app.on_event("shutdown")
+def stop_event_flusher():
+    event_buffer.stop()
+
+@app.on_event("startup")
+def start_resume_parsers():
+    parser_pool.start()
+
+@app.on_event("shutdown")
+def stop_resume_parsers():
+    parser_pool.shutdown()
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["authentication"])
 app.include_router(users.router, prefix="/users", tags=["users"])
 app.include_router(platforms.router, prefix="/platforms", tags=["platforms"])
 app.include_router(connections.router, prefix="/connections", tags=["connections"])
 app.include_router(companies.router, prefix="/companies", tags=["companies"])
+app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
 app.include_router(resumes.router, prefix="/resumes", tags=["resumes"])
 app.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
 app.include_router(referrals.router, prefix="/referrals", tags=["referrals"])
@@ -1,8 +1,8 @@
 from .user import User, Platform, UserPlatformAccount
-from .connection import Connection, Company, JobOpportunity, ConnectionJobMatch
+from .connection import Connection, Company, CompanyAlias, JobOpportunity, JobCatalogState, JobFacetCount, JobFeed, ConnectionJobMatch
 from .subscription import Subscription, PaymentHistory
 from .referral import Referral, ReferralReward, ReferralStats
-from .analytics import NetworkAnalytics, ConnectionInsight, NetworkRecommendation, DiscoveryProfile, AnalyticsEvent
+from .analytics import NetworkAnalytics, UserNetworkStats, AnalyticsDataState, ConnectionDailyRollup, ConnectionInsight, NetworkRecommendation, DiscoveryProfile, AnalyticsEvent, EventHourlyRollup, EventDailyRollup, AdminKpiSnapshot
 
 __all__ = [
     "User",
@@ -10,7 +10,11 @@ __all__ = [
     "UserPlatformAccount",
     "Connection",
     "Company",
+    "CompanyAlias",
     "JobOpportunity",
+    "JobCatalogState",
+    "JobFacetCount",
+    "JobFeed",
     "ConnectionJobMatch",
     "Subscription",
     "PaymentHistory",
@@ -18,8 +22,14 @@ __all__ = [
     "ReferralReward", 
     "ReferralStats",
     "NetworkAnalytics",
+    "UserNetworkStats",
+    "AnalyticsDataState",
+    "ConnectionDailyRollup",
     "ConnectionInsight",
     "NetworkRecommendation",
     "DiscoveryProfile",
-    "AnalyticsEvent"
+    "AnalyticsEvent",
+    "EventHourlyRollup",
+    "EventDailyRollup",
+    "AdminKpiSnapshot"
 ]
\ No newline at end of file
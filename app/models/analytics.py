@@ -1,9 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, JSON
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Text, JSON, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
-
-Base = declarative_base()
+from ..core.database import Base
 
 class NetworkAnalytics(Base):
     __tablename__ = "network_analytics"
@@ -24,20 +22,51 @@ class NetworkAnalytics(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
-    user = relationship("User", back_populates="network_analytics")
+    user = relationship("User")
+
+class UserNetworkStats(Base):
+    __tablename__ = "user_network_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    connections_version = Column(Integer, default=0, nullable=False)  # bumped on every connection write
+    connection_count = Column(Integer, default=0)  # NULL until reconciled for rows that predate the counter
+    active_platform_count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class AnalyticsDataState(Base):
+    __tablename__ = "analytics_data_state"
+
+    id = Column(Integer, primary_key=True)  # a single row, id 1
+    version = Column(Integer, nullable=False, default=0)  # bumped by backfills that change every user's analytics
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ConnectionDailyRollup(Base):
+    __tablename__ = "connection_daily_rollups"
+    __table_args__ = (UniqueConstraint("user_id", "day", name="uq_connection_daily_rollups_user_day"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    added = Column(Integer, default=0, nullable=False)
+    removed = Column(Integer, default=0, nullable=False)
+    cumulative = Column(Integer, default=0, nullable=False)  # network size at end of day
 
 class ConnectionInsight(Base):
     __tablename__ = "connection_insights"
+    __table_args__ = (
+        Index("ix_connection_insights_user_status_expires", "user_id", "status", "expires_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    connection_id = Column(Integer, ForeignKey("connections.id"), nullable=False)
-    insight_type = Column(String(50), nullable=False)  # mutual_connections, career_path, company_move
+    connection_id = Column(Integer, ForeignKey("connections.id", ondelete="CASCADE"), nullable=True)  # null for network-wide insights
+    insight_type = Column(String(50), nullable=False)  # connection_opportunity, network_gap, strengthen_connection, industry_expansion, career_opportunity
     insight_data = Column(JSON, nullable=True)  # Store structured insight data
     confidence_score = Column(Float, default=0.0)  # 0-1
     is_actionable = Column(Boolean, default=False)
     priority = Column(String(20), default="medium")  # low, medium, high
     status = Column(String(20), default="active")  # active, dismissed, acted_upon
+    expires_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -94,6 +123,7 @@ class DiscoveryProfile(Base):
 
 class AnalyticsEvent(Base):
     __tablename__ = "analytics_events"
+    __table_args__ = (Index("ix_analytics_events_created_at", "created_at"),)
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -105,4 +135,42 @@ class AnalyticsEvent(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+class EventHourlyRollup(Base):
+    __tablename__ = "analytics_event_hourly"
+    __table_args__ = (
+        UniqueConstraint("bucket", "event_type", "user_id", "dimension", name="uq_analytics_event_hourly_key"),
+        Index("ix_analytics_event_hourly_type_bucket", "event_type", "bucket"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    bucket = Column(DateTime, nullable=False)  # start of the hour (UTC)
+    event_type = Column(String(50), nullable=False)
+    user_id = Column(Integer, nullable=False, default=0)  # 0 for anonymous events
+    dimension = Column(String(100), nullable=False, default="")  # see services.event_rollups.ROLLUP_DIMENSIONS
+    event_count = Column(Integer, default=0, nullable=False)
+    value_total = Column(Integer, default=0, nullable=False)  # sum of event_data["count"], 1 per event otherwise
+
+class EventDailyRollup(Base):
+    __tablename__ = "analytics_event_daily"
+    __table_args__ = (
+        UniqueConstraint("day", "event_type", "user_id", "dimension", name="uq_analytics_event_daily_key"),
+        Index("ix_analytics_event_daily_type_day", "event_type", "day"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    event_type = Column(String(50), nullable=False)
+    user_id = Column(Integer, nullable=False, default=0)
+    dimension = Column(String(100), nullable=False, default="")
+    event_count = Column(Integer, default=0, nullable=False)
+    value_total = Column(Integer, default=0, nullable=False)
+
+class AdminKpiSnapshot(Base):
+    __tablename__ = "admin_kpi_snapshots"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), nullable=False, unique=True)  # dashboard_overview, user_distributions, connection_distributions
+    payload = Column(JSON, nullable=False)
+    computed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
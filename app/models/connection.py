@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
@@ -6,6 +6,12 @@ from ..core.database import Base
 
 class Connection(Base):
     __tablename__ = "connections"
+    __table_args__ = (
+        Index("ix_connections_user_location", "user_id", "connection_location_normalized"),
+        Index("ix_connections_platform", "platform_id"),
+        Index("ix_connections_user_company", "user_id", "company_id"),
+        Index("ix_connections_company", "company_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -14,7 +20,9 @@ class Connection(Base):
     connection_profile_url = Column(String)
     connection_title = Column(String)
     connection_company = Column(String)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=True)  # canonical company, set at write time
     connection_location = Column(String)
+    connection_location_normalized = Column(String)  # canonical region, set at write time
     relationship_strength = Column(Integer, default=1)  # 1-5 scale
     mutual_connections_count = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -24,6 +32,7 @@ class Connection(Base):
     user = relationship("User", back_populates="connections")
     platform = relationship("Platform", back_populates="connections")
     job_matches = relationship("ConnectionJobMatch", back_populates="connection")
+    company = relationship("Company")
 
 
 class Company(Base):
@@ -35,32 +44,96 @@ class Company(Base):
     size = Column(String)
     location = Column(String)
     website = Column(String)
+    careers_url = Column(String)
     linkedin_url = Column(String)
     
     # Relationships - Re-enabled for full functionality
     job_opportunities = relationship("JobOpportunity", back_populates="company")
+    aliases = relationship("CompanyAlias", back_populates="company")
+
+
+class CompanyAlias(Base):
+    __tablename__ = "company_aliases"
+
+    id = Column(Integer, primary_key=True, index=True)
+    alias = Column(String, unique=True, nullable=False)  # normalized key, see services/company_resolver.py
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+
+    company = relationship("Company", back_populates="aliases")
 
 
 class JobOpportunity(Base):
     __tablename__ = "job_opportunities"
+    __table_args__ = (
+        Index("ix_job_opportunities_company_external", "company_id", "external_id", unique=True),
+        Index("ix_job_opportunities_company_posted", "company_id", "is_active", "posted_at"),
+        Index("ix_job_opportunities_active_posted", "is_active", "posted_at"),
+        Index("ix_job_opportunities_active_expires", "is_active", "expires_at"),
+        Index("ix_job_opportunities_location_posted", "location_normalized", "posted_at"),
+        Index("ix_job_opportunities_level_posted", "experience_level", "posted_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    external_id = Column(String)  # the feed's id for the job, unique per company
     title = Column(String, nullable=False)
+    department = Column(String)
+    employment_type = Column(String)
     description = Column(String)
     location = Column(String)
+    location_normalized = Column(String)  # canonical region, set at load time
     salary_range = Column(String)
     experience_level = Column(String)
     posted_at = Column(DateTime(timezone=True))
     expires_at = Column(DateTime(timezone=True))
     source_url = Column(String)
+    feed_id = Column(Integer, ForeignKey("job_feeds.id"))  # feed that last wrote the job, NULL for file loads
     is_active = Column(Boolean, default=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships - Re-enabled for full functionality
     company = relationship("Company", back_populates="job_opportunities")
     connection_matches = relationship("ConnectionJobMatch", back_populates="job_opportunity")
 
 
+class JobCatalogState(Base):
+    __tablename__ = "job_catalog_state"
+
+    id = Column(Integer, primary_key=True)  # a single row, id 1
+    version = Column(Integer, nullable=False, default=0)  # bumped by every catalog load
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class JobFacetCount(Base):
+    __tablename__ = "job_facet_counts"
+    __table_args__ = (
+        Index("ix_job_facet_counts_facet_value", "facet", "value", unique=True),
+        Index("ix_job_facet_counts_facet_count", "facet", "job_count"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    facet = Column(String, nullable=False)  # see services/job_facets.py
+    value = Column(String, nullable=False)
+    job_count = Column(Integer, nullable=False, default=0)  # active jobs, adjusted by every catalog load
+
+
+class JobFeed(Base):
+    __tablename__ = "job_feeds"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, nullable=False)
+    format = Column(String, nullable=False, default="json")  # json or csv, see services/job_catalog.py
+    is_active = Column(Boolean, default=True)
+    # Validators from the last successful fetch, sent back so an unchanged feed answers 304
+    etag = Column(String)
+    last_modified = Column(String)
+    content_hash = Column(String)  # sha256 of the last applied body, for servers without validators
+    last_fetched_at = Column(DateTime(timezone=True))
+    last_changed_at = Column(DateTime(timezone=True))
+    last_status = Column(Integer)
+    last_error = Column(String)
+
+
 class ConnectionJobMatch(Base):
     __tablename__ = "connection_job_matches"
     
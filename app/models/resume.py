@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.database import Base
@@ -23,6 +23,7 @@ class Resume(Base):
     # Metadata
     file_size = Column(Integer)  # File size in bytes
     file_type = Column(String)  # pdf, docx, etc.
+    content_hash = Column(String(64), index=True)  # SHA-256 of the uploaded file
     processed = Column(Boolean, default=False)
     processing_error = Column(String)
     
@@ -74,4 +75,32 @@ class Skill(Base):
     category = Column(String)  # technical, soft, industry, etc.
     aliases = Column(JSON)  # Alternative names for the skill
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SkillTaxonomyState(Base):
+    __tablename__ = "skill_taxonomy_state"
+
+    id = Column(Integer, primary_key=True)  # a single row, id 1
+    version = Column(Integer, nullable=False, default=0)  # bumped by every change to the skills table
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ResumeParseCache(Base):
+    __tablename__ = "resume_parse_cache"
+    __table_args__ = (
+        Index("ix_resume_parse_cache_hash_version", "content_hash", "extractor_version", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    content_hash = Column(String(64), nullable=False)  # SHA-256 of the file bytes
+    extractor_version = Column(String, nullable=False)  # parser, caps and skill taxonomy that produced the entry
+    file_type = Column(String)
+    raw_text = Column(Text)
+    extracted_skills = Column(JSON)
+    extracted_experience = Column(JSON)
+    extraction = Column(JSON)  # pages read, truncation and timing of the original parse
+    hit_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True))
@@ -31,6 +31,7 @@ class ConnectionResponse(ConnectionBase):
     id: int
     user_id: int
     platform_id: Optional[int] = None
+    company_id: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -44,6 +45,7 @@ class CompanyBase(BaseModel):
     size: Optional[str] = None
     location: Optional[str] = None
     website: Optional[str] = None
+    careers_url: Optional[str] = None
     linkedin_url: Optional[str] = None
 
 
@@ -60,6 +62,8 @@ class CompanyResponse(CompanyBase):
 
 class JobOpportunityBase(BaseModel):
     title: str
+    department: Optional[str] = None
+    employment_type: Optional[str] = None
     description: Optional[str] = None
     location: Optional[str] = None
     salary_range: Optional[str] = None
@@ -70,6 +74,7 @@ class JobOpportunityBase(BaseModel):
 
 class JobOpportunityCreate(JobOpportunityBase):
     company_id: int
+    external_id: Optional[str] = None
     posted_at: Optional[datetime] = None
     expires_at: Optional[datetime] = None
 
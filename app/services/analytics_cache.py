@@ -0,0 +1,183 @@
+"""
+Per-user analytics cache.
+
+Entries are keyed by an analytics version made of the user's
+``connections_version`` (bumped by every connection write and recalculation),
+the global ``analytics_data_state`` version (bumped by backfills that rewrite
+rollups, locations or companies for everyone) and the UTC date, since growth
+charts end today. Any of them changing means a stale entry is simply never read
+again, and ETags built from the same version stop matching. Lookups go to an
+in-process LRU first and then to an optional shared Redis tier; both expire
+entries after the TTL as a backstop for changes nothing bumps.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import bulk_insert_ignore, insert_or_increment
+from ..models.analytics import AnalyticsDataState, UserNetworkStats
+from .network_stats import adjust_user_stats, live_counts
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_DATA_STATE_ID = 1
+
+
+def get_connections_version(db: Session, user_id: int) -> int:
+    """Return the current connections version for a user (0 if never written)"""
+    version = db.query(UserNetworkStats.connections_version).filter(
+        UserNetworkStats.user_id == user_id
+    ).scalar()
+    return version or 0
+
+
+def analytics_data_version(db: Session) -> int:
+    version = db.query(AnalyticsDataState.version).filter(AnalyticsDataState.id == ANALYTICS_DATA_STATE_ID).scalar()
+    return version or 0
+
+
+def bump_analytics_data_version(db: Session) -> None:
+    """Invalidate every user's cached analytics; call inside the backfill's transaction"""
+    insert_or_increment(
+        db, AnalyticsDataState, {"id": ANALYTICS_DATA_STATE_ID, "version": 1}, ["id"], {"version": 1}
+    )
+
+
+def get_analytics_version(db: Session, user_id: int) -> str:
+    """Version of a user's analytics payloads: connections version, data version and UTC date"""
+    return f"{get_connections_version(db, user_id)}.{analytics_data_version(db)}.{datetime.utcnow():%Y%m%d}"
+
+
+def bump_connections_version(db: Session, user_id: int, connection_delta: int = 0) -> None:
+    """Invalidate cached analytics for a user and apply a change in connection count.
+
+    Call inside the write's transaction, before commit.
+    """
+    deltas = {"connections_version": 1}
+    if connection_delta:
+        deltas["connection_count"] = connection_delta
+    adjust_user_stats(db, user_id, **deltas)
+
+
+def bump_connections_versions(db: Session, user_ids: List[int]) -> None:
+    """Bulk variant of bump_connections_version for batch jobs"""
+    if not user_ids:
+        return
+    existing = {
+        user_id for (user_id,) in db.query(UserNetworkStats.user_id).filter(
+            UserNetworkStats.user_id.in_(user_ids)
+        )
+    }
+    missing = [user_id for user_id in user_ids if user_id not in existing]
+    if missing:
+        # Seed at version 0 and skip rows a concurrent write created meanwhile; the update below bumps all
+        counts = live_counts(db, missing)
+        bulk_insert_ignore(db, UserNetworkStats, [
+            {"user_id": user_id, "connections_version": 0, **counts[user_id]}
+            for user_id in missing
+        ], ["user_id"])
+    db.query(UserNetworkStats).filter(UserNetworkStats.user_id.in_(user_ids)).update(
+        {UserNetworkStats.connections_version: UserNetworkStats.connections_version + 1},
+        synchronize_session=False
+    )
+
+
+def make_etag(name: str, user_id: int, version: str) -> str:
+    """Weak ETag for a versioned analytics payload"""
+    return f'W/"{name}-{user_id}-{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class AnalyticsCache:
+    """Two-tier (local LRU + optional Redis) cache of versioned analytics payloads"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 3600, redis_url: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._local: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared = None
+        if redis_url:
+            try:
+                import redis
+                self._shared = redis.Redis.from_url(redis_url, socket_timeout=0.2)
+            except Exception as e:
+                logger.warning(f"Shared analytics cache disabled: {e}")
+
+    def _shared_key(self, user_id: int, name: str, version: str) -> str:
+        return f"analytics:{user_id}:{name}:{version}"
+
+    def get(self, user_id: int, name: str, version: str) -> Optional[Any]:
+        key = (user_id, name)
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                if entry[0] == version and entry[2] > time.monotonic():
+                    self._local.move_to_end(key)
+                    return entry[1]
+                del self._local[key]
+
+        if self._shared is None:
+            return None
+        try:
+            raw = self._shared.get(self._shared_key(user_id, name, version))
+        except Exception as e:
+            logger.warning(f"Shared analytics cache read failed: {e}")
+            return None
+        if raw is None:
+            return None
+        payload = json.loads(raw)
+        self._store_local(key, version, payload)
+        return payload
+
+    def set(self, user_id: int, name: str, version: str, payload: Any) -> None:
+        self._store_local((user_id, name), version, payload)
+        if self._shared is None:
+            return
+        try:
+            self._shared.set(
+                self._shared_key(user_id, name, version),
+                json.dumps(payload, default=str),
+                ex=self.ttl_seconds
+            )
+        except Exception as e:
+            logger.warning(f"Shared analytics cache write failed: {e}")
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop local entries for a user; shared entries age out via their version key and TTL"""
+        with self._lock:
+            for key in [k for k in self._local if k[0] == user_id]:
+                del self._local[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    def _store_local(self, key: tuple, version: str, payload: Any) -> None:
+        with self._lock:
+            self._local[key] = (version, payload, time.monotonic() + self.ttl_seconds)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+
+analytics_cache = AnalyticsCache(
+    max_entries=settings.analytics_cache_size,
+    ttl_seconds=settings.analytics_cache_ttl_seconds,
+    redis_url=settings.redis_url
+)
@@ -0,0 +1,158 @@
+"""
+Chunked, parallel, resumable batch runner for per-user jobs.
+
+Users are split into chunks of consecutive ids and handed to a worker
+function, inline or across a process pool. Finished id ranges are written to a
+JSON checkpoint so an interrupted run can skip them on resume.
+
+Batch scripts describe a job with a user selection and a ``work(db, user_ids)``
+function and hand both to ``run_batch_job``, which gives every chunk its own
+session and transaction.
+"""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from functools import partial
+from typing import Callable, Dict, List
+
+from sqlalchemy.orm import Session
+
+from ..core.database import SessionLocal, engine
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker():
+    # Forked workers must not reuse the parent's pooled connections
+    engine.dispose(close=False)
+
+
+def load_checkpoint(path: str) -> List[List[int]]:
+    if not path or not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f).get("completed", [])
+
+
+def save_checkpoint(path: str, completed: List[List[int]]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"completed": completed, "updated_at": datetime.utcnow().isoformat()}, f)
+    os.replace(tmp_path, path)
+
+
+def run_chunked(user_ids: List[int], process_chunk: Callable[[List[int]], int], chunk_size: int = 500,
+                workers: int = 1, checkpoint: str = None, resume: bool = False) -> Dict:
+    """Run process_chunk over sorted user_ids and return throughput stats.
+
+    process_chunk must be a module-level function (so it can be pickled) that
+    commits its own work and returns the number of users it handled.
+    """
+    completed = load_checkpoint(checkpoint) if resume else []
+    pending = [
+        user_id for user_id in sorted(user_ids)
+        if not any(low <= user_id <= high for low, high in completed)
+    ]
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    logger.info(
+        f"Processing {len(pending)} users ({len(user_ids) - len(pending)} already checkpointed) "
+        f"in {len(chunks)} chunks"
+    )
+
+    started = time.monotonic()
+    stats = {"processed": 0, "failed": 0}
+
+    def record(chunk, count):
+        stats["processed"] += count
+        completed.append([chunk[0], chunk[-1]])
+        if checkpoint:
+            save_checkpoint(checkpoint, completed)
+
+    def record_failure(chunk, error):
+        stats["failed"] += len(chunk)
+        logger.error(f"Failed chunk {chunk[0]}-{chunk[-1]}: {error}")
+
+    if workers <= 1:
+        for chunk in chunks:
+            try:
+                record(chunk, process_chunk(chunk))
+            except Exception as e:
+                record_failure(chunk, e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = {pool.submit(process_chunk, chunk): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    record(chunk, future.result())
+                except Exception as e:
+                    record_failure(chunk, e)
+
+    elapsed = time.monotonic() - started
+    stats["elapsed"] = elapsed
+    stats["users_per_sec"] = stats["processed"] / elapsed if elapsed > 0 else 0.0
+    logger.info(
+        f"Processed {stats['processed']} users in {elapsed:.1f}s ({stats['users_per_sec']:.0f} users/sec), "
+        f"{stats['failed']} failed, {workers} workers, chunk size {chunk_size}"
+    )
+
+    if checkpoint and not stats["failed"] and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return stats
+
+
+def run_in_session(work: Callable[..., object], user_ids: List[int], **work_kwargs) -> int:
+    """Run work(db, user_ids) for one chunk in its own transaction; returns the number of users"""
+    db = SessionLocal()
+    try:
+        work(db, user_ids, **work_kwargs)
+        db.commit()
+        return len(user_ids)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def active_user_ids(db: Session) -> List[int]:
+    return [user_id for (user_id,) in db.query(User.id).filter(User.is_active == True)]
+
+
+def run_batch_job(job_name: str, args, select_user_ids: Callable[[Session], List[int]],
+                  work: Callable[..., object], **work_kwargs) -> Dict:
+    """Run work over the selected users with the options from add_batch_arguments and return run_chunked's stats.
+
+    work must be a module-level function taking (db, user_ids, **work_kwargs);
+    it must not commit.
+    """
+    db = SessionLocal()
+    try:
+        user_ids = select_user_ids(db)
+    finally:
+        db.close()
+
+    logger.info(f"{job_name}: {len(user_ids)} users")
+    stats = run_chunked(
+        user_ids, partial(run_in_session, work, **work_kwargs),
+        chunk_size=args.chunk_size, workers=args.workers,
+        checkpoint=args.checkpoint, resume=args.resume
+    )
+    if stats["failed"]:
+        logger.error(f"{job_name} finished with failures; rerun with --resume")
+    else:
+        logger.info(f"{job_name} completed successfully")
+    return stats
+
+
+def add_batch_arguments(parser, checkpoint: str) -> None:
+    """Command-line options shared by batch scripts"""
+    parser.add_argument("--chunk-size", type=int, default=500, help="Users per chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 runs inline)")
+    parser.add_argument("--checkpoint", default=checkpoint, help="Checkpoint file path")
+    parser.add_argument("--resume", action="store_true", help="Skip chunks recorded in the checkpoint")
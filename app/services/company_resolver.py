@@ -0,0 +1,169 @@
+"""
+Company canonicalization for free-text connection companies.
+
+``company_key`` reduces a raw company string to a normalized key: lowercase,
+accents and punctuation removed, "&" spelled out, and trailing legal suffixes
+("Inc", "LLC", "Ltd", ...) dropped, so "Google", "Google LLC" and "google,
+inc." share the key "google". Each key is stored once in ``company_aliases``
+and points at one ``companies`` row.
+
+``resolve_company_ids`` maps raw strings to company ids at write time,
+creating the company and alias for keys seen for the first time. Resolved keys
+are memoized per process; ids created by a transaction that has not committed
+yet are only remembered by that session, so a rollback never leaves a dangling
+id in the shared cache.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.database import bulk_insert_ignore
+from ..models.connection import Company, CompanyAlias
+from .industries import classify_industry
+
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp", "corporation",
+    "co", "company", "plc", "gmbh", "ag", "sa", "nv", "bv", "pty", "pte", "srl", "com",
+}
+# Values that name no company at all
+PLACEHOLDERS = {"na", "none", "null", "unknown"}
+CACHE_SIZE = 65536
+QUERY_BATCH = 500
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+_cache: Dict[str, int] = {}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def company_key(raw: Optional[str]) -> Optional[str]:
+    """Normalized key of a raw company string, or None if it has no letters or digits"""
+    if not raw:
+        return None
+    text = unicodedata.normalize("NFKD", raw).encode("ascii", "ignore").decode("ascii").lower()
+    tokens = []
+    initials = False  # whether the last token was built from single letters
+    for token in _NON_WORD_RE.sub(" ", text.replace("&", " and ")).split():
+        # Rejoin runs of initials, so "S.A." is "sa" like "SA"
+        if len(token) == 1 and initials:
+            tokens[-1] += token
+        else:
+            tokens.append(token)
+            initials = len(token) == 1
+    if not tokens or " ".join(tokens) in PLACEHOLDERS:
+        return None
+    if tokens[0] == "the" and len(tokens) > 1:
+        tokens = tokens[1:]
+    # Strip suffixes from the end only, and never the whole name ("The Company" stays)
+    end = len(tokens)
+    while end > 1 and tokens[end - 1] in LEGAL_SUFFIXES:
+        end -= 1
+    return " ".join(tokens[:end])
+
+
+def display_name(variants: Iterable[str]) -> str:
+    """Name a newly created company gets: the shortest mixed-case spelling among its variants"""
+    names = {" ".join(raw.split()) for raw in variants}
+    return min(names, key=lambda name: (name.islower() or name.isupper(), len(name), name))
+
+
+def _pending(db: Session) -> Dict[str, int]:
+    """Keys whose company or alias this session created and may not have committed"""
+    return db.info.setdefault("pending_company_keys", {})
+
+
+def _remember(key: str, company_id: int) -> None:
+    if len(_cache) >= CACHE_SIZE:
+        _cache.clear()
+    _cache[key] = company_id
+
+
+def _lookup_aliases(db: Session, keys) -> Dict[str, int]:
+    found = {}
+    keys = list(keys)
+    for start in range(0, len(keys), QUERY_BATCH):
+        found.update(db.query(CompanyAlias.alias, CompanyAlias.company_id).filter(
+            CompanyAlias.alias.in_(keys[start:start + QUERY_BATCH])
+        ).all())
+    return found
+
+
+def _create_companies(db: Session, names_by_key: Dict[str, str]) -> Dict[str, int]:
+    """Create companies and aliases for unseen keys, tolerating concurrent writers"""
+    names = sorted(set(names_by_key.values()))
+    bulk_insert_ignore(db, Company, [
+        {"name": name, "industry": classify_industry(name)} for name in names
+    ], key_columns=["name"])
+    company_ids = {}
+    for start in range(0, len(names), QUERY_BATCH):
+        company_ids.update(db.query(Company.name, Company.id).filter(
+            Company.name.in_(names[start:start + QUERY_BATCH])
+        ).all())
+    bulk_insert_ignore(db, CompanyAlias, [
+        {"alias": key, "company_id": company_ids[name]} for key, name in names_by_key.items()
+    ], key_columns=["alias"])
+    # Another writer may have claimed a key first; its alias wins
+    return _lookup_aliases(db, names_by_key)
+
+
+def resolve_company_ids(db: Session, raw_names: Iterable[Optional[str]], create: bool = True) -> Dict[str, int]:
+    """Company id of each distinct raw name that has a key; missing companies are created unless create is False"""
+    pending = _pending(db)
+    keys = {}
+    for raw in set(raw_names):
+        key = company_key(raw)
+        if key:
+            keys[raw] = key
+
+    resolved = {}
+    for key in set(keys.values()):
+        company_id = pending.get(key) or _cache.get(key)
+        if company_id:
+            resolved[key] = company_id
+
+    missing = set(keys.values()) - set(resolved)
+    if missing:
+        found = _lookup_aliases(db, missing)
+        for key, company_id in found.items():
+            _remember(key, company_id)
+        resolved.update(found)
+
+        unseen = missing - set(found)
+        if unseen and create:
+            variants = {}
+            for raw, key in keys.items():
+                if key in unseen:
+                    variants.setdefault(key, []).append(raw)
+            created = _create_companies(db, {key: display_name(names) for key, names in variants.items()})
+            pending.update(created)
+            resolved.update(created)
+
+    return {raw: resolved[key] for raw, key in keys.items() if key in resolved}
+
+
+def resolve_company_id(db: Session, raw: Optional[str], create: bool = True) -> Optional[int]:
+    """Company id of one raw name, or None if it is blank (or unknown and create is False)"""
+    return resolve_company_ids(db, [raw], create=create).get(raw)
+
+
+def register_company_aliases(db: Session, only_missing: bool = False) -> int:
+    """Add the key of every company's own name as an alias, so existing rows are found before new ones are made.
+
+    With only_missing, just companies that have no alias at all, which is cheap enough to run at startup.
+    """
+    companies = db.query(Company.id, Company.name)
+    if only_missing:
+        companies = companies.filter(~db.query(CompanyAlias.id).filter(CompanyAlias.company_id == Company.id).exists())
+    companies = companies.all()
+    rows, seen = [], set()
+    for company_id, name in sorted(companies):
+        key = company_key(name)
+        if key and key not in seen:
+            seen.add(key)
+            rows.append({"alias": key, "company_id": company_id})
+    bulk_insert_ignore(db, CompanyAlias, rows, key_columns=["alias"])
+    return len(rows)
@@ -0,0 +1,78 @@
+"""
+Bookkeeping shared by every path that writes a user's connections.
+
+New and edited rows get their derived columns (normalized location, canonical
+company) from ``prepare_connection_values``, ``prepare_connection_rows`` or
+``refresh_derived_fields``; ``record_connection_changes`` runs inside the
+write's transaction, before commit, so derived state never drifts from the
+connections table. Rows written before company_id existed are resolved on
+first read by ``resolve_missing_company_ids`` until
+scripts/backfill_company_ids.py has filled them all.
+"""
+
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from ..models.connection import Connection
+from .analytics_cache import bump_connections_version
+from .company_resolver import resolve_company_id, resolve_company_ids
+from .locations import normalize_location
+from .network_rollups import record_daily_change
+
+
+def prepare_connection_values(db: Session, values: dict) -> dict:
+    """Fill the derived columns of a connection mapping before it is inserted"""
+    values["connection_location_normalized"] = normalize_location(values.get("connection_location"))
+    values["company_id"] = resolve_company_id(db, values.get("connection_company"))
+    return values
+
+
+def prepare_connection_rows(db: Session, rows: List[dict]) -> List[dict]:
+    """prepare_connection_values for a batch, resolving all of its companies at once"""
+    company_ids = resolve_company_ids(db, (row.get("connection_company") for row in rows))
+    for row in rows:
+        row["connection_location_normalized"] = normalize_location(row.get("connection_location"))
+        row["company_id"] = company_ids.get(row.get("connection_company"))
+    return rows
+
+
+def refresh_derived_fields(db: Session, connection) -> None:
+    """Recompute the derived columns of a connection after its fields were edited"""
+    connection.connection_location_normalized = normalize_location(connection.connection_location)
+    connection.company_id = resolve_company_id(db, connection.connection_company)
+
+
+def resolve_missing_company_ids(db: Session, user_id: int) -> int:
+    """Set company_id on a user's connections that predate it; the caller commits if anything was updated.
+
+    Reads that group or filter on company_id call this first, so connections
+    not yet reached by the backfill are not silently left out. Once a user's
+    rows are resolved this is one lookup on the (user_id, company_id) index;
+    only rows whose company is a placeholder keep turning up, and those resolve
+    without a query.
+    """
+    rows = db.query(Connection.id, Connection.connection_company).filter(
+        Connection.user_id == user_id,
+        Connection.company_id.is_(None),
+        Connection.connection_company.isnot(None),
+        Connection.connection_company != ""
+    ).all()
+    mappings = []
+    if rows:
+        company_ids = resolve_company_ids(db, (row.connection_company for row in rows))
+        mappings = [
+            {"id": row.id, "company_id": company_ids[row.connection_company]}
+            for row in rows if row.connection_company in company_ids
+        ]
+    if mappings:
+        db.bulk_update_mappings(Connection, mappings)
+        bump_connections_version(db, user_id)
+    return len(mappings)
+
+
+def record_connection_changes(db: Session, user_id: int, added: int = 0, removed: int = 0) -> None:
+    """Invalidate cached analytics and apply the count change to the counter and today's rollup"""
+    bump_connections_version(db, user_id, connection_delta=added - removed)
+    if added or removed:
+        record_daily_change(db, user_id, added=added, removed=removed)
@@ -0,0 +1,251 @@
+"""
+Hourly and daily rollups of analytics events, raw-event retention, and a
+range query that reads from the coarsest table covering each part of a range.
+
+Rollups are keyed by bucket, event type, user and one ``event_data`` dimension
+per event type (ROLLUP_DIMENSIONS). Rolling up a window deletes and rewrites
+its hourly rows, then rebuilds the daily rows of every day it touched from the
+hourly table, so reruns over the same window are idempotent. Nothing is
+rebuilt past the retention horizons (see rollup_horizons): hours whose raw
+events may have been purged keep their hourly rows, and days whose hourly rows
+may have been purged keep their daily rows.
+"""
+
+import gzip
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.analytics import AnalyticsEvent, EventDailyRollup, EventHourlyRollup
+
+# event_type -> event_data key kept as the rollup dimension
+ROLLUP_DIMENSIONS = {
+    "connection_add": "source",
+    "analysis_run": "analysis",
+}
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+
+def floor_hour(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(moment: datetime) -> datetime:
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil(moment: datetime, floor, step: timedelta) -> datetime:
+    floored = floor(moment)
+    return floored if floored == moment else floored + step
+
+
+def _event_key(event_type: str, event_data: Optional[Dict]) -> Tuple[str, int]:
+    """(dimension, value) recorded for one raw event"""
+    event_data = event_data or {}
+    key = ROLLUP_DIMENSIONS.get(event_type)
+    dimension = str(event_data.get(key, "")) if key else ""
+    value = event_data.get("count", 1)
+    return dimension[:100], value if isinstance(value, int) else 1
+
+
+def rollup_horizons(now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Earliest hour whose raw events and earliest day whose hourly rollups are certainly all still stored"""
+    now = now or datetime.utcnow()
+    raw_since = _ceil(now - timedelta(days=settings.events_raw_retention_days), floor_hour, HOUR)
+    hourly_since = _ceil(now - timedelta(days=settings.events_hourly_retention_days), floor_day, DAY)
+    return raw_since, hourly_since
+
+
+def rollup_events(db: Session, start: datetime, end: datetime, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Rebuild hourly rollups for [start, end) and the daily rollups of the days it touches.
+
+    The window is clamped to the retention horizons: rollups whose source rows
+    may have been purged are left as they are rather than deleted.
+    """
+    raw_since, hourly_since = rollup_horizons(now)
+    start, end = max(floor_hour(start), raw_since), floor_hour(end)
+    if start >= end:
+        return {"hourly_rows": 0, "daily_rows": 0}
+
+    hourly = defaultdict(lambda: [0, 0])
+    events = db.query(
+        AnalyticsEvent.created_at, AnalyticsEvent.event_type, AnalyticsEvent.user_id, AnalyticsEvent.event_data
+    ).filter(
+        AnalyticsEvent.created_at >= start, AnalyticsEvent.created_at < end
+    ).yield_per(5000)
+    for created_at, event_type, user_id, event_data in events:
+        dimension, value = _event_key(event_type, event_data)
+        totals = hourly[(floor_hour(created_at), event_type, user_id or 0, dimension)]
+        totals[0] += 1
+        totals[1] += value
+
+    db.query(EventHourlyRollup).filter(
+        EventHourlyRollup.bucket >= start, EventHourlyRollup.bucket < end
+    ).delete(synchronize_session=False)
+    db.bulk_insert_mappings(EventHourlyRollup, [
+        {"bucket": bucket, "event_type": event_type, "user_id": user_id, "dimension": dimension,
+         "event_count": count, "value_total": value}
+        for (bucket, event_type, user_id, dimension), (count, value) in hourly.items()
+    ])
+
+    # Days are rebuilt whole from the hourly table, including hours outside this window
+    day_start, day_end = max(floor_day(start), hourly_since), _ceil(end, floor_day, DAY)
+    if day_start >= day_end:
+        return {"hourly_rows": len(hourly), "daily_rows": 0}
+    daily = defaultdict(lambda: [0, 0])
+    rows = db.query(
+        EventHourlyRollup.bucket, EventHourlyRollup.event_type, EventHourlyRollup.user_id,
+        EventHourlyRollup.dimension, EventHourlyRollup.event_count, EventHourlyRollup.value_total
+    ).filter(
+        EventHourlyRollup.bucket >= day_start, EventHourlyRollup.bucket < day_end
+    ).yield_per(5000)
+    for bucket, event_type, user_id, dimension, count, value in rows:
+        totals = daily[(bucket.date(), event_type, user_id, dimension)]
+        totals[0] += count
+        totals[1] += value
+
+    db.query(EventDailyRollup).filter(
+        EventDailyRollup.day >= day_start.date(), EventDailyRollup.day < day_end.date()
+    ).delete(synchronize_session=False)
+    db.bulk_insert_mappings(EventDailyRollup, [
+        {"day": day, "event_type": event_type, "user_id": user_id, "dimension": dimension,
+         "event_count": count, "value_total": value}
+        for (day, event_type, user_id, dimension), (count, value) in daily.items()
+    ])
+    return {"hourly_rows": len(hourly), "daily_rows": len(daily)}
+
+
+def rolled_up_until(db: Session) -> Optional[datetime]:
+    """End of the newest rolled-up hour; later events are only in the raw table"""
+    latest = db.query(func.max(EventHourlyRollup.bucket)).scalar()
+    return latest + HOUR if latest else None
+
+
+def _delete_in_chunks(db: Session, model, filters, chunk_size: int, archive=None) -> int:
+    deleted = 0
+    while True:
+        if archive is not None:
+            rows = db.query(model).filter(*filters).order_by(model.id).limit(chunk_size).all()
+            ids = [row.id for row in rows]
+            for row in rows:
+                archive.write(json.dumps({
+                    column.name: getattr(row, column.name) for column in model.__table__.columns
+                }, default=str) + "\n")
+        else:
+            ids = [row_id for (row_id,) in db.query(model.id).filter(*filters).order_by(model.id).limit(chunk_size)]
+        if not ids:
+            return deleted
+        db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        deleted += len(ids)
+
+
+def purge_raw_events(db: Session, before: datetime, chunk_size: int = 5000,
+                     archive_path: Optional[str] = None) -> int:
+    """Delete raw events older than before, one committed chunk at a time.
+
+    Only events already covered by the hourly rollup are removed. With
+    archive_path, deleted rows are appended to a gzipped JSON-lines file first.
+    """
+    covered = rolled_up_until(db)
+    if covered is None:
+        return 0
+    filters = [AnalyticsEvent.created_at < min(before, covered)]
+    if archive_path:
+        with gzip.open(archive_path, "at") as archive:
+            return _delete_in_chunks(db, AnalyticsEvent, filters, chunk_size, archive)
+    return _delete_in_chunks(db, AnalyticsEvent, filters, chunk_size)
+
+
+def purge_hourly_rollups(db: Session, before: datetime, chunk_size: int = 5000) -> int:
+    """Delete hourly rollups older than before; daily rollups keep the totals"""
+    return _delete_in_chunks(db, EventHourlyRollup, [EventHourlyRollup.bucket < floor_day(before)], chunk_size)
+
+
+def plan_range(start: datetime, end: datetime, covered_until: Optional[datetime]) -> List[Tuple[str, datetime, datetime]]:
+    """Split [start, end) into time-ordered (source, start, end) segments.
+
+    Whole days read the daily table, whole hours at the edges read the hourly
+    table, and sub-hour edges plus anything newer than the rollup read raw events.
+    """
+    segments = []
+    cut = min(end, max(start, covered_until)) if covered_until else start
+
+    def add(source, seg_start, seg_end):
+        if seg_start < seg_end:
+            segments.append((source, seg_start, seg_end))
+
+    def hours(seg_start, seg_end):
+        hour_start, hour_end = _ceil(seg_start, floor_hour, HOUR), floor_hour(seg_end)
+        if hour_start < hour_end:
+            add("raw", seg_start, hour_start)
+            add("hour", hour_start, hour_end)
+            add("raw", hour_end, seg_end)
+        else:
+            add("raw", seg_start, seg_end)
+
+    day_start, day_end = _ceil(start, floor_day, DAY), floor_day(cut)
+    if day_start < day_end:
+        hours(start, day_start)
+        add("day", day_start, day_end)
+        hours(day_end, cut)
+    else:
+        hours(start, cut)
+    add("raw", cut, end)
+    return segments
+
+
+def query_event_counts(db: Session, start: datetime, end: datetime, event_type: Optional[str] = None,
+                       user_id: Optional[int] = None) -> Dict:
+    """Event and value totals per (event_type, dimension) over [start, end)"""
+    segments = plan_range(start, end, rolled_up_until(db))
+    totals = defaultdict(lambda: [0, 0])
+
+    for source, seg_start, seg_end in segments:
+        if source == "raw":
+            query = db.query(AnalyticsEvent.event_type, AnalyticsEvent.event_data).filter(
+                AnalyticsEvent.created_at >= seg_start, AnalyticsEvent.created_at < seg_end
+            )
+            if event_type:
+                query = query.filter(AnalyticsEvent.event_type == event_type)
+            if user_id is not None:
+                query = query.filter(AnalyticsEvent.user_id == user_id)
+            for row_type, event_data in query.yield_per(5000):
+                dimension, value = _event_key(row_type, event_data)
+                totals[(row_type, dimension)][0] += 1
+                totals[(row_type, dimension)][1] += value
+            continue
+
+        model = EventDailyRollup if source == "day" else EventHourlyRollup
+        bucket = model.day if source == "day" else model.bucket
+        bounds = (seg_start.date(), seg_end.date()) if source == "day" else (seg_start, seg_end)
+        query = db.query(
+            model.event_type, model.dimension, func.sum(model.event_count), func.sum(model.value_total)
+        ).filter(bucket >= bounds[0], bucket < bounds[1])
+        if event_type:
+            query = query.filter(model.event_type == event_type)
+        if user_id is not None:
+            query = query.filter(model.user_id == user_id)
+        for row_type, dimension, count, value in query.group_by(model.event_type, model.dimension):
+            totals[(row_type, dimension)][0] += count or 0
+            totals[(row_type, dimension)][1] += value or 0
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "sources": [
+            {"source": source, "start": seg_start.isoformat(), "end": seg_end.isoformat()}
+            for source, seg_start, seg_end in segments
+        ],
+        "events": [
+            {"event_type": row_type, "dimension": dimension, "count": count, "value": value}
+            for (row_type, dimension), (count, value) in sorted(totals.items())
+        ]
+    }
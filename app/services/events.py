@@ -0,0 +1,149 @@
+"""
+Buffered analytics event ingestion.
+
+Endpoints call ``track_event`` which only appends to a bounded in-process
+buffer; a background thread bulk-inserts the buffer into ``analytics_events``
+every ``events_flush_interval_ms`` or as soon as ``events_flush_batch`` events
+are waiting. Under pressure the buffer samples new events, and when full it
+drops them, so request latency never depends on the database.
+
+``EventContextMiddleware`` records the caller's IP, user agent and session id
+for the duration of a request so events pick them up without extra plumbing.
+"""
+
+import logging
+import random
+import threading
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.analytics import AnalyticsEvent
+
+logger = logging.getLogger(__name__)
+
+_request_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("analytics_request_context", default=None)
+
+
+class EventBuffer:
+    """Bounded event buffer with a background bulk-insert flusher"""
+
+    def __init__(self, capacity: int = 10000, flush_batch: int = 500, flush_interval_ms: int = 1000,
+                 high_water: float = 0.8, busy_sample_rate: float = 0.1):
+        self.capacity = capacity
+        self.flush_batch = flush_batch
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.high_water = int(capacity * high_water)
+        self.busy_sample_rate = busy_sample_rate
+        self.stats = {"enqueued": 0, "sampled_out": 0, "dropped": 0, "flushed": 0, "flush_errors": 0}
+        self._events: List[Dict[str, Any]] = []
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def enqueue(self, event: Dict[str, Any]) -> bool:
+        """Buffer an event; returns False if it was sampled out or dropped"""
+        with self._cond:
+            size = len(self._events)
+            if size >= self.capacity:
+                self.stats["dropped"] += 1
+                return False
+            if size >= self.high_water and random.random() >= self.busy_sample_rate:
+                self.stats["sampled_out"] += 1
+                return False
+            self._events.append(event)
+            self.stats["enqueued"] += 1
+            if len(self._events) >= self.flush_batch:
+                self._cond.notify()
+            return True
+
+    def flush(self) -> int:
+        """Write everything buffered so far; returns the number of events written"""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._events = self._events, []
+            if not batch:
+                return 0
+            db = SessionLocal()
+            try:
+                db.bulk_insert_mappings(AnalyticsEvent, batch)
+                db.commit()
+                self.stats["flushed"] += len(batch)
+                return len(batch)
+            except Exception as e:
+                db.rollback()
+                self.stats["flush_errors"] += 1
+                logger.error(f"Failed to flush {len(batch)} analytics events: {e}")
+                return 0
+            finally:
+                db.close()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="analytics-event-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the flusher and write whatever is still buffered"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._stopping and len(self._events) < self.flush_batch:
+                    self._cond.wait(self.flush_interval)
+                if self._stopping:
+                    return
+            self.flush()
+
+
+event_buffer = EventBuffer(
+    capacity=settings.events_buffer_size,
+    flush_batch=settings.events_flush_batch,
+    flush_interval_ms=settings.events_flush_interval_ms,
+    busy_sample_rate=settings.events_busy_sample_rate
+)
+
+
+def track_event(event_type: str, user_id: Optional[int] = None, data: Optional[Dict[str, Any]] = None) -> bool:
+    """Record an analytics event without touching the database on the request path"""
+    if not settings.events_enabled:
+        return False
+    context = _request_context.get() or {}
+    return event_buffer.enqueue({
+        "user_id": user_id,
+        "event_type": event_type,
+        "event_data": data,
+        "ip_address": context.get("ip_address"),
+        "user_agent": context.get("user_agent"),
+        "session_id": context.get("session_id"),
+        "created_at": datetime.utcnow()
+    })
+
+
+class EventContextMiddleware(BaseHTTPMiddleware):
+    """Expose request metadata to track_event for the duration of a request"""
+
+    async def dispatch(self, request, call_next):
+        token = _request_context.set({
+            "ip_address": request.client.host if request.client else None,
+            "user_agent": request.headers.get("user-agent"),
+            "session_id": request.headers.get("x-session-id")
+        })
+        try:
+            return await call_next(request)
+        finally:
+            _request_context.reset(token)
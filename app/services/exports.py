@@ -0,0 +1,79 @@
+"""
+Streaming exports.
+
+``stream_export`` turns an iterable of rows into CSV or NDJSON bytes a batch
+at a time, optionally gzip-compressed on the fly, so an export of any size
+holds only one batch in memory and the first bytes go out before the query
+has finished.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Iterable, Iterator, List, Sequence
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _encode(rows: Iterable[Sequence], headers: List[str], keys: List[str], fmt: str,
+            batch_rows: int) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(headers)
+        write = lambda row: writer.writerow([_csv_value(value) for value in row])
+    else:
+        write = lambda row: buffer.write(
+            json.dumps({key: _json_value(value) for key, value in zip(keys, row)}) + "\n"
+        )
+
+    # The header goes out before the first row is fetched
+    yield buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    for row in rows:
+        write(row)
+        pending += 1
+        if pending >= batch_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue().encode("utf-8")
+
+
+def stream_export(rows: Iterable[Sequence], headers: List[str], keys: List[str], fmt: str = "csv",
+                  compress: bool = False, batch_rows: int = 1000) -> Iterator[bytes]:
+    """Encode rows incrementally; headers label CSV columns, keys name NDJSON fields"""
+    chunks = _encode(rows, headers, keys, fmt, batch_rows)
+    if not compress:
+        yield from chunks
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,65 @@
+"""
+Industry classification of company names.
+
+INDUSTRY_MAP is compiled once into a keyword automaton, so a name is scanned
+in one pass and keywords only match whole words ("ey" no longer matches
+"Disney"). When keywords from several industries match, the industry listed
+first in INDUSTRY_MAP wins. Results are memoized per normalized name.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable
+
+from .keyword_automaton import KeywordAutomaton
+
+# Mock industry data - in production you'd use a proper API
+INDUSTRY_MAP = {
+    "technology": ["google", "microsoft", "apple", "meta", "amazon", "netflix", "tesla", "spotify", "airbnb", "uber", "linkedin", "salesforce", "adobe", "intel", "oracle", "slack", "zoom", "dropbox", "square", "twilio", "procore", "revolut", "blueflame", "nasdaq"],
+    "finance": ["goldman sachs", "jpmorgan", "morgan stanley", "blackrock", "vanguard", "fidelity", "charles schwab", "robinhood", "stripe", "fintech", "capital", "investments", "bank", "credit", "allstate", "ivg", "ipd capital"],
+    "consulting": ["mckinsey", "deloitte", "accenture", "boston consulting", "bain", "pwc", "ey", "kpmg", "metis search", "barrett group"],
+    "healthcare": ["johnson & johnson", "pfizer", "roche", "novartis", "merck", "abbvie", "bristol myers", "gilead", "amgen", "biogen"],
+    "retail": ["walmart", "amazon", "target", "costco", "home depot", "nike", "adidas", "michael kors", "zara", "h&m"],
+    "energy": ["exxon", "chevron", "shell", "bp", "conocophillips", "total", "equinor", "schlumberger", "halliburton"],
+    "manufacturing": ["general electric", "boeing", "ford", "general motors", "tesla", "3m", "caterpillar", "honeywell", "lockheed martin"],
+    "media": ["disney", "comcast", "netflix", "warner", "viacom", "fox", "cbs", "nbc", "espn"],
+    "telecommunications": ["verizon", "at&t", "t-mobile", "sprint", "comcast", "charter", "vodafone"],
+    "transportation": ["fedex", "ups", "dhl", "uber", "lyft", "dp world", "logistics"],
+    "real_estate": ["cbre", "jones lang lasalle", "cushman", "colliers", "real estate", "realty"],
+    "recruiting": ["robert half", "randstad", "adecco", "manpower", "korn ferry", "heidrick", "russell reynolds"]
+}
+
+INDUSTRY_RANK = {industry: rank for rank, industry in enumerate(INDUSTRY_MAP)}
+
+_automaton = KeywordAutomaton(
+    (keyword, INDUSTRY_RANK[industry])
+    for industry, keywords in INDUSTRY_MAP.items()
+    for keyword in keywords
+)
+_industries = list(INDUSTRY_MAP)
+
+
+def normalize_company_name(company_name: str) -> str:
+    return " ".join(company_name.lower().split())
+
+
+@lru_cache(maxsize=65536)
+def _classify_normalized(name: str) -> str:
+    best = None
+    for _, _, rank in _automaton.find(name):
+        if best is None or rank < best:
+            best = rank
+            if rank == 0:
+                break
+    return _industries[best] if best is not None else "other"
+
+
+def classify_industry(company_name: str) -> str:
+    """Classify company into industry based on name"""
+    if not company_name:
+        return "other"
+    return _classify_normalized(normalize_company_name(company_name))
+
+
+def classify_many(company_names: Iterable[str]) -> Dict[str, str]:
+    """Industry of each distinct name, classifying each normalized name once"""
+    return {name: classify_industry(name) for name in set(company_names)}
@@ -0,0 +1,286 @@
+"""
+Network insights engine.
+
+Insights are computed from a user's real connections by a batch job
+(scripts/generate_insights.py) and persisted to ``connection_insights`` with a
+confidence score and an expiry. The API only reads the stored rows.
+"""
+
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..models.analytics import ConnectionInsight
+from ..models.connection import Company, Connection, JobOpportunity
+from .industries import classify_industry
+from .locations import UNKNOWN_LOCATION
+from .network_health import SENIOR_TITLE_KEYWORDS
+
+# insight_type -> key in the GET /analytics/insights response
+INSIGHT_SECTIONS = {
+    "connection_opportunity": "connectionOpportunities",
+    "network_gap": "networkGaps",
+    "strengthen_connection": "strengthenConnections",
+    "industry_expansion": "industryExpansion",
+    "career_opportunity": "careerOpportunities",
+}
+
+TARGET_INDUSTRIES = {
+    "technology": "High growth sector with strong job market",
+    "finance": "Emerging opportunities in fintech and digital payments",
+    "healthcare": "Stable demand and growing investment in health tech",
+    "consulting": "Broad exposure to companies across industries",
+}
+
+PRIORITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+
+def _is_senior(title: str) -> bool:
+    title = (title or "").lower()
+    return any(keyword in title for keyword in SENIOR_TITLE_KEYWORDS)
+
+
+def _age(created_at, now: datetime) -> str:
+    if not created_at:
+        return "unknown"
+    days = (now - created_at.replace(tzinfo=None)).days
+    if days < 30:
+        return "this month"
+    months = days // 30
+    return f"{months} month{'s' if months != 1 else ''} ago"
+
+
+def _insight(user_id, insight_type, data, confidence, priority, connection_id=None):
+    return {
+        "user_id": user_id,
+        "connection_id": connection_id,
+        "insight_type": insight_type,
+        "insight_data": data,
+        "confidence_score": round(min(max(confidence, 0.0), 1.0), 2),
+        "is_actionable": True,
+        "priority": priority,
+        "status": "active",
+    }
+
+
+def build_user_insights(user_id: int, connections: List, jobs_by_company: Dict[str, str],
+                        now: datetime) -> List[Dict]:
+    """Derive insight rows for one user from their connection rows"""
+    if not connections:
+        return []
+
+    insights = []
+    size = len(connections)
+    company_connections = defaultdict(list)
+    for conn in connections:
+        if conn.connection_company:
+            company_connections[conn.connection_company].append(conn)
+
+    # Connection opportunities: reach through mutual connections and company clusters
+    with_mutuals = sorted(
+        [conn for conn in connections if (conn.mutual_connections_count or 0) > 0],
+        key=lambda conn: conn.mutual_connections_count, reverse=True
+    )
+    if with_mutuals:
+        total_mutuals = sum(conn.mutual_connections_count for conn in with_mutuals)
+        insights.append(_insight(user_id, "connection_opportunity", {
+            "type": "mutual_connection",
+            "title": "Connect through mutual connections",
+            "description": f"{total_mutuals} potential connections through {len(with_mutuals)} existing contacts",
+            "via": [conn.connection_name for conn in with_mutuals[:3]],
+            "priority": "high" if total_mutuals >= 10 else "medium"
+        }, confidence=len(with_mutuals) / 10, priority="high" if total_mutuals >= 10 else "medium",
+            connection_id=with_mutuals[0].id))
+
+    if company_connections:
+        company, members = max(company_connections.items(), key=lambda item: len(item[1]))
+        if len(members) >= 3:
+            insights.append(_insight(user_id, "connection_opportunity", {
+                "type": "company_cluster",
+                "title": f"Get introduced across {company}",
+                "description": f"{len(members)} connections at {company} can introduce you to their teams",
+                "priority": "medium"
+            }, confidence=len(members) / 10, priority="medium"))
+
+    # Network gaps: seniority, geography and industry concentration
+    senior_count = sum(1 for conn in connections if _is_senior(conn.connection_title))
+    if size >= 5 and senior_count / size < 0.15:
+        insights.append(_insight(user_id, "network_gap", {
+            "gap": "Senior Leadership",
+            "description": f"Only {round(senior_count / size * 100)}% of your connections are in senior roles",
+            "impact": "high",
+            "suggestions": ["Target VPs at portfolio companies", "Attend executive networking events"]
+        }, confidence=min(size / 50, 1.0), priority="high"))
+
+    regions = Counter(
+        conn.connection_location_normalized for conn in connections
+        if conn.connection_location_normalized and conn.connection_location_normalized != UNKNOWN_LOCATION
+    )
+    located = sum(regions.values())
+    if located >= 5:
+        region, count = regions.most_common(1)[0]
+        if count / located >= 0.7:
+            insights.append(_insight(user_id, "network_gap", {
+                "gap": "Geographic Concentration",
+                "description": f"{round(count / located * 100)}% of your located connections are in {region}",
+                "impact": "medium",
+                "suggestions": ["Connect with professionals in other hubs", "Join remote-first professional communities"]
+            }, confidence=min(located / 50, 1.0), priority="medium"))
+
+    industries = Counter(
+        classify_industry(conn.connection_company) for conn in connections if conn.connection_company
+    )
+    classified = sum(industries.values())
+    if classified >= 5:
+        industry, count = industries.most_common(1)[0]
+        if industry != "other" and count / classified >= 0.7:
+            insights.append(_insight(user_id, "network_gap", {
+                "gap": "Industry Concentration",
+                "description": f"{round(count / classified * 100)}% of your connections work in {industry.replace('_', ' ')}",
+                "impact": "medium",
+                "suggestions": ["Attend cross-industry events", "Reconnect with contacts who changed industries"]
+            }, confidence=min(classified / 50, 1.0), priority="medium"))
+
+    # Strengthen weak ties that have the most shared contacts
+    weak_ties = sorted(
+        [conn for conn in connections if (conn.relationship_strength or 0) <= 2],
+        key=lambda conn: conn.mutual_connections_count or 0, reverse=True
+    )[:5]
+    for conn in weak_ties:
+        mutuals = conn.mutual_connections_count or 0
+        if mutuals:
+            suggestion = f"Reconnect; you share {mutuals} mutual connections"
+        elif conn.connection_title and conn.connection_company:
+            suggestion = f"Ask about their work as {conn.connection_title} at {conn.connection_company}"
+        else:
+            suggestion = "Send a short personal update to restart the conversation"
+        priority = "high" if mutuals >= 10 else "medium"
+        insights.append(_insight(user_id, "strengthen_connection", {
+            "connection": conn.connection_name,
+            "lastInteraction": _age(conn.created_at, now),
+            "suggestion": suggestion,
+            "priority": priority
+        }, confidence=0.4 + min(mutuals, 30) / 50, priority=priority, connection_id=conn.id))
+
+    # Industry expansion towards under-represented target industries
+    for industry, reasoning in TARGET_INDUSTRIES.items():
+        current = industries.get(industry, 0)
+        if current >= 5:
+            continue
+        priority = "high" if current == 0 else "medium"
+        insights.append(_insight(user_id, "industry_expansion", {
+            "industry": industry.replace('_', ' ').title(),
+            "currentConnections": current,
+            "targetConnections": current + 5,
+            "reasoning": reasoning,
+            "priority": priority
+        }, confidence=1 - current / 5, priority=priority))
+
+    # Career opportunities at companies where the user has several (and senior) contacts
+    ranked_companies = sorted(
+        [(company, members) for company, members in company_connections.items() if len(members) >= 2],
+        key=lambda item: (sum(conn.relationship_strength or 0 for conn in item[1]), len(item[1])),
+        reverse=True
+    )[:3]
+    for company, members in ranked_companies:
+        seniors = sum(1 for conn in members if _is_senior(conn.connection_title))
+        match_score = min(100, 50 + 10 * len(members) + 5 * seniors)
+        strongest = sorted(members, key=lambda conn: conn.relationship_strength or 0, reverse=True)[:3]
+        insights.append(_insight(user_id, "career_opportunity", {
+            "company": company,
+            "position": jobs_by_company.get(company.lower()),
+            "connections": [conn.connection_name for conn in strongest],
+            "matchScore": match_score,
+            "reasoning": f"{len(members)} connections at {company}, {seniors} in senior roles"
+        }, confidence=match_score / 100, priority="high" if match_score >= 80 else "medium",
+            connection_id=strongest[0].id))
+
+    return insights
+
+
+def refresh_insights(db: Session, user_ids: List[int]) -> int:
+    """Recompute and replace the active insights of a chunk of users; returns rows written"""
+    rows = db.query(
+        Connection.id,
+        Connection.user_id,
+        Connection.connection_name,
+        Connection.connection_title,
+        Connection.connection_company,
+        Connection.connection_location_normalized,
+        Connection.relationship_strength,
+        Connection.mutual_connections_count,
+        Connection.created_at
+    ).filter(Connection.user_id.in_(user_ids)).all()
+
+    by_user = defaultdict(list)
+    company_names = set()
+    for row in rows:
+        by_user[row.user_id].append(row)
+        if row.connection_company:
+            company_names.add(row.connection_company.lower())
+
+    # Latest active opening per company in this chunk's networks
+    jobs_by_company = {}
+    if company_names:
+        jobs = db.query(func.lower(Company.name), JobOpportunity.title).join(
+            JobOpportunity, JobOpportunity.company_id == Company.id
+        ).filter(
+            JobOpportunity.is_active == True,
+            func.lower(Company.name).in_(company_names)
+        ).order_by(JobOpportunity.posted_at).all()
+        jobs_by_company = {name: title for name, title in jobs}
+
+    now = datetime.utcnow()
+    expires_at = now + timedelta(hours=settings.insights_ttl_hours)
+    mappings = []
+    for user_id in user_ids:
+        for insight in build_user_insights(user_id, by_user.get(user_id, []), jobs_by_company, now):
+            mappings.append({**insight, "expires_at": expires_at, "created_at": now, "updated_at": now})
+
+    db.query(ConnectionInsight).filter(
+        ConnectionInsight.user_id.in_(user_ids),
+        ConnectionInsight.status == "active"
+    ).delete(synchronize_session=False)
+    if mappings:
+        db.bulk_insert_mappings(ConnectionInsight, mappings)
+    return len(mappings)
+
+
+def delete_connection_insights(db: Session, connection_ids: List[int]) -> int:
+    """Remove insights about connections that are being deleted; call in the delete's transaction.
+
+    The foreign key cascades on databases created with it, but tables created
+    before it have no ON DELETE clause, so the rows are removed explicitly.
+    """
+    if not connection_ids:
+        return 0
+    return db.query(ConnectionInsight).filter(
+        ConnectionInsight.connection_id.in_(connection_ids)
+    ).delete(synchronize_session=False)
+
+
+def get_active_insights(db: Session, user_id: int) -> Dict:
+    """Stored, unexpired insights for a user grouped into response sections"""
+    now = datetime.utcnow()
+    rows = db.query(ConnectionInsight).filter(
+        ConnectionInsight.user_id == user_id,
+        ConnectionInsight.status == "active",
+        ConnectionInsight.expires_at > now
+    ).all()
+    rows.sort(key=lambda row: (PRIORITY_ORDER.get(row.priority, 1), -(row.confidence_score or 0)))
+
+    insights = {section: [] for section in INSIGHT_SECTIONS.values()}
+    for row in rows:
+        section = INSIGHT_SECTIONS.get(row.insight_type)
+        if section:
+            insights[section].append({
+                "id": row.id,
+                **(row.insight_data or {}),
+                "confidence": row.confidence_score
+            })
+    insights["generatedAt"] = max(row.created_at for row in rows).isoformat() if rows else None
+    return insights
@@ -0,0 +1,346 @@
+"""
+Job catalog.
+
+Career pages and job listings live in ``companies`` and ``job_opportunities``
+and are loaded from feeds by ``apply_feed``: a JSON list of companies, each
+with its jobs, or a CSV with one row per job (see ``parse_feed``). The bundled
+fixture is app/data/jobs.json; scripts/load_job_catalog.py loads it or any
+other feed file.
+
+Jobs stop being active when a feed drops them or when their expiry passes:
+a job listed already expired is stored inactive, and ``expire_jobs``, run by
+both loaders, deactivates jobs that expired since. Facet counts follow both,
+so they match what search returns; in between runs, reads also filter on
+expiry.
+
+Every load that changes something bumps the catalog version in
+``job_catalog_state``. Reads go
+through ``company_listings``, an in-process LRU of per-company listings keyed
+by that version, so a load invalidates every process's cache at once and a
+lookup costs one primary-key read while the catalog is unchanged.
+"""
+
+import csv
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote_plus
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import bulk_upsert
+from ..models.connection import Company, JobCatalogState, JobOpportunity
+from .company_resolver import resolve_company_ids
+from .job_facets import FACETS, apply_facet_deltas, count_deltas
+from .locations import normalize_location
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "jobs.json")
+CATALOG_STATE_ID = 1
+
+# CSV feed columns and the job fields they fill
+CSV_JOB_FIELDS = {
+    "job_id": "id",
+    "title": "title",
+    "department": "department",
+    "location": "location",
+    "type": "type",
+    "experience_level": "experience_level",
+    "salary_range": "salary_range",
+    "posted_date": "posted_date",
+    "expires_date": "expires_date",
+    "description": "description",
+    "url": "url",
+}
+COMPANY_FIELDS = ("careers_url", "website", "industry")
+# Job columns a feed sets; a job is rewritten only when one of these differs
+JOB_COMPARED_FIELDS = (
+    "title", "department", "employment_type", "description", "location", "salary_range",
+    "experience_level", "posted_at", "expires_at", "source_url", "is_active",
+)
+
+
+def parse_feed(content: str, fmt: str = "json") -> List[Dict]:
+    """Feed content as a list of {"name", "careers_url", "website", "industry", "jobs": [...]}"""
+    if fmt == "json":
+        return json.loads(content)
+    if fmt != "csv":
+        raise ValueError(f"Unknown feed format: {fmt}")
+
+    companies: Dict[str, Dict] = {}
+    for row in csv.DictReader(io.StringIO(content)):
+        name = (row.get("company") or "").strip()
+        if not name:
+            continue
+        company = companies.setdefault(name, {"name": name, "jobs": []})
+        for field in COMPANY_FIELDS:
+            if row.get(field):
+                company[field] = row[field]
+        # A row without a title only describes the company
+        if (row.get("title") or "").strip():
+            company["jobs"].append({
+                field: row[column] for column, field in CSV_JOB_FIELDS.items() if row.get(column)
+            })
+    return list(companies.values())
+
+
+def read_feed(path: str) -> List[Dict]:
+    """Parse a feed file, choosing the format from its extension"""
+    fmt = "csv" if path.lower().endswith(".csv") else "json"
+    with open(path, newline="" if fmt == "csv" else None) as f:
+        return parse_feed(f.read(), fmt)
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _job_row(company_id: int, job: Dict, now: datetime, feed_id: Optional[int] = None) -> Dict:
+    expires_at = _parse_date(job.get("expires_date"))
+    return {
+        "company_id": company_id,
+        "external_id": str(job.get("id") or f"{job['title']}|{job.get('location') or ''}"),
+        "title": job["title"],
+        "department": job.get("department"),
+        "employment_type": job.get("type"),
+        "description": job.get("description"),
+        "location": job.get("location"),
+        "location_normalized": normalize_location(job.get("location")),
+        "salary_range": job.get("salary_range"),
+        "experience_level": job.get("experience_level"),
+        "posted_at": _parse_date(job.get("posted_date")),
+        "expires_at": expires_at,
+        "source_url": job.get("url"),
+        "feed_id": feed_id,
+        "is_active": expires_at is None or _comparable(expires_at) > now,  # listed already expired
+        "updated_at": now,
+    }
+
+
+def catalog_version(db: Session) -> int:
+    version = db.query(JobCatalogState.version).filter(JobCatalogState.id == CATALOG_STATE_ID).scalar()
+    return version or 0
+
+
+def bump_catalog_version(db: Session) -> None:
+    """Invalidate every cached listing; call inside the load's transaction"""
+    updated = db.query(JobCatalogState).filter(JobCatalogState.id == CATALOG_STATE_ID).update(
+        {JobCatalogState.version: JobCatalogState.version + 1}, synchronize_session=False
+    )
+    if not updated:
+        db.add(JobCatalogState(id=CATALOG_STATE_ID, version=1))
+
+
+def _comparable(value):
+    # Databases with timezone support hand back aware datetimes; feeds are parsed as naive UTC
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def apply_feed(db: Session, companies: List[Dict], deactivate_missing: bool = True,
+               feed_id: Optional[int] = None) -> Dict[str, int]:
+    """Diff a feed against the catalog and write only what changed; the caller commits.
+
+    Feed company names go through the company resolver, so "Google LLC" in a
+    feed lands on the same company as "Google" in connections. Jobs are keyed
+    by (company, the feed's job id): new jobs are inserted, changed ones updated, and
+    with deactivate_missing, active jobs of a feed company that the feed no
+    longer lists are marked inactive. Each job records the registered feed
+    that last wrote it (feed_id, None for file loads), and only jobs from the
+    same feed are deactivated, so an aggregator and a company's own feed
+    listing the same company leave each other's jobs alone. The catalog
+    version is only bumped when something changed.
+    """
+    now = datetime.utcnow()
+    company_ids = resolve_company_ids(db, (company["name"] for company in companies))
+
+    company_values = {}
+    job_rows = {}
+    for company in companies:
+        company_id = company_ids.get(company["name"])
+        if company_id is None:
+            continue
+        values = company_values.setdefault(company_id, {})
+        values.update({field: company[field] for field in COMPANY_FIELDS if company.get(field)})
+        for job in company.get("jobs", []):
+            row = _job_row(company_id, job, now, feed_id)
+            job_rows[(company_id, row["external_id"])] = row
+
+    stats = {"companies": len(company_values), "jobs": len(job_rows), "inserted": 0, "updated": 0,
+             "deactivated": 0, "unchanged": 0}
+    if not company_values:
+        return stats
+
+    ids = list(company_values)
+    company_updates = []
+    for company in db.query(Company.id, *(getattr(Company, field) for field in COMPANY_FIELDS)).filter(
+        Company.id.in_(ids)
+    ):
+        changed = {
+            field: value for field, value in company_values[company.id].items() if getattr(company, field) != value
+        }
+        if changed:
+            company_updates.append({"id": company.id, **changed})
+
+    existing = {
+        (job.company_id, job.external_id): job
+        for job in db.query(JobOpportunity.id, JobOpportunity.company_id, JobOpportunity.external_id,
+                            JobOpportunity.location_normalized, JobOpportunity.feed_id,
+                            *(getattr(JobOpportunity, field) for field in JOB_COMPARED_FIELDS)).filter(
+            JobOpportunity.company_id.in_(ids)
+        )
+    }
+    inserts, updates, replaced = [], [], []
+    for key, row in job_rows.items():
+        current = existing.get(key)
+        if current is None:
+            inserts.append(row)
+        elif any(_comparable(getattr(current, field)) != row[field] for field in JOB_COMPARED_FIELDS) or (
+            current.feed_id is None and feed_id is not None  # claims a job loaded before feeds were recorded
+        ):
+            updates.append({"id": current.id, **row})
+            replaced.append(current)
+        else:
+            stats["unchanged"] += 1
+    dropped = []
+    if deactivate_missing:
+        dropped = [
+            job for key, job in existing.items()
+            if job.is_active and key not in job_rows and job.feed_id == feed_id
+        ]
+    deactivations = [{"id": job.id, "is_active": False, "updated_at": now} for job in dropped]
+
+    # Facet counts follow jobs in and out of the active set
+    apply_facet_deltas(db, count_deltas(
+        added=[row for row in inserts + updates if row["is_active"]],
+        removed=[job for job in replaced if job.is_active] + dropped
+    ))
+
+    if company_updates:
+        db.bulk_update_mappings(Company, company_updates)
+    # Inserts tolerate a concurrent loader having added the same job first
+    bulk_upsert(db, JobOpportunity, inserts, key_columns=["company_id", "external_id"])
+    if updates or deactivations:
+        db.bulk_update_mappings(JobOpportunity, updates + deactivations)
+
+    stats.update(inserted=len(inserts), updated=len(updates), deactivated=len(deactivations))
+    if company_updates or inserts or updates or deactivations:
+        bump_catalog_version(db)
+    return stats
+
+
+def expire_jobs(db: Session, now: Optional[datetime] = None) -> int:
+    """Deactivate active jobs whose expiry has passed, with their facet counts; the caller commits"""
+    now = now or datetime.utcnow()
+    expired = db.query(
+        JobOpportunity.id, *(getattr(JobOpportunity, column) for column in FACETS.values())
+    ).filter(
+        JobOpportunity.is_active.is_(True), JobOpportunity.expires_at <= now
+    ).all()
+    if not expired:
+        return 0
+    apply_facet_deltas(db, count_deltas(removed=expired))
+    db.bulk_update_mappings(JobOpportunity, [
+        {"id": job.id, "is_active": False, "updated_at": now} for job in expired
+    ])
+    bump_catalog_version(db)
+    return len(expired)
+
+
+def default_careers_url(company_name: str) -> str:
+    """Careers search link for companies the catalog has no page for"""
+    return f"https://www.google.com/search?q={quote_plus(company_name)}+careers"
+
+
+def _job_dict(job: JobOpportunity) -> Dict:
+    return {
+        "id": job.id,
+        "title": job.title,
+        "department": job.department,
+        "location": job.location,
+        "type": job.employment_type,
+        "experience_level": job.experience_level,
+        "salary_range": job.salary_range,
+        "posted_date": job.posted_at.date().isoformat() if job.posted_at else None,
+        "description": job.description,
+        "url": job.source_url,
+    }
+
+
+class ListingCache:
+    """In-process LRU of per-company listings, valid for one catalog version"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._version = None
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, version: int, company_ids: Iterable[int]) -> Dict[int, Dict]:
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+                return {}
+            found = {}
+            for company_id in company_ids:
+                entry = self._entries.get(company_id)
+                if entry is not None:
+                    self._entries.move_to_end(company_id)
+                    found[company_id] = entry
+            return found
+
+    def set_many(self, version: int, entries: Dict[int, Dict]) -> None:
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries.update(entries)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+
+listing_cache = ListingCache(max_entries=settings.job_catalog_cache_size)
+
+
+def company_listings(db: Session, company_ids: Iterable[int]) -> Dict[int, Dict]:
+    """{"name", "careers_url", "jobs"} of each company, newest active jobs first"""
+    company_ids = set(company_ids)
+    if not company_ids:
+        return {}
+    version = catalog_version(db)
+    listings = listing_cache.get_many(version, company_ids)
+    missing = company_ids - set(listings)
+    if missing:
+        loaded = {
+            company.id: {
+                "name": company.name,
+                "careers_url": company.careers_url or default_careers_url(company.name),
+                "jobs": []
+            }
+            for company in db.query(Company.id, Company.name, Company.careers_url).filter(Company.id.in_(missing))
+        }
+        now = datetime.utcnow()
+        jobs = db.query(JobOpportunity).filter(
+            JobOpportunity.company_id.in_(list(loaded)),
+            JobOpportunity.is_active.is_(True),
+            (JobOpportunity.expires_at.is_(None)) | (JobOpportunity.expires_at > now)
+        ).order_by(JobOpportunity.posted_at.desc(), JobOpportunity.id)
+        for job in jobs:
+            loaded[job.company_id]["jobs"].append(_job_dict(job))
+        listing_cache.set_many(version, loaded)
+        listings.update(loaded)
+    return listings
+
+
+def company_listing(db: Session, company_id: int) -> Optional[Dict]:
+    return company_listings(db, [company_id]).get(company_id)
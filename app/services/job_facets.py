@@ -0,0 +1,108 @@
+"""
+Facet counts for job search.
+
+``job_facet_counts`` holds the number of active jobs per facet value (company,
+region, experience level, employment type). Catalog loads adjust it by the
+delta of the jobs they insert, change and deactivate, inside the same
+transaction, so search reads counts without grouping the jobs table.
+``rebuild_facet_counts`` recounts from scratch, for rows loaded before the
+counts existed or after manual edits.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List
+
+from sqlalchemy import String, cast, func
+from sqlalchemy.orm import Session
+
+from ..models.connection import Company, Connection, JobFacetCount, JobOpportunity
+from .locations import normalize_location
+
+# Facet name -> job column it counts
+FACETS = {
+    "company": "company_id",
+    "location": "location_normalized",
+    "experience_level": "experience_level",
+    "employment_type": "employment_type",
+}
+
+
+def facet_values(job) -> List[tuple]:
+    """(facet, value) pairs a job counts towards; job is a row or a mapping"""
+    pairs = []
+    for facet, column in FACETS.items():
+        value = job[column] if isinstance(job, dict) else getattr(job, column)
+        if value is not None and value != "":
+            pairs.append((facet, str(value)))
+    return pairs
+
+
+def count_deltas(added: Iterable = (), removed: Iterable = ()) -> Counter:
+    """Facet count changes from jobs becoming active (added) and inactive (removed)"""
+    deltas = Counter()
+    for job in added:
+        deltas.update(facet_values(job))
+    for job in removed:
+        deltas.subtract(facet_values(job))
+    return deltas
+
+
+def apply_facet_deltas(db: Session, deltas: Counter) -> None:
+    """Adjust stored counts; call inside the catalog write's transaction"""
+    for (facet, value), delta in deltas.items():
+        if not delta:
+            continue
+        updated = db.query(JobFacetCount).filter(
+            JobFacetCount.facet == facet, JobFacetCount.value == value
+        ).update({JobFacetCount.job_count: JobFacetCount.job_count + delta}, synchronize_session=False)
+        if not updated:
+            db.add(JobFacetCount(facet=facet, value=value, job_count=delta))
+    db.flush()
+
+
+def rebuild_facet_counts(db: Session) -> int:
+    """Recount every facet from the active jobs, normalizing locations that were never normalized"""
+    missing = db.query(JobOpportunity.location).filter(
+        JobOpportunity.location_normalized.is_(None), JobOpportunity.location.isnot(None)
+    ).distinct().all()
+    for (location,) in missing:
+        db.query(JobOpportunity).filter(
+            JobOpportunity.location == location, JobOpportunity.location_normalized.is_(None)
+        ).update({JobOpportunity.location_normalized: normalize_location(location)}, synchronize_session=False)
+
+    db.query(JobFacetCount).delete(synchronize_session=False)
+    rows = []
+    for facet, column_name in FACETS.items():
+        column = getattr(JobOpportunity, column_name)
+        for value, count in db.query(column, func.count(JobOpportunity.id)).filter(
+            JobOpportunity.is_active.is_(True), column.isnot(None), column != ""
+        ).group_by(column):
+            rows.append({"facet": facet, "value": str(value), "job_count": count})
+    db.bulk_insert_mappings(JobFacetCount, rows)
+    return len(rows)
+
+
+def read_facets(db: Session, limit: int = 20) -> Dict[str, List[Dict]]:
+    """Top values of every facet by active job count; company values carry the company name"""
+    facets = {}
+    for facet in FACETS:
+        rows = db.query(JobFacetCount.value, JobFacetCount.job_count).filter(
+            JobFacetCount.facet == facet, JobFacetCount.job_count > 0
+        ).order_by(JobFacetCount.job_count.desc(), JobFacetCount.value).limit(limit).all()
+        facets[facet] = [{"value": value, "count": count} for value, count in rows]
+
+    company_ids = [int(entry["value"]) for entry in facets["company"]]
+    names = dict(db.query(Company.id, Company.name).filter(Company.id.in_(company_ids))) if company_ids else {}
+    for entry in facets["company"]:
+        entry["name"] = names.get(int(entry["value"]))
+    return facets
+
+
+def connected_company_job_count(db: Session, user_id: int) -> int:
+    """Active jobs at companies where the user has connections, from the company facet"""
+    company_ids = db.query(cast(Connection.company_id, String)).filter(
+        Connection.user_id == user_id, Connection.company_id.isnot(None)
+    ).distinct()
+    return db.query(func.coalesce(func.sum(JobFacetCount.job_count), 0)).filter(
+        JobFacetCount.facet == "company", JobFacetCount.value.in_(company_ids)
+    ).scalar()
@@ -0,0 +1,218 @@
+"""
+Concurrent job feed ingestion.
+
+Feeds registered in ``job_feeds`` are fetched concurrently with asyncio and
+httpx. Each host gets its own connection pool and a rate limiter that spaces
+request starts, and a global semaphore caps fetches in flight. Requests carry
+the ETag and Last-Modified of the previous fetch, so an unchanged feed costs a
+304 and no parsing; for servers without validators, a body whose hash matches
+the last applied one is skipped too.
+
+Fetched feeds are applied one at a time on a worker thread while the other
+fetches continue, each in its own transaction, through
+``job_catalog.apply_feed``, which diffs the feed against the catalog and
+writes only new, changed and vanished jobs. Vanished means no longer listed
+by the same feed: feeds sharing a company do not deactivate each other's jobs.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.connection import JobFeed
+from .job_catalog import apply_feed, expire_jobs, parse_feed
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FeedSource:
+    id: int
+    url: str
+    format: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+@dataclass
+class FetchResult:
+    feed: FeedSource
+    status: int  # HTTP status, or 0 if the request failed
+    body: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    error: Optional[str] = None
+
+
+class HostRateLimiter:
+    """Spaces request starts to one host at most rate per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class FeedFetcher:
+    """Conditional GETs with a connection pool and rate limiter per host"""
+
+    def __init__(self, concurrency: int = None, host_connections: int = None, host_rate: float = None,
+                 timeout: float = None):
+        self.host_connections = host_connections or settings.job_feed_host_connections
+        self.host_rate = host_rate if host_rate is not None else settings.job_feed_host_rate
+        self.timeout = timeout or settings.job_feed_timeout_seconds
+        self._semaphore = asyncio.Semaphore(concurrency or settings.job_feed_concurrency)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._limiters: Dict[str, HostRateLimiter] = {}
+
+    def _for_host(self, url: str):
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        if host not in self._clients:
+            self._clients[host] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.host_connections, max_keepalive_connections=self.host_connections
+                ),
+                timeout=self.timeout,
+                follow_redirects=True
+            )
+            self._limiters[host] = HostRateLimiter(self.host_rate)
+        return self._clients[host], self._limiters[host]
+
+    async def fetch(self, feed: FeedSource) -> FetchResult:
+        client, limiter = self._for_host(feed.url)
+        headers = {}
+        if feed.etag:
+            headers["If-None-Match"] = feed.etag
+        if feed.last_modified:
+            headers["If-Modified-Since"] = feed.last_modified
+
+        async with self._semaphore:
+            await limiter.wait()
+            try:
+                response = await client.get(feed.url, headers=headers)
+            except httpx.HTTPError as e:
+                return FetchResult(feed, 0, error=str(e) or type(e).__name__)
+
+        if response.status_code == 304:
+            return FetchResult(feed, 304)
+        if response.status_code != 200:
+            return FetchResult(feed, response.status_code, error=f"HTTP {response.status_code}")
+        return FetchResult(
+            feed, 200,
+            body=response.text,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified")
+        )
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+
+
+def load_feed_sources(db, feed_ids: List[int] = None) -> List[FeedSource]:
+    query = db.query(JobFeed).filter(JobFeed.is_active.is_(True))
+    if feed_ids:
+        query = query.filter(JobFeed.id.in_(feed_ids))
+    return [
+        FeedSource(feed.id, feed.url, feed.format or "json", feed.etag, feed.last_modified)
+        for feed in query.order_by(JobFeed.id)
+    ]
+
+
+def store_result(result: FetchResult) -> Dict:
+    """Record a fetch on its feed row and apply a changed body to the catalog, in one transaction"""
+    outcome = {"feed_id": result.feed.id, "status": result.status}
+    db = SessionLocal()
+    try:
+        feed = db.query(JobFeed).filter(JobFeed.id == result.feed.id).one()
+        now = datetime.utcnow()
+        feed.last_fetched_at = now
+        feed.last_status = result.status
+
+        if result.error:
+            feed.last_error = result.error
+            outcome["outcome"] = "error"
+        elif result.status == 304:
+            feed.last_error = None
+            outcome["outcome"] = "not_modified"
+        else:
+            content_hash = hashlib.sha256(result.body.encode("utf-8")).hexdigest()
+            if content_hash == feed.content_hash:
+                outcome["outcome"] = "unchanged"
+            else:
+                outcome.update(apply_feed(db, parse_feed(result.body, feed.format or "json"), feed_id=feed.id))
+                outcome["outcome"] = "applied"
+                feed.content_hash = content_hash
+                feed.last_changed_at = now
+            feed.etag = result.etag
+            feed.last_modified = result.last_modified
+            feed.last_error = None
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Applying feed {result.feed.url} failed: {e}")
+        feed = db.query(JobFeed).filter(JobFeed.id == result.feed.id).first()
+        if feed:
+            feed.last_fetched_at = datetime.utcnow()
+            feed.last_status = result.status
+            feed.last_error = str(e)[:500]
+            db.commit()
+        outcome["outcome"] = "error"
+    finally:
+        db.close()
+    return outcome
+
+
+async def ingest_feeds(feeds: List[FeedSource], **fetcher_options) -> Dict:
+    """Fetch feeds concurrently and apply each one as it arrives; returns outcome and job counts"""
+    summary = {"feeds": len(feeds), "applied": 0, "unchanged": 0, "not_modified": 0, "error": 0,
+               "inserted": 0, "updated": 0, "deactivated": 0}
+    fetcher = FeedFetcher(**fetcher_options)
+    try:
+        pending = [asyncio.create_task(fetcher.fetch(feed)) for feed in feeds]
+        for next_result in asyncio.as_completed(pending):
+            result = await next_result
+            # One writer at a time; fetches keep running while it applies
+            outcome = await asyncio.to_thread(store_result, result)
+            summary[outcome["outcome"]] += 1
+            for key in ("inserted", "updated", "deactivated"):
+                summary[key] += outcome.get(key, 0)
+            if outcome["outcome"] == "error":
+                logger.warning(f"Feed {result.feed.url}: {result.error or 'apply failed'}")
+    finally:
+        await fetcher.aclose()
+    return summary
+
+
+def run_ingest(feed_ids: List[int] = None, **fetcher_options) -> Dict:
+    """Deactivate expired jobs, then fetch and apply all active feeds (or the given ones)"""
+    db = SessionLocal()
+    try:
+        expired = expire_jobs(db)
+        db.commit()
+        feeds = load_feed_sources(db, feed_ids)
+    finally:
+        db.close()
+    started = time.monotonic()
+    summary = asyncio.run(ingest_feeds(feeds, **fetcher_options))
+    summary["elapsed"] = time.monotonic() - started
+    summary["expired"] = expired
+    return summary
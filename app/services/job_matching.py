@@ -0,0 +1,240 @@
+"""
+Resume-to-job matching over the whole catalog.
+
+Every active job is reduced to terms (the canonical skills the skill extractor
+finds in its title and description, plus its title words) and the catalog is
+fitted once into a TF-IDF vectorizer and a sparse term-by-job matrix. A
+resume becomes a query vector from its extracted skills and past titles, and
+one sparse matrix-vector product scores it against every job at once; the
+network score of each job's company is blended in with array indexing, and
+the best jobs are picked with argpartition rather than a full sort.
+
+The index is cached per process for one (catalog version, taxonomy version).
+The first build happens in the request that needs it; after that a catalog
+or taxonomy change starts a rebuild on a background thread while requests
+keep using the previous index.
+"""
+
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sqlalchemy.orm import Session
+
+from ..core.database import SessionLocal
+from ..models.connection import Company, JobOpportunity
+from .job_catalog import catalog_version
+from .skills import skill_extractor, taxonomy_version
+
+logger = logging.getLogger(__name__)
+
+SKILL_WEIGHT = 60  # points for a perfect text match
+NETWORK_WEIGHT = 40  # points for a strong network at the company
+TITLE_WORDS = 6  # words of each past title used as query terms
+
+_WORD_RE = re.compile(r"[a-z][a-z0-9+#]*")
+_TITLE_STOP_WORDS = {"and", "at", "for", "in", "of", "the", "to", "with", "a", "an", "inc", "llc", "ltd", "corp"}
+
+
+def title_terms(title: str, limit: int = 0) -> List[str]:
+    words = [word for word in _WORD_RE.findall((title or "").lower()) if word not in _TITLE_STOP_WORDS]
+    return ["title:" + word for word in (words[:limit] if limit else words)]
+
+
+def network_score(connection_count: int, avg_strength: Optional[float]) -> float:
+    """Points for knowing people at a company: more and stronger connections score higher"""
+    total_strength = connection_count * (avg_strength or 3)
+    return min(total_strength * 8, NETWORK_WEIGHT)
+
+
+def _identity(terms):
+    return terms
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    if value is None:
+        return np.inf
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class JobMatchIndex:
+    """Fitted vectorizer and term-by-job TF-IDF matrix for one catalog version"""
+
+    def __init__(self, version: Tuple[int, int], job_ids: np.ndarray, company_codes: np.ndarray,
+                 companies: np.ndarray, industry_codes: np.ndarray, industries: List[str], expires: np.ndarray,
+                 vectorizer: Optional[TfidfVectorizer], matrix_t):
+        self.version = version
+        self.job_ids = job_ids
+        self.company_codes = company_codes  # position of each job's company in companies
+        self.companies = companies
+        self.industry_codes = industry_codes
+        self.industries = industries
+        self.expires = expires  # expiry timestamps, inf for none
+        self.vectorizer = vectorizer
+        self.matrix_t = matrix_t  # terms x jobs, CSR, rows of the query's terms are all a product touches
+        self._company_position = {int(company_id): code for code, company_id in enumerate(companies)}
+        self._terms = vectorizer.get_feature_names_out() if vectorizer is not None else np.array([])
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    @classmethod
+    def build(cls, db: Session, version: Tuple[int, int]) -> "JobMatchIndex":
+        started = time.perf_counter()
+        extractor = skill_extractor(db)
+        rows = db.query(
+            JobOpportunity.id,
+            JobOpportunity.company_id,
+            JobOpportunity.title,
+            JobOpportunity.description,
+            JobOpportunity.expires_at,
+            Company.industry
+        ).join(Company, Company.id == JobOpportunity.company_id).filter(
+            JobOpportunity.is_active.is_(True)
+        ).order_by(JobOpportunity.id).all()
+
+        documents = [
+            ["skill:" + skill for skill in extractor.extract(f"{row.title}\n{row.description or ''}")]
+            + title_terms(row.title)
+            for row in rows
+        ]
+        companies, company_codes = np.unique(np.array([row.company_id for row in rows], dtype=np.int64),
+                                             return_inverse=True)
+        industries = sorted({row.industry or "other" for row in rows})
+        industry_position = {industry: code for code, industry in enumerate(industries)}
+
+        vectorizer = None
+        matrix_t = None
+        if any(documents):
+            vectorizer = TfidfVectorizer(analyzer=_identity, dtype=np.float32)
+            matrix_t = vectorizer.fit_transform(documents).T.tocsr()
+
+        index = cls(
+            version=version,
+            job_ids=np.array([row.id for row in rows], dtype=np.int64),
+            company_codes=company_codes.astype(np.int32),
+            companies=companies,
+            industry_codes=np.array([industry_position[row.industry or "other"] for row in rows], dtype=np.int32),
+            industries=industries,
+            expires=np.array([_timestamp(row.expires_at) for row in rows], dtype=np.float64),
+            vectorizer=vectorizer,
+            matrix_t=matrix_t
+        )
+        logger.info(f"Built job match index v{version} over {len(rows)} jobs, "
+                    f"{len(index._terms)} terms in {time.perf_counter() - started:.1f}s")
+        return index
+
+    def query(self, skills: Sequence[str], titles: Sequence[str] = ()):
+        """1 x terms TF-IDF vector of a resume's skills and past titles"""
+        terms = ["skill:" + skill for skill in skills or []]
+        for title in titles or []:
+            terms.extend(title_terms(title, TITLE_WORDS))
+        return self.vectorizer.transform([terms])
+
+    def match(self, skills: Sequence[str], titles: Sequence[str], company_network: Dict[int, float],
+              industry: Optional[str] = None, min_score: float = 0, limit: int = 50):
+        """Top jobs by blended score; returns ([(job id, total, skill, network, matched skills)], total matches)"""
+        if self.vectorizer is None or not len(self.job_ids):
+            return [], 0
+        query = self.query(skills, titles)
+        if not query.nnz:
+            similarity = np.zeros(len(self.job_ids), dtype=np.float32)
+        else:
+            similarity = (query @ self.matrix_t).toarray().ravel()
+
+        network_by_company = np.zeros(len(self.companies), dtype=np.float32)
+        for company_id, score in company_network.items():
+            position = self._company_position.get(company_id)
+            if position is not None:
+                network_by_company[position] = score
+        skill_scores = similarity * SKILL_WEIGHT
+        network_scores = network_by_company[self.company_codes]
+        totals = np.minimum(skill_scores + network_scores, 100)
+
+        eligible = self.expires > time.time()
+        if industry:
+            if industry not in self.industries:
+                return [], 0
+            eligible &= self.industry_codes == self.industries.index(industry)
+        candidates = np.flatnonzero(eligible & (totals >= min_score))
+        total_matches = len(candidates)
+        if total_matches > limit:
+            candidates = candidates[np.argpartition(-totals[candidates], limit - 1)[:limit]]
+        # Best first; ties go to the newer job
+        candidates = candidates[np.lexsort((-self.job_ids[candidates], -totals[candidates]))]
+
+        matched = self._matched_skills(candidates, query.indices)
+        return [
+            (int(self.job_ids[position]), float(totals[position]), float(skill_scores[position]),
+             float(network_scores[position]), matched[i])
+            for i, position in enumerate(candidates)
+        ], total_matches
+
+    def _matched_skills(self, positions: np.ndarray, query_terms: np.ndarray) -> List[List[str]]:
+        """Skills each job shares with the query, read from the query's rows of the matrix only"""
+        if not len(positions) or not len(query_terms):
+            return [[] for _ in positions]
+        query_terms = np.sort(query_terms)
+        shared = self.matrix_t[query_terms][:, positions].tocsc()
+        matched = []
+        for column in range(len(positions)):
+            terms = self._terms[query_terms[shared.indices[shared.indptr[column]:shared.indptr[column + 1]]]]
+            matched.append([term[len("skill:"):] for term in terms if term.startswith("skill:")])
+        return matched
+
+
+class JobMatcher:
+    """Process-wide JobMatchIndex for the current catalog, rebuilt in the background when it changes"""
+
+    def __init__(self):
+        self._index: Optional[JobMatchIndex] = None
+        self._lock = threading.Lock()
+        self._building: Optional[Tuple[int, int]] = None
+
+    def index(self, db: Session) -> JobMatchIndex:
+        version = (catalog_version(db), taxonomy_version(db))
+        index = self._index
+        if index is not None and index.version == version:
+            return index
+        if index is None:
+            with self._lock:
+                if self._index is None or self._index.version != version:
+                    self._index = JobMatchIndex.build(db, version)
+                return self._index
+        self._rebuild_in_background(version)
+        return index
+
+    def _rebuild_in_background(self, version: Tuple[int, int]) -> None:
+        with self._lock:
+            if self._building is not None:
+                return
+            self._building = version
+        threading.Thread(target=self._rebuild, args=(version,), name="job-match-index", daemon=True).start()
+
+    def _rebuild(self, version: Tuple[int, int]) -> None:
+        db = SessionLocal()
+        try:
+            index = JobMatchIndex.build(db, version)
+            with self._lock:
+                if self._index is None or self._index.version < version:
+                    self._index = index
+        except Exception as e:
+            logger.error(f"Rebuilding the job match index failed: {e}")
+        finally:
+            db.close()
+            with self._lock:
+                self._building = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = None
+
+
+job_matcher = JobMatcher()
@@ -0,0 +1,221 @@
+"""
+Job search over the catalog.
+
+Results are filtered by text, region, experience level, employment type,
+company and "has connections at company", newest first, and paged with a
+keyset cursor on (posted_at, id) so every page costs the same however deep it
+is. Facet counts come from ``job_facet_counts`` (see job_facets.py) and are not
+recomputed per request; they cover the whole active catalog.
+
+Text search matches every word of the query as a word prefix ("man" finds
+"manager", not "performance"). SQLite uses an FTS5 index over title,
+department and description, kept in sync by triggers; PostgreSQL uses a GIN
+index over their to_tsvector('simple', ...) document, queried with prefix
+tsqueries ("man:*"), so both give the same results. Other databases fall back
+to an ILIKE substring match.
+"""
+
+import base64
+import json
+import logging
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.orm import Session
+
+from ..models.connection import Company, Connection, JobOpportunity
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "job_opportunities_fts"
+TSV_INDEX = "ix_job_opportunities_search_tsv"
+TRGM_INDEX = "ix_job_opportunities_search_trgm"  # substring index used before TSV_INDEX; dropped when found
+# The filter must repeat the index expression for PostgreSQL to use the index
+_TSV_DOCUMENT = (
+    "to_tsvector('simple', {table}title || ' ' || coalesce({table}department, '') || ' ' || "
+    "coalesce({table}description, ''))"
+)
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, department, description,
+        content='job_opportunities', content_rowid='id', prefix='2 3 4'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_opportunities_fts_insert AFTER INSERT ON job_opportunities BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, department, description)
+        VALUES (new.id, new.title, new.department, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_opportunities_fts_delete AFTER DELETE ON job_opportunities BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, department, description)
+        VALUES ('delete', old.id, old.title, old.department, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS job_opportunities_fts_update
+        AFTER UPDATE OF title, department, description ON job_opportunities BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, department, description)
+        VALUES ('delete', old.id, old.title, old.department, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, department, description)
+        VALUES (new.id, new.title, new.department, new.description);
+    END""",
+]
+
+_available: Dict[str, bool] = {}
+
+
+def ensure_job_search_index(bind) -> bool:
+    """Create the job text index and its sync triggers if missing; returns False if unsupported"""
+    dialect = bind.dialect.name
+    try:
+        if dialect == "sqlite":
+            with bind.begin() as conn:
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+                ).first()
+                for statement in _SQLITE_DDL:
+                    conn.execute(text(statement))
+                if not exists:
+                    # Index rows written before the table existed
+                    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        elif dialect == "postgresql":
+            with bind.begin() as conn:
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS {TSV_INDEX} ON job_opportunities USING gin "
+                    f"({_TSV_DOCUMENT.format(table='')})"
+                ))
+                conn.execute(text(f"DROP INDEX IF EXISTS {TRGM_INDEX}"))
+        else:
+            _available[dialect] = False
+            return False
+    except (OperationalError, ProgrammingError) as e:
+        logger.warning(f"Job search index unavailable on {dialect}, falling back to ILIKE: {e}")
+        _available[dialect] = False
+        return False
+    _available[dialect] = True
+    return True
+
+
+def _terms(query: str) -> List[str]:
+    return [term.lower() for term in re.findall(r"\w+", query or "")]
+
+
+def text_filter(db: Session, query: str):
+    """Filter clause on JobOpportunity matching every word of query as a prefix"""
+    dialect = db.get_bind().dialect.name
+    terms = _terms(query)
+    if terms and _available.get(dialect) and dialect == "sqlite":
+        return JobOpportunity.id.in_(
+            text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query").bindparams(
+                fts_query=" ".join(f'"{term}"*' for term in terms)
+            )
+        )
+    if terms and _available.get(dialect) and dialect == "postgresql":
+        return text(
+            f"{_TSV_DOCUMENT.format(table='job_opportunities.')} @@ to_tsquery('simple', :ts_query)"
+        ).bindparams(ts_query=" & ".join(f"'{term}':*" for term in terms))
+    pattern = f"%{query}%"
+    return or_(JobOpportunity.title.ilike(pattern), JobOpportunity.description.ilike(pattern))
+
+
+def encode_cursor(posted_at: Optional[datetime], job_id: int) -> str:
+    payload = json.dumps([posted_at.isoformat() if posted_at else None, job_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """(posted_at, id) of the last job on the previous page; raises ValueError if malformed"""
+    try:
+        posted_at, job_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return (datetime.fromisoformat(posted_at) if posted_at else None), int(job_id)
+    except (TypeError, ValueError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _after(posted_at: Optional[datetime], job_id: int):
+    """Jobs that sort after (posted_at, id) in newest-first order, undated jobs last"""
+    if posted_at is None:
+        return and_(JobOpportunity.posted_at.is_(None), JobOpportunity.id < job_id)
+    return or_(
+        JobOpportunity.posted_at < posted_at,
+        and_(JobOpportunity.posted_at == posted_at, JobOpportunity.id < job_id),
+        JobOpportunity.posted_at.is_(None)
+    )
+
+
+def search_jobs(db: Session, user_id: int, query: Optional[str] = None, location: Optional[str] = None,
+                experience_level: Optional[str] = None, employment_type: Optional[str] = None,
+                company_id: Optional[int] = None, has_connections: bool = False,
+                cursor: Optional[str] = None, limit: int = 20) -> Tuple[List[Dict], Optional[str]]:
+    """One page of active jobs matching every given filter, and the cursor of the next page"""
+    now = datetime.utcnow()
+    jobs = db.query(
+        JobOpportunity.id,
+        JobOpportunity.title,
+        JobOpportunity.company_id,
+        Company.name.label("company_name"),
+        JobOpportunity.department,
+        JobOpportunity.location,
+        JobOpportunity.location_normalized,
+        JobOpportunity.experience_level,
+        JobOpportunity.employment_type,
+        JobOpportunity.salary_range,
+        JobOpportunity.posted_at,
+        JobOpportunity.source_url
+    ).join(Company, Company.id == JobOpportunity.company_id).filter(
+        JobOpportunity.is_active.is_(True),
+        or_(JobOpportunity.expires_at.is_(None), JobOpportunity.expires_at > now)
+    )
+
+    if query and query.strip():
+        jobs = jobs.filter(text_filter(db, query))
+    if location:
+        jobs = jobs.filter(JobOpportunity.location_normalized == location)
+    if experience_level:
+        jobs = jobs.filter(JobOpportunity.experience_level == experience_level)
+    if employment_type:
+        jobs = jobs.filter(JobOpportunity.employment_type == employment_type)
+    if company_id:
+        jobs = jobs.filter(JobOpportunity.company_id == company_id)
+    if has_connections:
+        jobs = jobs.filter(JobOpportunity.company_id.in_(
+            db.query(Connection.company_id).filter(
+                Connection.user_id == user_id, Connection.company_id.isnot(None)
+            ).distinct()
+        ))
+    if cursor:
+        jobs = jobs.filter(_after(*decode_cursor(cursor)))
+
+    rows = jobs.order_by(
+        JobOpportunity.posted_at.desc().nulls_last(), JobOpportunity.id.desc()
+    ).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].posted_at, rows[limit - 1].id) if len(rows) > limit else None
+    rows = rows[:limit]
+
+    # How many of the user's connections work at each company on this page
+    connection_counts = {}
+    company_ids = {row.company_id for row in rows}
+    if company_ids:
+        connection_counts = dict(db.query(Connection.company_id, func.count(Connection.id)).filter(
+            Connection.user_id == user_id, Connection.company_id.in_(company_ids)
+        ).group_by(Connection.company_id).all())
+
+    results = [
+        {
+            "id": row.id,
+            "title": row.title,
+            "company_id": row.company_id,
+            "company_name": row.company_name,
+            "department": row.department,
+            "location": row.location,
+            "region": row.location_normalized,
+            "experience_level": row.experience_level,
+            "type": row.employment_type,
+            "salary_range": row.salary_range,
+            "posted_date": row.posted_at.date().isoformat() if row.posted_at else None,
+            "url": row.source_url,
+            "network_connections": connection_counts.get(row.company_id, 0)
+        }
+        for row in rows
+    ]
+    return results, next_cursor
@@ -0,0 +1,74 @@
+"""
+Multi-keyword matching with an Aho-Corasick automaton.
+
+All keywords are compiled once into a trie with failure links, so a text is
+scanned in a single pass however many keywords there are. Matches must sit on
+word boundaries: the characters either side of a match may not be letters or
+digits, so "ey" does not match inside "Disney".
+"""
+
+from collections import deque
+from typing import Dict, Hashable, Iterable, Iterator, List, Tuple
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum()
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over lowercase keywords mapped to values"""
+
+    def __init__(self, keywords: Iterable[Tuple[str, Hashable]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Hashable]]] = [[]]  # (keyword length, value) ending at a state
+
+        for keyword, value in keywords:
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state].append((len(keyword), value))
+
+        # Breadth-first failure links; each state inherits the outputs of its fallback
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def find(self, text: str) -> Iterator[Tuple[int, int, Hashable]]:
+        """(start, end, value) for every keyword in lowercase text that sits on word boundaries"""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        length = len(text)
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            end = position + 1
+            if end < length and _is_word_char(text[end]):
+                continue
+            for keyword_length, value in output[state]:
+                start = end - keyword_length
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    yield start, end, value
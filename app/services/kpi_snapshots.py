@@ -0,0 +1,214 @@
+"""
+Precomputed admin KPIs.
+
+The whole-table counts and distributions behind the admin dashboard are
+computed by scripts/refresh_kpi_snapshots.py and stored as JSON in
+``admin_kpi_snapshots``, one row per snapshot name. Admin endpoints read the
+stored row and only recompute on request (``?fresh=true``) or when no
+snapshot exists yet. Platform stats are a single grouped query and are served
+live.
+"""
+
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Tuple
+
+from sqlalchemy import case, desc, func
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import bulk_upsert
+from ..models.analytics import AdminKpiSnapshot
+from ..models.connection import Connection
+from ..models.user import Platform, User, UserPlatformAccount
+from .timeseries import bucket_counts, floor_bucket
+
+
+def compute_dashboard_overview(db: Session) -> Dict:
+    now = datetime.utcnow()
+    total_users = db.query(func.count(User.id)).scalar()
+    active_users = db.query(func.count(User.id)).filter(User.updated_at >= now - timedelta(days=30)).scalar()
+    start_of_month = floor_bucket(now, "month")
+    new_users_this_month = db.query(func.count(User.id)).filter(User.created_at >= start_of_month).scalar()
+    total_connections = db.query(func.count(Connection.id)).scalar()
+    new_connections_this_month = db.query(func.count(Connection.id)).filter(
+        Connection.created_at >= start_of_month
+    ).scalar()
+
+    platform_stats = db.query(
+        Platform.name,
+        func.count(UserPlatformAccount.id).label('connected_users')
+    ).join(UserPlatformAccount).group_by(Platform.name).all()
+
+    # User growth over the last 12 calendar months, oldest to newest
+    growth_start = start_of_month
+    for _ in range(11):
+        growth_start = floor_bucket(growth_start - timedelta(days=1), "month")
+
+    return {
+        "total_users": total_users,
+        "active_users": active_users,
+        "new_users_this_month": new_users_this_month,
+        "total_connections": total_connections,
+        "new_connections_this_month": new_connections_this_month,
+        "platform_distribution": [
+            {"platform": stat.name, "users": stat.connected_users}
+            for stat in platform_stats
+        ],
+        "user_growth": [
+            {"month": month, "new_users": count}
+            for month, count in bucket_counts(db, User.created_at, growth_start, now, interval="month")
+        ],
+        "activity_rate": round((active_users / total_users * 100) if total_users > 0 else 0, 1)
+    }
+
+
+def compute_user_distributions(db: Session) -> Dict:
+    subscription_stats = db.query(
+        User.subscription_tier,
+        func.count(User.id).label('count')
+    ).group_by(User.subscription_tier).all()
+
+    status_stats = db.query(
+        User.is_active,
+        User.is_verified,
+        func.count(User.id).label('count')
+    ).group_by(User.is_active, User.is_verified).all()
+
+    users_with_connections, total_connections = db.query(
+        func.count(func.distinct(Connection.user_id)), func.count(Connection.id)
+    ).one()
+
+    return {
+        "subscription_distribution": [
+            {"tier": stat.subscription_tier, "count": stat.count}
+            for stat in subscription_stats
+        ],
+        "user_status": [
+            {"active": stat.is_active, "verified": stat.is_verified, "count": stat.count}
+            for stat in status_stats
+        ],
+        "average_connections_per_user": round(total_connections / users_with_connections, 2) if users_with_connections else 0
+    }
+
+
+def compute_connection_distributions(db: Session) -> Dict:
+    platform_connections = db.query(
+        Platform.name,
+        func.count(Connection.id).label('count')
+    ).join(Connection).group_by(Platform.name).all()
+
+    top_users = db.query(
+        User.username,
+        User.first_name,
+        User.last_name,
+        func.count(Connection.id).label('connection_count')
+    ).join(Connection).group_by(
+        User.id, User.username, User.first_name, User.last_name
+    ).order_by(desc('connection_count')).limit(10).all()
+
+    strength_distribution = db.query(
+        Connection.relationship_strength,
+        func.count(Connection.id).label('count')
+    ).group_by(Connection.relationship_strength).all()
+
+    return {
+        "platform_distribution": [
+            {"platform": stat.name, "connections": stat.count}
+            for stat in platform_connections
+        ],
+        "top_users_by_connections": [
+            {
+                "username": user.username,
+                "name": f"{user.first_name} {user.last_name}",
+                "connection_count": user.connection_count
+            }
+            for user in top_users
+        ],
+        "relationship_strength_distribution": [
+            {"strength": stat.relationship_strength, "count": stat.count}
+            for stat in strength_distribution
+        ]
+    }
+
+
+def compute_platform_stats(db: Session) -> Dict:
+    """Per-platform account and connection totals.
+
+    Accounts and connections are aggregated in separate subqueries and joined
+    one row per platform, so neither count is multiplied by the other.
+    """
+    recent_cutoff = datetime.utcnow() - timedelta(days=30)
+    accounts = db.query(
+        UserPlatformAccount.platform_id.label("platform_id"),
+        func.count(UserPlatformAccount.id).label("connected_users"),
+        func.sum(case((UserPlatformAccount.last_sync_at >= recent_cutoff, 1), else_=0)).label("recent_connections")
+    ).group_by(UserPlatformAccount.platform_id).subquery()
+    connections = db.query(
+        Connection.platform_id.label("platform_id"),
+        func.count(Connection.id).label("total_connections")
+    ).group_by(Connection.platform_id).subquery()
+
+    platform_stats = db.query(
+        Platform.id,
+        Platform.name,
+        func.coalesce(accounts.c.connected_users, 0).label("connected_users"),
+        func.coalesce(connections.c.total_connections, 0).label("total_connections"),
+        func.coalesce(accounts.c.recent_connections, 0).label("recent_connections")
+    ).outerjoin(accounts, accounts.c.platform_id == Platform.id).outerjoin(
+        connections, connections.c.platform_id == Platform.id
+    ).order_by(Platform.id).all()
+
+    return {
+        "platform_overview": [
+            {
+                "platform_id": stat.id,
+                "platform_name": stat.name,
+                "connected_users": stat.connected_users,
+                "total_connections": stat.total_connections,
+                "recent_connections": stat.recent_connections
+            }
+            for stat in platform_stats
+        ],
+        "total_platforms": len(platform_stats),
+        "most_popular_platform": max(platform_stats, key=lambda x: x.connected_users).name if platform_stats else None
+    }
+
+
+SNAPSHOTS: Dict[str, Callable[[Session], Dict]] = {
+    "dashboard_overview": compute_dashboard_overview,
+    "user_distributions": compute_user_distributions,
+    "connection_distributions": compute_connection_distributions,
+}
+
+
+def refresh_snapshot(db: Session, name: str) -> Tuple[Dict, datetime]:
+    """Recompute and store one snapshot; the caller commits"""
+    payload = SNAPSHOTS[name](db)
+    computed_at = datetime.utcnow()
+    bulk_upsert(db, AdminKpiSnapshot, [
+        {"name": name, "payload": payload, "computed_at": computed_at}
+    ], key_columns=["name"])
+    return payload, computed_at
+
+
+def get_snapshot(db: Session, name: str, fresh: bool = False) -> Tuple[Dict, datetime]:
+    """(payload, computed_at) of a snapshot, recomputing it if asked to or if it was never built"""
+    if not fresh:
+        row = db.query(AdminKpiSnapshot.payload, AdminKpiSnapshot.computed_at).filter(
+            AdminKpiSnapshot.name == name
+        ).first()
+        if row:
+            return row.payload, row.computed_at
+    payload, computed_at = refresh_snapshot(db, name)
+    db.commit()
+    return payload, computed_at
+
+
+def snapshot_headers(computed_at: datetime) -> Dict[str, str]:
+    """Response headers describing how old a snapshot is"""
+    age = max(int((datetime.utcnow() - computed_at).total_seconds()), 0)
+    return {
+        "X-Data-As-Of": computed_at.isoformat() + "Z",
+        "Age": str(age),
+        "X-Data-Stale": "true" if age > settings.kpi_snapshot_max_age_seconds else "false"
+    }
@@ -0,0 +1,102 @@
+"""
+Location normalization for free-text connection locations.
+
+The gazetteer (app/data/locations.json) maps canonical regions to aliases and
+is compiled once into a hash index of token phrases. Results are memoized per
+raw string, since a network has far fewer distinct locations than rows.
+
+Ambiguous place names are listed with a qualifier ("cambridge, ma", "portland,
+oregon") and only match when a later comma-separated part of the location
+contains it, so "Cambridge, United Kingdom" and "Portland, ME" are not taken
+for Boston and Portland, Oregon. A part that is just a US state code ("LA",
+"DC") is only ever a qualifier, never a place.
+"""
+
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "locations.json")
+UNKNOWN_LOCATION = "Other"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+Phrase = Tuple[str, ...]
+
+US_STATE_CODES = frozenset("""
+    al ak az ar ca co ct de dc fl ga hi id il in ia ks ky la me md ma mi mn ms mo mt ne nv nh nj nm ny nc nd
+    oh ok or pa ri sc sd tn tx ut vt va wa wv wi wy pr
+""".split())
+
+
+def _tokens(text: str) -> Phrase:
+    return tuple(_TOKEN_RE.findall(text.lower()))
+
+
+@lru_cache(maxsize=1)
+def _load_index() -> Tuple[Dict[Phrase, str], Dict[Phrase, List[Tuple[Phrase, str]]], int]:
+    """Compile the gazetteer into {alias tokens: canonical name}, {place tokens: [(qualifier tokens, canonical)]}
+    for qualified aliases, and the longest alias length"""
+    with open(GAZETTEER_PATH) as f:
+        gazetteer = json.load(f)
+
+    index = {}
+    qualified = {}
+    for canonical, aliases in gazetteer.items():
+        for alias in aliases:
+            if "," in alias:
+                place, qualifier = alias.split(",", 1)
+                qualified.setdefault(_tokens(place), []).append((_tokens(qualifier), canonical))
+                index.setdefault(_tokens(place) + _tokens(qualifier), canonical)  # "arlington va"
+    for canonical, aliases in gazetteer.items():
+        for alias in [canonical] + aliases:
+            key = _tokens(alias)
+            # A name listed with a qualifier is only accepted with one
+            if key and "," not in alias and key not in qualified:
+                index.setdefault(key, canonical)
+    return index, qualified, max(len(key) for key in list(index) + list(qualified))
+
+
+def _contains(tokens: Sequence[str], phrase: Sequence[str]) -> bool:
+    return any(tuple(tokens[start:start + len(phrase)]) == tuple(phrase) for start in range(len(tokens) - len(phrase) + 1))
+
+
+@lru_cache(maxsize=65536)
+def normalize_location(raw: Optional[str]) -> Optional[str]:
+    """Map a raw location string to a canonical region, UNKNOWN_LOCATION, or None if blank"""
+    if not raw or not raw.strip():
+        return None
+
+    index, qualified, max_len = _load_index()
+    segments = [_tokens(part) for part in raw.split(",")]
+
+    def lookup(key, position):
+        if key in index:
+            return index[key]
+        for qualifier, canonical in qualified.get(key, ()):
+            if any(_contains(later, qualifier) for later in segments[position + 1:]):
+                return canonical
+        return None
+
+    # Exact matches on the whole string, then on each comma-separated part
+    if _tokens(raw) in index:
+        return index[_tokens(raw)]
+    places = [
+        (position, tokens) for position, tokens in enumerate(segments)
+        if tokens and not (len(tokens) == 1 and tokens[0] in US_STATE_CODES)
+    ]
+    for position, tokens in places:
+        canonical = lookup(tokens, position)
+        if canonical:
+            return canonical
+
+    # Longest alias phrase found anywhere, scanning segments left to right (city before state)
+    for position, tokens in places:
+        for size in range(min(max_len, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                canonical = lookup(tokens[start:start + size], position)
+                if canonical:
+                    return canonical
+
+    return UNKNOWN_LOCATION
@@ -0,0 +1,97 @@
+"""
+Network health metrics computed set-wise for any number of users.
+
+``compute_network_metrics`` aggregates connections for a whole chunk of users
+in one GROUP BY (user, company) query plus one rollup query for growth, so the
+API and the nightly batch job share the same scoring with O(1) round trips per
+chunk.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+
+from ..models.analytics import ConnectionDailyRollup
+from ..models.connection import Connection
+from .industries import classify_industry
+
+SENIOR_TITLE_KEYWORDS = ['senior', 'director', 'vp', 'vice president', 'head', 'lead', 'manager']
+GROWTH_WINDOW_DAYS = 30
+
+
+def score_network(network_size: int, total_strength: int, industries_count: int) -> Dict[str, int]:
+    """Turn raw network aggregates into 0-100 scores"""
+    if network_size == 0:
+        return {"health_score": 0, "diversity_score": 0, "strength_score": 0}
+
+    diversity_score = min(industries_count * 8, 100)  # Cap at 100
+    strength_score = min((total_strength / network_size) * 10, 100)
+    size_score = min(network_size * 2, 100)  # 50 connections = 100 score
+
+    # Overall health score (weighted average)
+    health_score = round(diversity_score * 0.3 + strength_score * 0.4 + size_score * 0.3)
+    return {
+        "health_score": health_score,
+        "diversity_score": round(diversity_score),
+        "strength_score": round(strength_score)
+    }
+
+
+def compute_network_metrics(db: Session, user_ids: List[int]) -> Dict[int, Dict]:
+    """NetworkAnalytics column values for every user in user_ids"""
+    title = func.lower(func.coalesce(Connection.connection_title, ""))
+    is_senior = case(
+        (or_(*[title.like(f"%{keyword}%") for keyword in SENIOR_TITLE_KEYWORDS]), 1),
+        else_=0
+    )
+    rows = db.query(
+        Connection.user_id,
+        Connection.connection_company,
+        func.count(Connection.id).label("connections"),
+        func.sum(func.coalesce(Connection.relationship_strength, 5)).label("strength"),
+        func.sum(is_senior).label("senior")
+    ).filter(
+        Connection.user_id.in_(user_ids)
+    ).group_by(Connection.user_id, Connection.connection_company).all()
+
+    totals = {user_id: {"size": 0, "strength": 0, "senior": 0, "companies": set(), "industries": set()}
+              for user_id in user_ids}
+    for row in rows:
+        user = totals[row.user_id]
+        user["size"] += row.connections
+        user["strength"] += row.strength or 0
+        user["senior"] += row.senior or 0
+        if row.connection_company:
+            user["companies"].add(row.connection_company)
+            user["industries"].add(classify_industry(row.connection_company))
+
+    # Net change over the growth window, from rollups; the baseline is size minus that change
+    window_start = datetime.utcnow().date() - timedelta(days=GROWTH_WINDOW_DAYS - 1)
+    deltas = dict(db.query(
+        ConnectionDailyRollup.user_id,
+        func.sum(ConnectionDailyRollup.added - ConnectionDailyRollup.removed)
+    ).filter(
+        ConnectionDailyRollup.user_id.in_(user_ids),
+        ConnectionDailyRollup.day >= window_start
+    ).group_by(ConnectionDailyRollup.user_id).all())
+
+    metrics = {}
+    for user_id, user in totals.items():
+        baseline = user["size"] - (deltas.get(user_id) or 0)
+        if baseline > 0:
+            growth_rate = round((user["size"] - baseline) / baseline * 100, 1)
+        else:
+            growth_rate = 100.0 if user["size"] > 0 else 0.0
+
+        metrics[user_id] = {
+            "user_id": user_id,
+            **score_network(user["size"], user["strength"], len(user["industries"])),
+            "network_size": user["size"],
+            "industries_count": len(user["industries"]),
+            "companies_count": len(user["companies"]),
+            "senior_connections": user["senior"],
+            "growth_rate": growth_rate
+        }
+    return metrics
@@ -0,0 +1,139 @@
+"""
+Daily connection rollups.
+
+One row per user per day holding connections added, removed and the network
+size at the end of the day. Write paths keep today's row current, so growth
+charts read O(days) pre-aggregated rows instead of scanning connections.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.database import insert_or_increment
+from ..models.analytics import ConnectionDailyRollup
+from ..models.connection import Connection
+
+
+def record_daily_change(db: Session, user_id: int, added: int = 0, removed: int = 0,
+                        day: Optional[date] = None) -> None:
+    """Apply a connection count change to the user's rollup row for the day"""
+    day = day or datetime.utcnow().date()
+    delta = added - removed
+
+    updated = db.query(ConnectionDailyRollup).filter(
+        ConnectionDailyRollup.user_id == user_id,
+        ConnectionDailyRollup.day == day
+    ).update({
+        ConnectionDailyRollup.added: ConnectionDailyRollup.added + added,
+        ConnectionDailyRollup.removed: ConnectionDailyRollup.removed + removed,
+        ConnectionDailyRollup.cumulative: ConnectionDailyRollup.cumulative + delta
+    }, synchronize_session=False)
+
+    if not updated:
+        # First change of the day: seed from the previous day, and if a concurrent write
+        # created the row meanwhile, add to it instead
+        insert_or_increment(db, ConnectionDailyRollup, {
+            "user_id": user_id,
+            "day": day,
+            "added": added,
+            "removed": removed,
+            "cumulative": _cumulative_before(db, user_id, day) + delta
+        }, ["user_id", "day"], {"added": added, "removed": removed, "cumulative": delta})
+
+
+def _cumulative_before(db: Session, user_id: int, day: date) -> int:
+    """Network size at the end of the latest rolled-up day before ``day``"""
+    cumulative = db.query(ConnectionDailyRollup.cumulative).filter(
+        ConnectionDailyRollup.user_id == user_id,
+        ConnectionDailyRollup.day < day
+    ).order_by(ConnectionDailyRollup.day.desc()).limit(1).scalar()
+    return cumulative or 0
+
+
+def get_daily_series(db: Session, user_id: int, start: date, end: date) -> List[Dict]:
+    """Zero-filled daily series between start and end (inclusive) with carried-forward network size"""
+    rows = db.query(ConnectionDailyRollup).filter(
+        ConnectionDailyRollup.user_id == user_id,
+        ConnectionDailyRollup.day >= start,
+        ConnectionDailyRollup.day <= end
+    ).order_by(ConnectionDailyRollup.day).all()
+    by_day = {row.day: row for row in rows}
+
+    cumulative = _cumulative_before(db, user_id, start)
+    series = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        row = by_day.get(day)
+        if row:
+            cumulative = row.cumulative
+        series.append({
+            "date": day.isoformat(),
+            "added": row.added if row else 0,
+            "removed": row.removed if row else 0,
+            "connections": cumulative
+        })
+    return series
+
+
+def get_growth_series(db: Session, user_id: int, days: int = 180, interval: str = "month") -> List[Dict]:
+    """Growth chart over the last ``days`` days, bucketed by day or month"""
+    end = datetime.utcnow().date()
+    start = end - timedelta(days=days - 1)
+    daily = get_daily_series(db, user_id, start, end)
+    if interval == "day":
+        return daily
+
+    buckets: Dict[str, Dict] = {}
+    for point in daily:
+        key = point["date"][:7]
+        bucket = buckets.setdefault(key, {
+            "month": datetime.strptime(key, "%Y-%m").strftime("%b"),
+            "period": key,
+            "added": 0,
+            "removed": 0,
+            "connections": 0
+        })
+        bucket["added"] += point["added"]
+        bucket["removed"] += point["removed"]
+        bucket["connections"] = point["connections"]  # size at end of the bucket
+    return list(buckets.values())
+
+
+def backfill_rollups(db: Session, user_id: Optional[int] = None) -> int:
+    """Rebuild rollups from connections.created_at; returns the number of rows written.
+
+    Removals are not recoverable from the connections table, so backfilled
+    days only carry additions.
+    """
+    day_expr = func.date(Connection.created_at)
+    query = db.query(
+        Connection.user_id,
+        day_expr.label("day"),
+        func.count(Connection.id).label("added")
+    ).filter(Connection.created_at.isnot(None))
+    delete_query = db.query(ConnectionDailyRollup)
+    if user_id is not None:
+        query = query.filter(Connection.user_id == user_id)
+        delete_query = delete_query.filter(ConnectionDailyRollup.user_id == user_id)
+    rows = query.group_by(Connection.user_id, day_expr).order_by(Connection.user_id, day_expr).all()
+
+    delete_query.delete(synchronize_session=False)
+
+    mappings = []
+    running: Dict[int, int] = {}
+    for row in rows:
+        day = row.day if isinstance(row.day, date) else date.fromisoformat(str(row.day))
+        running[row.user_id] = running.get(row.user_id, 0) + row.added
+        mappings.append({
+            "user_id": row.user_id,
+            "day": day,
+            "added": row.added,
+            "removed": 0,
+            "cumulative": running[row.user_id]
+        })
+    if mappings:
+        db.bulk_insert_mappings(ConnectionDailyRollup, mappings)
+    return len(mappings)
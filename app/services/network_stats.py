@@ -0,0 +1,90 @@
+"""
+Denormalized per-user counters kept on ``user_network_stats``.
+
+``connection_count`` and ``active_platform_count`` are adjusted with
+``col = col + delta`` inside the transaction of every write that changes them,
+so admin listings read them without counting. ``adjust_user_stats`` is the one
+write path: a stats row created for the first time is seeded from live counts
+with an insert-or-increment, so concurrent first writes for a user both land. ``reconcile_counts`` repairs any drift
+and fills rows that predate the counters (NULL).
+"""
+
+from typing import Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.database import insert_or_increment
+from ..models.analytics import UserNetworkStats
+from ..models.connection import Connection
+from ..models.user import UserPlatformAccount
+
+
+def live_counts(db: Session, user_ids: List[int]) -> Dict[int, Dict[str, int]]:
+    """Counter values computed from the source tables, including this session's pending writes"""
+    db.flush()
+    counts = {user_id: {"connection_count": 0, "active_platform_count": 0} for user_id in user_ids}
+    for user_id, count in db.query(Connection.user_id, func.count(Connection.id)).filter(
+        Connection.user_id.in_(user_ids)
+    ).group_by(Connection.user_id):
+        counts[user_id]["connection_count"] = count
+    for user_id, count in db.query(UserPlatformAccount.user_id, func.count(UserPlatformAccount.id)).filter(
+        UserPlatformAccount.user_id.in_(user_ids),
+        UserPlatformAccount.is_active == True
+    ).group_by(UserPlatformAccount.user_id):
+        counts[user_id]["active_platform_count"] = count
+    return counts
+
+
+def adjust_user_stats(db: Session, user_id: int, **deltas: int) -> None:
+    """Add deltas to a user's stats columns, creating the row from live counts if it is missing.
+
+    Call inside the write's transaction, before commit. A new row starts at
+    ``connections_version`` 0 plus its delta; its counts already include the
+    pending write, so only an existing row gets the count deltas.
+    """
+    updated = db.query(UserNetworkStats).filter(UserNetworkStats.user_id == user_id).update(
+        {getattr(UserNetworkStats, name): getattr(UserNetworkStats, name) + delta for name, delta in deltas.items()},
+        synchronize_session=False
+    )
+    if updated:
+        return
+    # Rare first write: count the sources, and let a concurrent first write win the insert
+    row = {
+        "user_id": user_id,
+        "connections_version": deltas.get("connections_version", 0),
+        **live_counts(db, [user_id])[user_id]
+    }
+    insert_or_increment(db, UserNetworkStats, row, ["user_id"], deltas)
+
+
+def adjust_platform_count(db: Session, user_id: int, delta: int) -> None:
+    """Apply a change in active platform accounts. Call inside the write's transaction, before commit."""
+    adjust_user_stats(db, user_id, active_platform_count=delta)
+
+
+def reconcile_counts(db: Session, user_ids: List[int]) -> int:
+    """Reset drifted or missing counters for a chunk of users; returns how many users were fixed"""
+    actual = live_counts(db, user_ids)
+    stored = {
+        row.user_id: row for row in db.query(
+            UserNetworkStats.user_id, UserNetworkStats.connection_count, UserNetworkStats.active_platform_count
+        ).filter(UserNetworkStats.user_id.in_(user_ids))
+    }
+
+    fixed = 0
+    missing = []
+    for user_id, counts in actual.items():
+        row = stored.get(user_id)
+        if row is None:
+            missing.append({"user_id": user_id, "connections_version": 0, **counts})
+        elif (row.connection_count, row.active_platform_count) != (
+            counts["connection_count"], counts["active_platform_count"]
+        ):
+            db.query(UserNetworkStats).filter(UserNetworkStats.user_id == user_id).update(
+                counts, synchronize_session=False
+            )
+            fixed += 1
+    if missing:
+        db.bulk_insert_mappings(UserNetworkStats, missing)
+    return fixed + len(missing)
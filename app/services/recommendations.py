@@ -0,0 +1,229 @@
+"""
+Batched network recommendation generator.
+
+For a chunk of users, connection rows are loaded in one query and turned into
+a user x feature matrix with NumPy. Template recommendations are scored with a
+single matrix product. Per-connection outreach candidates are scored as one
+vector, and a bounded heap per user keeps the top-k across both kinds.
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from ..models.analytics import NetworkRecommendation
+from ..models.connection import Connection
+from ..models.user import User
+from .industries import classify_industry
+from .network_health import SENIOR_TITLE_KEYWORDS
+
+FEATURES = ["small_network", "weak_ties", "few_seniors", "low_diversity", "inactive", "mutual_reach"]
+
+# Template candidates: weights over FEATURES, plus the row written when one wins
+CANDIDATES = [
+    {
+        "weights": {"small_network": 1.0},
+        "recommendation_type": "connection",
+        "title": "Expand Network Size",
+        "description": "Add 10-15 strategic connections at your target companies",
+        "action_items": ["List 5 target companies", "Send 3 personalized connection requests per day"],
+        "potential_impact": "high", "difficulty": "medium", "estimated_time": "1 hour"
+    },
+    {
+        "weights": {"weak_ties": 0.8, "mutual_reach": 0.3},
+        "recommendation_type": "outreach",
+        "title": "Strengthen Existing Connections",
+        "description": "Reach out to dormant connections with personalized messages",
+        "action_items": ["Pick 5 weak ties", "Send each a short personal update"],
+        "potential_impact": "medium", "difficulty": "easy", "estimated_time": "30 minutes"
+    },
+    {
+        "weights": {"few_seniors": 0.9},
+        "recommendation_type": "connection",
+        "title": "Connect with Senior Leaders",
+        "description": "Few of your connections are in senior roles; seek introductions to directors and VPs",
+        "action_items": ["Ask a strong contact for one introduction", "Attend an executive networking event"],
+        "potential_impact": "high", "difficulty": "hard", "estimated_time": "2 hours"
+    },
+    {
+        "weights": {"low_diversity": 0.9},
+        "recommendation_type": "industry_expansion",
+        "title": "Expand Industry Diversity",
+        "description": "Connect with professionals in industries outside your current network",
+        "action_items": ["Choose one new industry", "Join one industry group or event"],
+        "potential_impact": "medium", "difficulty": "medium", "estimated_time": "1 hour"
+    },
+    {
+        "weights": {"inactive": 0.7},
+        "recommendation_type": "outreach",
+        "title": "Keep Your Network Active",
+        "description": "You have not added connections recently; reconnect with people you met this month",
+        "action_items": ["Import recent contacts", "Follow up with one new acquaintance"],
+        "potential_impact": "medium", "difficulty": "easy", "estimated_time": "15 minutes"
+    },
+    {
+        "weights": {"mutual_reach": 0.8},
+        "recommendation_type": "connection",
+        "title": "Use Your Mutual Connections",
+        "description": "Your contacts share many mutual connections; ask for warm introductions",
+        "action_items": ["Review mutual connections of your closest contacts", "Request two introductions"],
+        "potential_impact": "high", "difficulty": "easy", "estimated_time": "30 minutes"
+    },
+]
+
+WEIGHT_MATRIX = np.array([
+    [candidate["weights"].get(feature, 0.0) for feature in FEATURES] for candidate in CANDIDATES
+])
+
+
+def _priority(score: float) -> str:
+    if score >= 0.6:
+        return "high"
+    if score >= 0.3:
+        return "medium"
+    return "low"
+
+
+def build_feature_matrix(user_ids: List[int], rows: List, now: datetime) -> np.ndarray:
+    """users x FEATURES matrix with values in [0, 1]"""
+    n = len(user_ids)
+    if not rows:
+        features = np.zeros((n, len(FEATURES)))
+        features[:, FEATURES.index("small_network")] = 1.0
+        features[:, FEATURES.index("inactive")] = 1.0
+        return features
+
+    position = {user_id: i for i, user_id in enumerate(user_ids)}
+    idx = np.fromiter((position[row.user_id] for row in rows), dtype=np.int64, count=len(rows))
+    strength = np.fromiter((row.relationship_strength or 0 for row in rows), dtype=float, count=len(rows))
+    mutual = np.fromiter((row.mutual_connections_count or 0 for row in rows), dtype=float, count=len(rows))
+    senior = np.fromiter(
+        (any(k in (row.connection_title or "").lower() for k in SENIOR_TITLE_KEYWORDS) for row in rows),
+        dtype=float, count=len(rows)
+    )
+    recent_cutoff = now - timedelta(days=30)
+    recent = np.fromiter(
+        (bool(row.created_at) and row.created_at.replace(tzinfo=None) >= recent_cutoff for row in rows),
+        dtype=float, count=len(rows)
+    )
+
+    size = np.bincount(idx, minlength=n).astype(float)
+    safe_size = np.maximum(size, 1.0)
+    weak = np.bincount(idx, weights=(strength <= 2).astype(float), minlength=n)
+    seniors = np.bincount(idx, weights=senior, minlength=n)
+    mutual_sum = np.bincount(idx, weights=mutual, minlength=n)
+    recent_count = np.bincount(idx, weights=recent, minlength=n)
+
+    pairs = {
+        (position[row.user_id], classify_industry(row.connection_company))
+        for row in rows if row.connection_company
+    }
+    industry_count = np.bincount(
+        np.fromiter((user for user, _ in pairs), dtype=np.int64, count=len(pairs)), minlength=n
+    ).astype(float)
+
+    features = np.column_stack([
+        1.0 - np.minimum(size / 50.0, 1.0),                              # small_network
+        np.where(size > 0, weak / safe_size, 0.0),                      # weak_ties
+        np.where(size > 0, 1.0 - np.minimum(seniors / safe_size / 0.15, 1.0), 0.0),  # few_seniors
+        np.where(size > 0, 1.0 - np.minimum(industry_count / 5.0, 1.0), 0.0),        # low_diversity
+        1.0 - np.minimum(recent_count / 5.0, 1.0),                      # inactive
+        np.minimum(mutual_sum / 100.0, 1.0),                            # mutual_reach
+    ])
+    return features
+
+
+def generate_recommendations(db: Session, user_ids: List[int], k: int = 5,
+                             ttl_hours: int = 24) -> Dict[int, List[Dict]]:
+    """Top-k recommendation rows per user for a chunk of users"""
+    now = datetime.utcnow()
+    rows = db.query(
+        Connection.id,
+        Connection.user_id,
+        Connection.connection_name,
+        Connection.connection_title,
+        Connection.connection_company,
+        Connection.relationship_strength,
+        Connection.mutual_connections_count,
+        Connection.created_at
+    ).filter(Connection.user_id.in_(user_ids)).all()
+
+    # users x candidates in one product
+    template_scores = build_feature_matrix(user_ids, rows, now) @ WEIGHT_MATRIX.T
+
+    heaps: Dict[int, list] = {user_id: [] for user_id in user_ids}
+
+    def offer(user_id, score, tiebreak, payload):
+        heap = heaps[user_id]
+        item = (score, tiebreak, payload)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+
+    for i, user_id in enumerate(user_ids):
+        for j in np.nonzero(template_scores[i] > 0)[0]:
+            offer(user_id, float(template_scores[i, j]), -int(j), CANDIDATES[j])
+
+    # Per-connection outreach: weak ties with many mutual connections
+    if rows:
+        strength = np.fromiter((row.relationship_strength or 0 for row in rows), dtype=float, count=len(rows))
+        mutual = np.fromiter((row.mutual_connections_count or 0 for row in rows), dtype=float, count=len(rows))
+        outreach_scores = (strength <= 2) * (0.3 + 0.5 * np.minimum(mutual / 30.0, 1.0))
+        for r in np.nonzero(outreach_scores > 0)[0]:
+            row = rows[r]
+            offer(row.user_id, float(outreach_scores[r]), -1000 - int(row.id), {
+                "recommendation_type": "outreach",
+                "title": f"Reconnect with {row.connection_name}",
+                "description": (
+                    f"You share {row.mutual_connections_count} mutual connections with {row.connection_name}"
+                    if row.mutual_connections_count else
+                    f"Catch up with {row.connection_name}" + (f" at {row.connection_company}" if row.connection_company else "")
+                ),
+                "action_items": ["Send a short personal message"],
+                "potential_impact": "medium", "difficulty": "easy", "estimated_time": "10 minutes"
+            })
+
+    expires_at = now + timedelta(hours=ttl_hours)
+    results = {}
+    for user_id, heap in heaps.items():
+        results[user_id] = [
+            {
+                "user_id": user_id,
+                "recommendation_type": payload["recommendation_type"],
+                "title": payload["title"],
+                "description": payload["description"],
+                "action_items": payload["action_items"],
+                "priority": _priority(score),
+                "potential_impact": payload["potential_impact"],
+                "difficulty": payload["difficulty"],
+                "estimated_time": payload["estimated_time"],
+                "status": "pending",
+                "expires_at": expires_at,
+                "created_at": now,
+                "updated_at": now
+            }
+            for score, _, payload in sorted(heap, key=lambda item: item[:2], reverse=True)
+        ]
+    return results
+
+
+def store_recommendations(db: Session, user_ids: List[int], k: int = 5, ttl_hours: int = 24) -> int:
+    """Replace pending recommendations for a chunk of users; returns rows written"""
+    results = generate_recommendations(db, user_ids, k=k, ttl_hours=ttl_hours)
+    mappings = [row for user_rows in results.values() for row in user_rows]
+
+    db.query(NetworkRecommendation).filter(
+        NetworkRecommendation.user_id.in_(user_ids),
+        NetworkRecommendation.status == "pending"
+    ).delete(synchronize_session=False)
+    if mappings:
+        db.bulk_insert_mappings(NetworkRecommendation, mappings)
+
+    db.query(User).filter(User.id.in_(user_ids)).update(
+        {User.last_recommendation_sent: datetime.utcnow()}, synchronize_session=False
+    )
+    return len(mappings)
@@ -0,0 +1,61 @@
+"""
+Content-addressed cache of resume parse results.
+
+Users often upload the same file again. Parse results (text, skills and
+experience) are stored under the SHA-256 of the file bytes plus an extractor
+version, so an identical upload skips the parser pool and extraction entirely.
+The version covers everything that shapes the result: PARSE_VERSION, the page
+and character caps, and the skill taxonomy version, so any change to them
+makes old entries unreachable instead of serving stale results.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..core.database import bulk_insert_ignore
+from ..models.resume import ResumeParseCache
+from .skills import taxonomy_version
+
+# Bump when text, skill or experience extraction changes what it produces
+PARSE_VERSION = 1
+
+
+def content_hash(file_content: bytes) -> str:
+    return hashlib.sha256(file_content).hexdigest()
+
+
+def extractor_version(db: Session) -> str:
+    return f"{PARSE_VERSION}.{settings.resume_max_pages}.{settings.resume_max_chars}.{taxonomy_version(db)}"
+
+
+def get_cached_parse(db: Session, file_hash: str, version: str) -> Optional[ResumeParseCache]:
+    """The stored parse of a file for this extractor version, counting the hit"""
+    entry = db.query(ResumeParseCache).filter(
+        ResumeParseCache.content_hash == file_hash, ResumeParseCache.extractor_version == version
+    ).first()
+    if entry is not None:
+        db.query(ResumeParseCache).filter(ResumeParseCache.id == entry.id).update({
+            ResumeParseCache.hit_count: ResumeParseCache.hit_count + 1,
+            ResumeParseCache.last_used_at: datetime.utcnow()
+        }, synchronize_session=False)
+    return entry
+
+
+def store_parse(db: Session, file_hash: str, version: str, file_type: str, raw_text: str,
+                extracted_skills: List[str], extracted_experience: List[Dict], extraction: Dict) -> None:
+    """Remember a parse; a concurrent upload of the same file may already have stored it"""
+    bulk_insert_ignore(db, ResumeParseCache, [{
+        "content_hash": file_hash,
+        "extractor_version": version,
+        "file_type": file_type,
+        "raw_text": raw_text,
+        "extracted_skills": extracted_skills,
+        "extracted_experience": extracted_experience,
+        "extraction": extraction,
+        "hit_count": 0,
+        "last_used_at": datetime.utcnow()
+    }], ["content_hash", "extractor_version"])
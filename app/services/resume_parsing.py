@@ -0,0 +1,291 @@
+"""
+Resume text extraction off the event loop.
+
+Documents are read as a stream of chunks (PDF pages, DOCX paragraphs) into a
+list that is joined once at the end. Reading stops as soon as the page or
+character cap is reached, since skill and experience extraction only need
+the first few pages of a resume; the result records how much was read and how
+long it took.
+
+PDF and DOCX parsing is CPU-bound pure Python, so uploads hand it to a small
+process pool instead of running it inside the async endpoint. Each worker
+runs with an address-space cap (RLIMIT_AS) and is replaced after a fixed
+number of parses, and each parse is interrupted by SIGALRM inside the worker
+once it exceeds its time limit. A parse stuck where the alarm cannot reach it
+is caught by a slightly longer deadline in the parent, which kills the pool
+and starts a fresh one.
+
+Admission is bounded: once ``workers + queue`` parses are in flight, further
+uploads are refused with ResumeParserBusy (the endpoint answers 503) rather
+than queueing without limit. While a parse is pending the parent polls the
+client connection; if the client has gone, a queued parse is cancelled and a
+running one is abandoned (it still ends within its time limit).
+"""
+
+import asyncio
+import io
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from itertools import islice
+from multiprocessing import get_all_start_methods, get_context
+from typing import Awaitable, Callable, Iterable, Iterator, Optional, Tuple
+
+import PyPDF2
+from docx import Document
+
+try:
+    import resource
+except ImportError:  # not available on Windows; workers run without a memory cap
+    resource = None
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Extra time the parent allows past the worker's own alarm before killing the pool; covers a worker still starting
+HARD_TIMEOUT_GRACE_SECONDS = 5.0
+DISCONNECT_POLL_SECONDS = 0.25
+
+
+class ResumeParseError(Exception):
+    """A resume could not be parsed"""
+
+
+class ResumeParserBusy(ResumeParseError):
+    """Every parser slot is taken"""
+
+
+class ResumeParseTimeout(ResumeParseError):
+    """Parsing took longer than the time limit"""
+
+
+class ResumeParseMemoryExceeded(ResumeParseError):
+    """Parsing needed more memory than a worker may use"""
+
+
+class ResumeParseCancelled(ResumeParseError):
+    """The client disconnected before parsing finished"""
+
+
+@dataclass
+class ExtractedText:
+    text: str
+    chunks: int  # pages of a PDF, paragraphs of a DOCX
+    chunks_read: int
+    truncated: bool  # stopped at the page or character cap
+    elapsed_ms: float
+
+
+def open_chunks(file_content: bytes, file_type: str) -> Tuple[int, Iterator[str]]:
+    """Chunk count and a lazy stream of chunk texts; a PDF page is only parsed when it is read"""
+    if file_type == "pdf":
+        pages = PyPDF2.PdfReader(io.BytesIO(file_content)).pages
+        return len(pages), (page.extract_text() or "" for page in pages)
+    paragraphs = Document(io.BytesIO(file_content)).paragraphs
+    return len(paragraphs), (paragraph.text for paragraph in paragraphs)
+
+
+def read_chunks(chunks: Iterable[str], max_chars: int = 0) -> Tuple[str, int, bool]:
+    """Newline-terminated chunks joined until max_chars (0 = no cap); returns (text, chunks read, cut short)"""
+    parts = []
+    length = 0
+    read = 0
+    for chunk in chunks:
+        read += 1
+        if max_chars and length + len(chunk) + 1 > max_chars:
+            parts.append(chunk[:max_chars - length])
+            return "".join(parts), read, True
+        parts.append(chunk)
+        parts.append("\n")
+        length += len(chunk) + 1
+    return "".join(parts), read, False
+
+
+def extract_text(file_content: bytes, file_type: str, max_pages: int = 0, max_chars: int = 0) -> ExtractedText:
+    """Text of a PDF (up to max_pages pages) or DOCX, cut at max_chars characters"""
+    started = time.perf_counter()
+    total, chunks = open_chunks(file_content, file_type)
+    if file_type == "pdf" and max_pages:
+        chunks = islice(chunks, max_pages)  # later pages are never parsed
+    text, read, cut = read_chunks(chunks, max_chars)
+    return ExtractedText(
+        text=text,
+        chunks=total,
+        chunks_read=read,
+        truncated=cut or read < total,
+        elapsed_ms=(time.perf_counter() - started) * 1000
+    )
+
+
+def _raise_timeout(signum, frame):
+    raise ResumeParseTimeout("Resume parsing timed out")
+
+
+def parse_document(file_content: bytes, file_type: str, timeout: float = 0, max_pages: int = 0,
+                   max_chars: int = 0) -> ExtractedText:
+    """Capped text of a PDF or DOCX file (empty if unreadable); runs in a pool worker"""
+    started = time.perf_counter()
+    alarm = timeout > 0 and hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+    if alarm:
+        previous = signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return extract_text(file_content, file_type, max_pages, max_chars)
+    except (ResumeParseTimeout, MemoryError):
+        raise
+    except Exception as e:
+        logger.warning(f"Error extracting {file_type.upper()} text: {e}")
+        return ExtractedText("", 0, 0, False, (time.perf_counter() - started) * 1000)
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def _limit_worker_memory(memory_limit_mb: int) -> None:
+    """Pool initializer: cap the worker's address space at its current size plus memory_limit_mb"""
+    if not memory_limit_mb or resource is None:
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            baseline = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        baseline = 0
+    limit = baseline + memory_limit_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+class ResumeParserPool:
+    """Bounded process pool for resume parsing with timeouts, memory caps and admission control"""
+
+    def __init__(self, workers: int = 2, queue: int = 4, timeout: float = 10.0, memory_limit_mb: int = 512,
+                 tasks_per_child: int = 100, max_pages: int = 0, max_chars: int = 0):
+        self.workers = workers
+        self.max_in_flight = workers + queue
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.tasks_per_child = tasks_per_child
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.stats = {"parsed": 0, "busy": 0, "timeouts": 0, "memory_exceeded": 0, "cancelled": 0, "restarts": 0}
+        self._in_flight = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Not forked from the server: workers must not inherit its threads and DB connections.
+                # A fork server with this module preloaded starts replacement workers in milliseconds.
+                if "forkserver" in get_all_start_methods():
+                    context = get_context("forkserver")
+                    context.set_forkserver_preload([__name__])
+                else:
+                    context = get_context("spawn")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=context,
+                    initializer=_limit_worker_memory,
+                    initargs=(self.memory_limit_mb,),
+                    max_tasks_per_child=self.tasks_per_child or None
+                )
+            return self._executor
+
+    def start(self) -> None:
+        """Start the workers now rather than on the first upload"""
+        executor = self._get_executor()
+        for future in [executor.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def _restart(self, executor: ProcessPoolExecutor) -> None:
+        """Kill a pool whose worker is stuck or dead; the next parse starts a new one"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+            self.stats["restarts"] += 1
+        for process in list((executor._processes or {}).values()):  # no public API to kill a busy worker
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def parse(self, file_content: bytes, file_type: str,
+                    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None) -> ExtractedText:
+        """Text of an uploaded resume; raises a ResumeParseError subclass if it cannot be had"""
+        if self._in_flight >= self.max_in_flight:
+            self.stats["busy"] += 1
+            raise ResumeParserBusy("Resume parsing is at capacity")
+        self._in_flight += 1
+        try:
+            executor = self._get_executor()
+            future = executor.submit(
+                parse_document, file_content, file_type, self.timeout, self.max_pages, self.max_chars
+            )
+            waiter = asyncio.wrap_future(future)
+            # Nobody awaits an abandoned parse; retrieve its outcome so asyncio does not log it
+            waiter.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+            loop = asyncio.get_running_loop()
+            deadline = None  # set once a worker picks the parse up, so queueing does not count
+            while not waiter.done():
+                wait = DISCONNECT_POLL_SECONDS if deadline is None else min(DISCONNECT_POLL_SECONDS, deadline - loop.time())
+                await asyncio.wait({waiter}, timeout=max(0.0, wait))
+                if waiter.done():
+                    break
+                if is_disconnected is not None and await is_disconnected():
+                    future.cancel()
+                    self.stats["cancelled"] += 1
+                    raise ResumeParseCancelled("Client disconnected")
+                if deadline is None and future.running():
+                    deadline = loop.time() + self.timeout + HARD_TIMEOUT_GRACE_SECONDS
+                elif deadline is not None and loop.time() >= deadline:
+                    self._restart(executor)
+                    self.stats["timeouts"] += 1
+                    raise ResumeParseTimeout("Resume parsing timed out")
+
+            try:
+                extracted = waiter.result()
+            except ResumeParseTimeout:
+                self.stats["timeouts"] += 1
+                raise
+            except MemoryError:
+                self.stats["memory_exceeded"] += 1
+                raise ResumeParseMemoryExceeded("Resume needs too much memory to parse")
+            except BrokenProcessPool:
+                # A worker died mid-parse (crashed, or killed with a stuck neighbour)
+                self._restart(executor)
+                raise ResumeParseError("Resume parser worker exited")
+            self.stats["parsed"] += 1
+            logger.info(
+                f"Parsed {len(file_content)} byte {file_type}: {len(extracted.text)} chars from "
+                f"{extracted.chunks_read}/{extracted.chunks} {'pages' if file_type == 'pdf' else 'paragraphs'} "
+                f"in {extracted.elapsed_ms:.0f} ms{' (truncated)' if extracted.truncated else ''}"
+            )
+            return extracted
+        finally:
+            self._in_flight -= 1
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+parser_pool = ResumeParserPool(
+    workers=settings.resume_parse_workers,
+    queue=settings.resume_parse_queue,
+    timeout=settings.resume_parse_timeout_seconds,
+    memory_limit_mb=settings.resume_parse_memory_mb,
+    tasks_per_child=settings.resume_parse_tasks_per_child,
+    max_pages=settings.resume_max_pages,
+    max_chars=settings.resume_max_chars
+)
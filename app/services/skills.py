@@ -0,0 +1,173 @@
+"""
+Skill extraction from resume and job text.
+
+The taxonomy lives in the ``skills`` table: canonical names with a category
+and aliases. Every name and alias is compiled into one character trie, emitted
+as a single regular expression so the scan runs in the regex engine rather
+than a Python loop (several times the throughput of KeywordAutomaton). A
+text is scanned once however many skills there are, the longest keyword at a
+position wins ("react native" is not also "react"), and matches must sit on
+word boundaries ("go" no longer matches "good", nor "rest" "interest").
+
+The compiled extractor is kept per process and rebuilt only when
+``skill_taxonomy_state.version`` changes; ``load_taxonomy`` bumps it whenever
+it changes the table. Until the table is loaded, the bundled taxonomy
+(app/data/skills.json) is used.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..models.resume import Skill, SkillTaxonomyState
+
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "skills.json")
+TAXONOMY_STATE_ID = 1
+
+
+def read_taxonomy(path: str = TAXONOMY_PATH) -> List[Dict]:
+    """Skills from a JSON file: a list of {"name", "category", "aliases"}"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase with whitespace runs collapsed, so phrases match across line breaks"""
+    return " ".join(text.lower().split())
+
+
+def taxonomy_version(db: Session) -> int:
+    version = db.query(SkillTaxonomyState.version).filter(SkillTaxonomyState.id == TAXONOMY_STATE_ID).scalar()
+    return version or 0
+
+
+def bump_taxonomy_version(db: Session) -> None:
+    """Make every process recompile its extractor; call inside the write's transaction"""
+    updated = db.query(SkillTaxonomyState).filter(SkillTaxonomyState.id == TAXONOMY_STATE_ID).update(
+        {SkillTaxonomyState.version: SkillTaxonomyState.version + 1}, synchronize_session=False
+    )
+    if not updated:
+        db.add(SkillTaxonomyState(id=TAXONOMY_STATE_ID, version=1))
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Regex alternation shaped like a trie of keywords, so each position tries one branch per character"""
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}  # end of a keyword
+
+    def emit(node: Dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy, so a longer keyword is preferred and a shorter one is the fallback
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class SkillExtractor:
+    """Canonical skills mentioned in a text, from one pass of a compiled keyword trie"""
+
+    def __init__(self, skills: Iterable[Dict]):
+        self.names: List[str] = []
+        keywords = {}
+        for skill in skills:
+            index = len(self.names)
+            self.names.append(skill["name"])
+            for keyword in [skill["name"]] + list(skill.get("aliases") or []):
+                # An alias claimed by two skills belongs to the first
+                keywords.setdefault(normalize_text(keyword), index)
+        keywords.pop("", None)
+        self.keyword_count = len(keywords)
+        self._keywords = keywords
+        # A keyword must follow the start or a non-word character and precede the end or one
+        self._pattern = re.compile(
+            r"(?:^|[\W_])(" + _trie_pattern(keywords) + r")(?![^\W_])"
+        ) if keywords else None
+
+    def extract(self, text: str) -> List[str]:
+        """Distinct canonical skill names in order of first mention"""
+        if not text or self._pattern is None:
+            return []
+        seen = set()
+        found = []
+        for keyword in self._pattern.findall(normalize_text(text)):
+            index = self._keywords[keyword]
+            if index not in seen:
+                seen.add(index)
+                found.append(self.names[index])
+        return found
+
+
+_compiled: Optional[Tuple[int, SkillExtractor]] = None
+_compile_lock = threading.Lock()
+
+
+def skill_extractor(db: Session) -> SkillExtractor:
+    """The extractor for the current taxonomy version, compiling it if the version changed"""
+    global _compiled
+    version = taxonomy_version(db)
+    compiled = _compiled
+    if compiled and compiled[0] == version:
+        return compiled[1]
+    with _compile_lock:
+        if _compiled is None or _compiled[0] != version:
+            rows = db.query(Skill.name, Skill.category, Skill.aliases).order_by(Skill.id).all()
+            skills = [
+                {"name": name, "category": category, "aliases": aliases}
+                for name, category, aliases in rows
+            ] or read_taxonomy()
+            _compiled = (version, SkillExtractor(skills))
+        return _compiled[1]
+
+
+def extract_skills(db: Session, text: str) -> List[str]:
+    """Canonical skills mentioned in text"""
+    return skill_extractor(db).extract(text)
+
+
+def load_taxonomy(db: Session, skills: Iterable[Dict], replace: bool = False) -> Dict[str, int]:
+    """Upsert skills by name; with replace, delete skills the list does not contain.
+
+    Bumps the taxonomy version only if something changed. Call inside a transaction.
+    """
+    stats = {"skills": 0, "inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    existing = {skill.name: skill for skill in db.query(Skill)}
+    listed = set()
+    for entry in skills:
+        name = entry["name"].strip().lower()
+        if not name or name in listed:
+            continue
+        listed.add(name)
+        stats["skills"] += 1
+        aliases = sorted({alias.strip().lower() for alias in entry.get("aliases") or [] if alias.strip()} - {name})
+        skill = existing.get(name)
+        if skill is None:
+            db.add(Skill(name=name, category=entry.get("category"), aliases=aliases))
+            stats["inserted"] += 1
+        elif skill.category != entry.get("category") or sorted(skill.aliases or []) != aliases:
+            skill.category = entry.get("category")
+            skill.aliases = aliases
+            stats["updated"] += 1
+        else:
+            stats["unchanged"] += 1
+
+    if replace:
+        for name, skill in existing.items():
+            if name not in listed:
+                db.delete(skill)
+                stats["deleted"] += 1
+
+    if stats["inserted"] or stats["updated"] or stats["deleted"]:
+        db.flush()
+        bump_taxonomy_version(db)
+    return stats
@@ -0,0 +1,88 @@
+"""
+Time-series counts for admin charts.
+
+``bucket_counts`` groups rows by a bucketed timestamp in a single query
+(``strftime`` on SQLite, ``date_trunc`` on PostgreSQL) and zero-fills empty
+buckets in Python, so the cost of a chart does not grow with its window.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+INTERVALS = ("day", "week", "month")
+
+
+def floor_bucket(moment: datetime, interval: str) -> datetime:
+    """Start of the bucket containing moment; weeks start on Monday"""
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "day":
+        return day
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    if interval == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported interval: {interval}")
+
+
+def next_bucket(bucket: datetime, interval: str) -> datetime:
+    if interval == "day":
+        return bucket + timedelta(days=1)
+    if interval == "week":
+        return bucket + timedelta(weeks=1)
+    if bucket.month == 12:
+        return bucket.replace(year=bucket.year + 1, month=1)
+    return bucket.replace(month=bucket.month + 1)
+
+
+def bucket_label(bucket: datetime, interval: str) -> str:
+    return bucket.strftime("%Y-%m" if interval == "month" else "%Y-%m-%d")
+
+
+def bucket_range(start: datetime, end: datetime, interval: str) -> List[datetime]:
+    """Starts of every bucket overlapping [start, end)"""
+    buckets = []
+    bucket = floor_bucket(start, interval)
+    while bucket < end:
+        buckets.append(bucket)
+        bucket = next_bucket(bucket, interval)
+    return buckets
+
+
+def _bucket_expression(dialect: str, column, interval: str):
+    """SQL expression rendering column as its bucket label, or None if the dialect is unsupported"""
+    if dialect == "sqlite":
+        if interval == "day":
+            return func.strftime("%Y-%m-%d", column)
+        if interval == "week":
+            return func.date(column, "-6 days", "weekday 1")
+        return func.strftime("%Y-%m", column)
+    if dialect == "postgresql":
+        return func.to_char(func.date_trunc(interval, column), "YYYY-MM" if interval == "month" else "YYYY-MM-DD")
+    return None
+
+
+def bucket_counts(db: Session, column, start: datetime, end: datetime, interval: str = "day",
+                  filters: Sequence = ()) -> List[Tuple[str, int]]:
+    """(label, row count) for every bucket from the one containing start up to end"""
+    if interval not in INTERVALS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    buckets = bucket_range(start, end, interval)
+    if not buckets:
+        return []
+
+    range_filters = [column >= buckets[0], column < end, *filters]
+    expression = _bucket_expression(db.get_bind().dialect.name, column, interval)
+    if expression is not None:
+        rows = db.query(expression, func.count()).filter(*range_filters).group_by(expression).all()
+        counts = {label: count for label, count in rows}
+    else:
+        counts = {}
+        for (value,) in db.query(column).filter(*range_filters):
+            label = bucket_label(floor_bucket(value, interval), interval)
+            counts[label] = counts.get(label, 0) + 1
+
+    labels = [bucket_label(bucket, interval) for bucket in buckets]
+    return [(label, counts.get(label, 0)) for label in labels]
@@ -0,0 +1,166 @@
+"""
+Admin user search.
+
+SQLite gets an FTS5 index over username, email, first and last name, kept in
+sync with the users table by triggers. PostgreSQL gets a GIN index over a
+tsvector of the same fields, with the email split at '@' and '.'. Any write to users, ORM or bulk, updates the index
+inside the same transaction. Other databases, or a SQLite build without
+FTS5, fall back to ILIKE scans.
+
+Queries are split into words and every word is matched as a prefix, so
+"jo smi" finds "John Smith".
+"""
+
+import logging
+import re
+from typing import Dict, List
+
+from sqlalchemy import func, or_, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.orm import Session
+
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "users_fts"
+TSV_INDEX = "ix_users_search_tsv"
+TRGM_INDEX = "ix_users_search_trgm"  # substring index used before TSV_INDEX; dropped when found
+# The filter must repeat the index expression for PostgreSQL to use the index
+_TSV_DOCUMENT = (
+    "to_tsvector('simple', {table}username || ' ' || translate({table}email, '@.', '  ') || ' ' || "
+    "{table}first_name || ' ' || {table}last_name)"
+)
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        username, email, first_name, last_name,
+        content='users', content_rowid='id', prefix='1 2 3 4 5 6'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, username, email, first_name, last_name)
+        VALUES (new.id, new.username, new.email, new.first_name, new.last_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, username, email, first_name, last_name)
+        VALUES ('delete', old.id, old.username, old.email, old.first_name, old.last_name);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF username, email, first_name, last_name ON users BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, username, email, first_name, last_name)
+        VALUES ('delete', old.id, old.username, old.email, old.first_name, old.last_name);
+        INSERT INTO {FTS_TABLE}(rowid, username, email, first_name, last_name)
+        VALUES (new.id, new.username, new.email, new.first_name, new.last_name);
+    END""",
+]
+
+_available: Dict[str, bool] = {}
+
+
+def ensure_search_index(bind) -> bool:
+    """Create the search index and its sync triggers if missing; returns False if unsupported"""
+    dialect = bind.dialect.name
+    try:
+        if dialect == "sqlite":
+            with bind.begin() as conn:
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+                ).first()
+                for statement in _SQLITE_DDL:
+                    conn.execute(text(statement))
+                if not exists:
+                    # Index rows written before the table existed
+                    conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        elif dialect == "postgresql":
+            with bind.begin() as conn:
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS {TSV_INDEX} ON users USING gin "
+                    f"({_TSV_DOCUMENT.format(table='')})"
+                ))
+                conn.execute(text(f"DROP INDEX IF EXISTS {TRGM_INDEX}"))
+        else:
+            _available[dialect] = False
+            return False
+    except (OperationalError, ProgrammingError) as e:
+        logger.warning(f"User search index unavailable on {dialect}, falling back to ILIKE: {e}")
+        _available[dialect] = False
+        return False
+    _available[dialect] = True
+    return True
+
+
+def _terms(query: str) -> List[str]:
+    return [term.lower() for term in re.findall(r"\w+", query or "")]
+
+
+def _fts_query(terms: List[str]) -> str:
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _ts_query(terms: List[str]) -> str:
+    return " & ".join(f"'{term}':*" for term in terms)
+
+
+def _ilike_filter(query: str):
+    pattern = f"%{query}%"
+    return or_(
+        User.username.ilike(pattern),
+        User.email.ilike(pattern),
+        User.first_name.ilike(pattern),
+        User.last_name.ilike(pattern)
+    )
+
+
+def search_filter(db: Session, query: str):
+    """Filter clause on User matching every word of query as a prefix"""
+    dialect = db.get_bind().dialect.name
+    terms = _terms(query)
+    if not terms or not _available.get(dialect):
+        return _ilike_filter(query)
+    if dialect == "sqlite":
+        return User.id.in_(
+            text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query").bindparams(
+                fts_query=_fts_query(terms)
+            )
+        )
+    return text(
+        f"{_TSV_DOCUMENT.format(table='users.')} @@ to_tsquery('simple', :ts_query)"
+    ).bindparams(ts_query=_ts_query(terms))
+
+
+def typeahead(db: Session, query: str, limit: int = 10) -> List[Dict]:
+    """Best matches for a partial query, ranked by relevance"""
+    terms = _terms(query)
+    if not terms:
+        return []
+    dialect = db.get_bind().dialect.name
+    columns = (User.id, User.username, User.email, User.first_name, User.last_name)
+
+    if _available.get(dialect) and dialect == "sqlite":
+        # Username hits weigh most, then email, then names
+        ranked = db.execute(text(
+            f"""SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query
+                ORDER BY bm25({FTS_TABLE}, 10.0, 5.0, 2.0, 2.0) LIMIT :limit"""
+        ), {"fts_query": _fts_query(terms), "limit": limit}).all()
+        ids = [row_id for (row_id,) in ranked]
+        users = {row.id: row for row in db.query(*columns).filter(User.id.in_(ids))}
+        rows = [users[user_id] for user_id in ids if user_id in users]
+    elif _available.get(dialect) and dialect == "postgresql":
+        document = _TSV_DOCUMENT.format(table="users.")
+        rows = db.query(*columns).filter(search_filter(db, query)).order_by(
+            func.lower(User.username).startswith(terms[0]).desc(),
+            text(f"ts_rank({document}, to_tsquery('simple', :rank_query)) DESC").bindparams(
+                rank_query=_ts_query(terms)
+            )
+        ).limit(limit).all()
+    else:
+        rows = db.query(*columns).filter(_ilike_filter(query)).order_by(User.username).limit(limit).all()
+
+    return [
+        {
+            "id": row.id,
+            "username": row.username,
+            "email": row.email,
+            "name": f"{row.first_name} {row.last_name}"
+        }
+        for row in rows
+    ]
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Company Canonicalization Backfill Job
+Populates connections.company_id for existing rows
+
+Connections are walked in id order a chunk at a time: the chunk's distinct
+company strings are resolved together, creating companies and aliases as
+needed, and its rows are updated by primary key. Each chunk commits on its
+own and only rows without a company_id are read, so an interrupted run can
+simply be started again.
+
+Run it once after upgrading. Until it has, endpoints that group connections by
+company resolve a user's remaining rows on that user's first request, so
+nothing is left out, but that first request is slower.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+from app.core.database import SessionLocal, Base, engine, add_missing_columns
+from app.models.connection import Company, Connection
+from app.services.analytics_cache import bump_analytics_data_version
+from app.services.company_resolver import register_company_aliases, resolve_company_ids
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    """Resolve the companies of all connections without a company_id, one id-ordered chunk at a time"""
+    parser = argparse.ArgumentParser(description="Backfill canonical company ids on connections")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Connections per transaction")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    db = SessionLocal()
+    try:
+        # Existing companies claim their own names before any new ones are created
+        registered = register_company_aliases(db)
+        db.commit()
+        logging.info(f"Registered aliases for {registered} existing companies")
+
+        last_id = 0
+        scanned = updated = 0
+        while True:
+            rows = db.query(Connection.id, Connection.connection_company).filter(
+                Connection.id > last_id,
+                Connection.company_id.is_(None),
+                Connection.connection_company.isnot(None),
+                Connection.connection_company != ""
+            ).order_by(Connection.id).limit(args.chunk_size).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            scanned += len(rows)
+
+            company_ids = resolve_company_ids(db, (row.connection_company for row in rows))
+            mappings = [
+                {"id": row.id, "company_id": company_ids[row.connection_company]}
+                for row in rows if row.connection_company in company_ids
+            ]
+            db.bulk_update_mappings(Connection, mappings)
+            db.commit()
+            updated += len(mappings)
+            logging.info(f"Backfilled {updated} of {scanned} connections (through id {last_id})")
+
+        if updated:
+            bump_analytics_data_version(db)
+            db.commit()
+        companies = db.query(Company).count()
+        logging.info(f"Updated {updated} connections; {companies} canonical companies")
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Company backfill failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
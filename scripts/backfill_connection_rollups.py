@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Connection Rollup Backfill Job
+Rebuilds connection_daily_rollups from connections.created_at
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+from app.core.database import SessionLocal, Base, engine
+from app.services.analytics_cache import bump_analytics_data_version
+from app.services.network_rollups import backfill_rollups
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    """Backfill daily connection rollups for one user or everyone"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        written = backfill_rollups(db, user_id=args.user_id)
+        bump_analytics_data_version(db)
+        db.commit()
+        logging.info(f"Backfilled {written} daily rollup rows")
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Rollup backfill failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Location Normalization Backfill Job
+Populates connections.connection_location_normalized and
+job_opportunities.location_normalized for existing rows, and recounts the job
+location facet. Rerun it after changing app/data/locations.json.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging
+from app.core.database import SessionLocal, Base, engine, add_missing_columns
+from app.models.connection import Connection, JobOpportunity
+from app.services.analytics_cache import bump_analytics_data_version
+from app.services.job_facets import rebuild_facet_counts
+from app.services.locations import normalize_location
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    """Normalize every distinct raw location once and update its rows in one statement"""
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    db = SessionLocal()
+    try:
+        raw_locations = [
+            raw for (raw,) in db.query(Connection.connection_location).filter(
+                Connection.connection_location.isnot(None)
+            ).distinct()
+        ]
+        logging.info(f"Normalizing {len(raw_locations)} distinct locations")
+
+        updated = 0
+        for raw in raw_locations:
+            updated += db.query(Connection).filter(
+                Connection.connection_location == raw
+            ).update(
+                {Connection.connection_location_normalized: normalize_location(raw)},
+                synchronize_session=False
+            )
+        logging.info(f"Updated {updated} connections")
+
+        job_locations = [
+            raw for (raw,) in db.query(JobOpportunity.location).filter(
+                JobOpportunity.location.isnot(None)
+            ).distinct()
+        ]
+        updated = 0
+        for raw in job_locations:
+            updated += db.query(JobOpportunity).filter(
+                JobOpportunity.location == raw
+            ).update(
+                {JobOpportunity.location_normalized: normalize_location(raw)},
+                synchronize_session=False
+            )
+        facet_rows = rebuild_facet_counts(db)
+        bump_analytics_data_version(db)
+        db.commit()
+        logging.info(f"Updated {updated} jobs from {len(job_locations)} distinct locations, recounted {facet_rows} facet values")
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Location backfill failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Industry Classifier Benchmark
+Times classify_industry over distinct generated company names against the old
+per-keyword substring scan, cold and with the LRU warm, and reports how many
+names the two disagree on (word-boundary fixes such as "ey" in "Disney").
+
+Usage: python scripts/benchmark_industry_classifier.py --names 100000
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time
+
+from app.services import industries
+from app.services.industries import INDUSTRY_MAP, classify_industry, classify_many
+
+WORDS = [
+    "global", "united", "north", "pacific", "atlantic", "summit", "bright", "blue", "green", "river",
+    "stone", "peak", "harbor", "union", "pioneer", "vertex", "nova", "alpha", "delta", "prime",
+    "systems", "labs", "partners", "group", "holdings", "solutions", "works", "analytics", "studio", "ventures",
+]
+SUFFIXES = ["Inc", "LLC", "Ltd", "Corp", "Co", "GmbH", "plc", ""]
+
+def legacy_classify(company_name: str) -> str:
+    """The substring scan classify_industry used before the automaton"""
+    if not company_name:
+        return "other"
+    company_lower = company_name.lower()
+    for industry, keywords in INDUSTRY_MAP.items():
+        if any(keyword in company_lower for keyword in keywords):
+            return industry
+    return "other"
+
+def generate_names(count: int) -> list:
+    random.seed(42)
+    keywords = [keyword for words in INDUSTRY_MAP.values() for keyword in words]
+    names = set()
+    while len(names) < count:
+        parts = random.sample(WORDS, random.randint(1, 3))
+        if random.random() < 0.3:
+            parts.insert(random.randint(0, len(parts)), random.choice(keywords))
+        parts.append(f"{random.randint(1, 999)}")
+        names.add(" ".join(word.title() for word in parts) + " " + random.choice(SUFFIXES))
+    return list(names)
+
+def timed(label: str, fn, names: list) -> None:
+    started = time.perf_counter()
+    fn(names)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1000:8.0f} ms  {len(names) / elapsed:10.0f} names/sec")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark industry classification")
+    parser.add_argument("--names", type=int, default=100000, help="Distinct company names")
+    args = parser.parse_args()
+
+    names = generate_names(args.names)
+    print(f"{len(names)} distinct names, {sum(len(words) for words in INDUSTRY_MAP.values())} keywords")
+
+    timed("legacy substring scan", lambda batch: [legacy_classify(name) for name in batch], names)
+    industries._classify_normalized.cache_clear()
+    timed("automaton, cold cache", lambda batch: [classify_industry(name) for name in batch], names)
+    # A sequential pass over more names than the LRU holds evicts every entry, so warm up a working set that fits
+    hot = names[:industries._classify_normalized.cache_info().maxsize // 2]
+    [classify_industry(name) for name in hot]
+    timed(f"automaton, warm ({len(hot)} hot)", lambda batch: [classify_industry(name) for name in batch], hot)
+    industries._classify_normalized.cache_clear()
+    timed("classify_many, cold cache", classify_many, names)
+
+    differences = [name for name in names if legacy_classify(name) != classify_industry(name)]
+    print(f"{len(differences)} names classified differently from the substring scan, e.g.:")
+    for name in differences[:5]:
+        print(f"  {name!r}: {legacy_classify(name)} -> {classify_industry(name)}")
+
+if __name__ == "__main__":
+    main()
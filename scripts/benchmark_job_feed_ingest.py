@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Job Feed Ingestion Benchmark and Regression Check
+Runs the feed ingester against a local stub feed server and a scratch database
+
+The stub serves generated JSON and CSV feeds from several ports (each port is
+a separate host to the ingester), with ETag/Last-Modified validators, 304s and
+optional per-request latency. Three runs are checked:
+
+  1. cold: every feed returns 200 and every job is inserted
+  2. repeat: every feed returns 304 and nothing is written
+  3. after editing some feeds: only those are applied, with the expected
+     updates and deactivations
+  4. two feeds listing the same company: reapplying either writes nothing
+     and neither deactivates the other's jobs
+
+The script exits 1 if any count differs from what the stub served.
+
+Usage: python scripts/benchmark_job_feed_ingest.py --feeds 200 --latency-ms 50
+       python scripts/benchmark_job_feed_ingest.py --serve   # stub only, for manual runs
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+parser = argparse.ArgumentParser(description="Benchmark concurrent job feed ingestion")
+parser.add_argument("--feeds", type=int, default=200)
+parser.add_argument("--companies-per-feed", type=int, default=5)
+parser.add_argument("--jobs-per-company", type=int, default=20)
+parser.add_argument("--hosts", type=int, default=4, help="Stub ports; each is a separate host")
+parser.add_argument("--latency-ms", type=int, default=50, help="Stub delay per response")
+parser.add_argument("--edit-fraction", type=float, default=0.1, help="Feeds changed before the third run")
+parser.add_argument("--concurrency", type=int, default=32)
+parser.add_argument("--host-rate", type=float, default=0, help="Requests per second per host (0 = unlimited)")
+parser.add_argument("--database-url", help="Scratch database (defaults to a temporary SQLite file)")
+parser.add_argument("--serve", action="store_true", help="Only run the stub server until interrupted")
+args = parser.parse_args()
+
+
+class StubFeeds:
+    """Generated feeds; a feed's revision changes its content and validators"""
+
+    def __init__(self):
+        self.revisions = {feed: 0 for feed in range(args.feeds)}
+        self.requests = {"200": 0, "304": 0}
+        self.lock = threading.Lock()
+
+    def fmt(self, feed: int) -> str:
+        return "csv" if feed % 2 else "json"
+
+    def companies(self, feed: int):
+        revision = self.revisions[feed]
+        companies = []
+        for c in range(args.companies_per_feed):
+            jobs = []
+            # Each revision retitles the first job and drops the last one
+            job_count = args.jobs_per_company - min(revision, 1)
+            for j in range(job_count):
+                title = f"Engineer {j}" + (f" (rev {revision})" if j == 0 and revision else "")
+                jobs.append({
+                    "id": f"f{feed}-c{c}-j{j}", "title": title, "location": "Remote", "type": "Full-time",
+                    "posted_date": "2025-07-01", "description": f"python sql job {j}",
+                    "url": f"https://jobs.example.com/{feed}/{c}/{j}"
+                })
+            companies.append({"name": f"Stub Company {feed}-{c}", "careers_url": f"https://careers.example.com/{feed}/{c}", "jobs": jobs})
+        return companies
+
+    def body(self, feed: int) -> str:
+        companies = self.companies(feed)
+        if self.fmt(feed) == "json":
+            return json.dumps(companies)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["company", "careers_url", "job_id", "title", "location", "type", "posted_date", "description", "url"])
+        for company in companies:
+            for job in company["jobs"]:
+                writer.writerow([company["name"], company["careers_url"], job["id"], job["title"], job["location"],
+                                 job["type"], job["posted_date"], job["description"], job["url"]])
+        return buffer.getvalue()
+
+    def validators(self, feed: int):
+        revision = self.revisions[feed]
+        etag = '"' + hashlib.sha1(f"{feed}:{revision}".encode()).hexdigest() + '"'
+        return etag, formatdate(1750000000 + revision * 3600, usegmt=True)
+
+
+stub = StubFeeds()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        try:
+            feed = int(self.path.strip("/").split("/")[-1].split(".")[0])
+            assert feed in stub.revisions
+        except (ValueError, AssertionError):
+            self.send_error(404)
+            return
+        if args.latency_ms:
+            time.sleep(args.latency_ms / 1000)
+        etag, last_modified = stub.validators(feed)
+        if self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == last_modified:
+            with stub.lock:
+                stub.requests["304"] += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = stub.body(feed).encode("utf-8")
+        with stub.lock:
+            stub.requests["200"] += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv" if stub.fmt(feed) == "csv" else "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+def start_stub():
+    servers = []
+    for _ in range(args.hosts):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def feed_url(servers, feed: int) -> str:
+    port = servers[feed % len(servers)].server_address[1]
+    return f"http://127.0.0.1:{port}/feeds/{feed}.{stub.fmt(feed)}"
+
+
+servers = start_stub()
+if args.serve:
+    for feed in range(args.feeds):
+        print(feed_url(servers, feed), stub.fmt(feed))
+    print("Serving; Ctrl-C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+scratch = None
+if not args.database_url:
+    scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    args.database_url = f"sqlite:///{scratch.name}"
+os.environ["DATABASE_URL"] = args.database_url
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.connection import Company, JobFeed, JobOpportunity
+from app.services.job_catalog import apply_feed
+from app.services.job_feeds import run_ingest
+
+
+def check(label, actual, expected, failures):
+    ok = actual == expected
+    print(f"  {label:<28} {actual:>8}  (expected {expected}){'' if ok else '  MISMATCH'}")
+    if not ok:
+        failures.append(label)
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.bulk_insert_mappings(JobFeed, [
+        {"url": feed_url(servers, feed), "format": stub.fmt(feed), "is_active": True} for feed in range(args.feeds)
+    ])
+    db.commit()
+    db.close()
+
+    options = {"concurrency": args.concurrency, "host_rate": args.host_rate}
+    per_feed_jobs = args.companies_per_feed * args.jobs_per_company
+    total_jobs = args.feeds * per_feed_jobs
+    edited = max(1, int(args.feeds * args.edit_fraction))
+    failures = []
+    sequential = args.feeds * args.latency_ms / 1000
+
+    print(f"{args.feeds} feeds on {args.hosts} hosts, {total_jobs} jobs, {args.latency_ms} ms stub latency "
+          f"(~{sequential:.1f}s if fetched one at a time)")
+
+    summary = run_ingest(**options)
+    print(f"cold run: {summary['elapsed']:.2f}s")
+    check("feeds applied", summary["applied"], args.feeds, failures)
+    check("jobs inserted", summary["inserted"], total_jobs, failures)
+
+    summary = run_ingest(**options)
+    print(f"repeat run: {summary['elapsed']:.2f}s")
+    check("feeds not modified", summary["not_modified"], args.feeds, failures)
+    check("jobs written", summary["inserted"] + summary["updated"] + summary["deactivated"], 0, failures)
+
+    for feed in range(edited):
+        stub.revisions[feed] += 1
+    summary = run_ingest(**options)
+    print(f"run after editing {edited} feeds: {summary['elapsed']:.2f}s")
+    check("feeds applied", summary["applied"], edited, failures)
+    check("feeds not modified", summary["not_modified"], args.feeds - edited, failures)
+    check("jobs updated", summary["updated"], edited * args.companies_per_feed, failures)
+    check("jobs deactivated", summary["deactivated"], edited * args.companies_per_feed, failures)
+
+    db = SessionLocal()
+    active = db.query(JobOpportunity).filter(JobOpportunity.is_active.is_(True)).count()
+    db.close()
+    check("active jobs in catalog", active, total_jobs - edited * args.companies_per_feed, failures)
+
+    # An aggregator and the company's own feed both listing one company
+    db = SessionLocal()
+    feed_ids = [feed_id for (feed_id,) in db.query(JobFeed.id).order_by(JobFeed.id).limit(2)]
+    shared = {feed_id: [{"name": "Shared Co", "jobs": [{"id": f"{feed_id}-1", "title": "Engineer"}]}]
+              for feed_id in feed_ids}
+    for feed_id in feed_ids:
+        apply_feed(db, shared[feed_id], feed_id=feed_id)
+        db.commit()
+    written = 0
+    for feed_id in feed_ids:
+        stats = apply_feed(db, shared[feed_id], feed_id=feed_id)
+        db.commit()
+        written += stats["inserted"] + stats["updated"] + stats["deactivated"]
+    shared_active = db.query(JobOpportunity).join(Company).filter(
+        Company.name == "Shared Co", JobOpportunity.is_active.is_(True)
+    ).count()
+    db.close()
+    print("two feeds sharing a company:")
+    check("jobs written on reapply", written, 0, failures)
+    check("active shared jobs", shared_active, len(feed_ids), failures)
+    print(f"stub served {stub.requests['200']} full responses and {stub.requests['304']} 304s")
+
+    for server in servers:
+        server.shutdown()
+    if scratch:
+        os.remove(scratch.name)
+    if failures:
+        print(f"FAILED: {', '.join(failures)}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
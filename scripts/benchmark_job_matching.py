@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Job Matching Benchmark and Regression Check
+Loads a generated catalog through apply_feed into a scratch database, builds
+the job match index, and times resume matching against every job. The top
+matches of each resume are checked against a brute-force score of every job
+(dense TF-IDF rows, per-job network lookup, full sort); the script exits 1
+if any ranking differs.
+
+Usage: python scripts/benchmark_job_matching.py --jobs 100000
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser(description="Benchmark resume job matching")
+parser.add_argument("--jobs", type=int, default=100000)
+parser.add_argument("--companies", type=int, default=2000)
+parser.add_argument("--resumes", type=int, default=200, help="Distinct generated resumes, each matched once per run")
+parser.add_argument("--limit", type=int, default=50)
+parser.add_argument("--database-url", help="Scratch database (defaults to a temporary SQLite file)")
+args = parser.parse_args()
+
+scratch = None
+if not args.database_url:
+    scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    args.database_url = f"sqlite:///{scratch.name}"
+os.environ["DATABASE_URL"] = args.database_url
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import numpy as np
+
+from app.core.database import Base, SessionLocal, engine
+from app.services.job_catalog import apply_feed
+from app.services.job_matching import SKILL_WEIGHT, job_matcher, network_score
+from app.services.skills import read_taxonomy
+
+TITLES = ["Software Engineer", "Data Scientist", "Product Manager", "Financial Analyst", "Sales Manager",
+          "DevOps Engineer", "Marketing Manager", "Backend Developer", "Security Engineer", "Consultant"]
+FILLER = "We are a growing team looking for someone who enjoys ownership and delivering results."
+
+
+def generate_feed(skills):
+    random.seed(5)
+    base = datetime(2025, 1, 1)
+    per_company = args.jobs // args.companies
+    companies = []
+    for c in range(args.companies):
+        jobs = []
+        for j in range(per_company):
+            wanted = random.sample(skills, random.randint(3, 8))
+            jobs.append({
+                "id": f"{c}-{j}", "title": f"{random.choice(['Senior ', 'Junior ', ''])}{random.choice(TITLES)}",
+                "description": f"{FILLER} Requirements: {', '.join(wanted)}.",
+                "location": "Remote", "type": "Full-time",
+                "posted_date": (base + timedelta(minutes=random.randrange(200 * 24 * 60))).isoformat()
+            })
+        companies.append({"name": f"Company {c}", "jobs": jobs})
+    return companies
+
+
+def brute_force(index, skills, titles, company_network, limit):
+    """Score every job one by one from dense rows, then sort everything"""
+    query = index.query(skills, titles).toarray().ravel()
+    matrix = index.matrix_t.T.tocsr()
+    scored = []
+    for position, job_id in enumerate(index.job_ids):
+        row = matrix.getrow(position)
+        similarity = float(np.dot(row.data, query[row.indices]))
+        company_id = int(index.companies[index.company_codes[position]])
+        total = min(similarity * SKILL_WEIGHT + company_network.get(company_id, 0), 100)
+        scored.append((-round(total, 4), -int(job_id)))
+    scored.sort()
+    return [-job_id for _, job_id in scored[:limit]]
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    skills = [skill["name"] for skill in read_taxonomy()]
+
+    started = time.perf_counter()
+    apply_feed(db, generate_feed(skills))
+    db.commit()
+    print(f"loaded {args.jobs} jobs in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    index = job_matcher.index(db)
+    print(f"built index over {len(index)} jobs, {index.matrix_t.shape[0]} terms, "
+          f"{index.matrix_t.nnz} non-zeros in {time.perf_counter() - started:.1f}s")
+
+    company_ids = [int(company_id) for company_id in index.companies]
+    random.seed(9)
+    resumes = []
+    for _ in range(args.resumes):
+        network = {
+            company_id: network_score(random.randint(1, 5), random.uniform(1, 5))
+            for company_id in random.sample(company_ids, random.randint(0, 60))
+        }
+        resumes.append((random.sample(skills, random.randint(4, 15)), [random.choice(TITLES)], network))
+
+    for skills_, titles, network in resumes:
+        index.match(skills_, titles, network, limit=args.limit)  # warm up
+    samples = []
+    for skills_, titles, network in resumes:
+        started = time.perf_counter()
+        job_matcher.index(db).match(skills_, titles, network, limit=args.limit)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"match against {len(index)} jobs, top {args.limit} ({len(samples)} resumes, incl. version check): "
+          f"p50 {statistics.median(samples):.1f} ms   p95 {p95:.1f} ms")
+
+    failures = 0
+    for skills_, titles, network in resumes[:10]:
+        matches, _ = index.match(skills_, titles, network, limit=args.limit)
+        expected = brute_force(index, skills_, titles, network, args.limit)
+        if [job_id for job_id, *_ in matches] != expected:
+            failures += 1
+    db.close()
+    if scratch:
+        os.remove(scratch.name)
+    if failures:
+        print(f"FAILED: {failures} of 10 rankings differ from brute force")
+        sys.exit(1)
+    print("rankings match brute force for 10 resumes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Job Search Benchmark and Regression Check
+Loads a generated catalog through apply_feed into a scratch database, expires
+some jobs, checks the incrementally maintained facet counts against a full
+recount and against what search returns, and times search with common filter
+combinations
+
+Usage: python scripts/benchmark_job_search.py --jobs 100000
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser(description="Benchmark job search")
+parser.add_argument("--jobs", type=int, default=100000)
+parser.add_argument("--companies", type=int, default=2000)
+parser.add_argument("--repeat", type=int, default=50, help="Timed runs per query")
+parser.add_argument("--database-url", help="Scratch database (defaults to a temporary SQLite file)")
+args = parser.parse_args()
+
+scratch = None
+if not args.database_url:
+    scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    args.database_url = f"sqlite:///{scratch.name}"
+os.environ["DATABASE_URL"] = args.database_url
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.connection import Connection, JobFacetCount, JobOpportunity
+from app.models.user import User
+from app.services.connection_writes import prepare_connection_rows
+from app.services.job_catalog import apply_feed, expire_jobs
+from app.services.job_facets import read_facets, rebuild_facet_counts, connected_company_job_count
+from app.services.job_search import ensure_job_search_index, search_jobs
+
+LOCATIONS = ["San Francisco, CA", "New York, NY", "London, UK", "Remote", "Seattle, WA", "Austin, TX", "Berlin, Germany"]
+LEVELS = ["entry", "mid", "senior", "lead"]
+TYPES = ["Full-time", "Part-time", "Contract"]
+WORDS = ["python", "java", "sql", "cloud", "design", "sales", "finance", "data", "security", "mobile", "product", "ops"]
+
+
+def generate_feed(revision: int):
+    random.seed(11)
+    base = datetime(2025, 1, 1)
+    per_company = args.jobs // args.companies
+    companies = []
+    for c in range(args.companies):
+        jobs = []
+        for j in range(per_company):
+            words = random.sample(WORDS, 4)
+            job = {
+                "id": f"{c}-{j}", "title": f"{words[0].title()} {random.choice(['Engineer', 'Analyst', 'Manager'])}",
+                "location": random.choice(LOCATIONS), "experience_level": random.choice(LEVELS),
+                "type": random.choice(TYPES), "description": " ".join(words),
+                "posted_date": (base + timedelta(minutes=random.randrange(300 * 24 * 60))).isoformat()
+            }
+            if revision and c % 10 == 0 and j % 4 == 0:
+                job["experience_level"] = "senior"  # changes some jobs' facet values
+            if revision and c % 10 == 0 and j % 4 == 1:
+                continue  # drops others
+            if revision and c % 10 == 0 and j % 4 == 2:
+                job["expires_date"] = "2020-01-01"  # listed already expired
+            jobs.append(job)
+        companies.append({"name": f"Company {c}", "jobs": jobs})
+    return companies
+
+
+def facet_table(db):
+    return {(row.facet, row.value): row.job_count for row in db.query(JobFacetCount) if row.job_count}
+
+
+def timed(label, fn):
+    fn()
+    samples = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"  {label:<44} p50 {statistics.median(samples):6.1f} ms   p95 {p95:6.1f} ms")
+    return p95
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    ensure_job_search_index(engine)
+    db = SessionLocal()
+    user = User(email="bench@example.com", username="bench", password_hash="x", first_name="B", last_name="U")
+    db.add(user)
+    db.commit()
+
+    started = time.perf_counter()
+    stats = apply_feed(db, generate_feed(0))
+    db.commit()
+    print(f"loaded {stats['inserted']} jobs in {time.perf_counter() - started:.1f}s")
+    stats = apply_feed(db, generate_feed(1))
+    db.commit()
+    print(f"second feed: {stats['updated']} updated, {stats['deactivated']} deactivated, {stats['unchanged']} unchanged")
+
+    # Jobs that expire after they were loaded
+    db.query(JobOpportunity).filter(JobOpportunity.id % 50 == 3).update(
+        {JobOpportunity.expires_at: datetime.utcnow() - timedelta(days=1)}, synchronize_session=False
+    )
+    print(f"expired {expire_jobs(db)} jobs after loading")
+    db.commit()
+
+    db.bulk_insert_mappings(Connection, prepare_connection_rows(db, [
+        {"user_id": user.id, "connection_name": f"Contact {i}", "connection_company": f"Company {i * 37 % args.companies}"}
+        for i in range(300)
+    ]))
+    db.commit()
+
+    incremental = facet_table(db)
+    rebuild_facet_counts(db)
+    recounted = facet_table(db)
+    db.rollback()
+    if incremental != recounted:
+        diff = {key for key in set(incremental) | set(recounted) if incremental.get(key) != recounted.get(key)}
+        print(f"FAILED: {len(diff)} facet counts differ from a full recount, e.g. {sorted(diff)[:5]}")
+        sys.exit(1)
+    print(f"facet counts match a full recount ({len(incremental)} values)")
+
+    mismatched = []
+    for company_id, count in [(int(value), count) for (facet, value), count in incremental.items()
+                              if facet == "company"][:20]:
+        found, _ = search_jobs(db, user.id, company_id=company_id, limit=1000)
+        if len(found) != count:
+            mismatched.append((company_id, count, len(found)))
+    if mismatched:
+        print(f"FAILED: company facet counts differ from search results (company, facet, search): {mismatched[:5]}")
+        sys.exit(1)
+    print("company facet counts match search results")
+
+    first_page, cursor = search_jobs(db, user.id, limit=20)
+    deep_cursor = cursor
+    for _ in range(50):
+        _, deep_cursor = search_jobs(db, user.id, cursor=deep_cursor, limit=20)
+
+    print(f"search over {args.jobs} jobs ({args.repeat} runs each):")
+    worst = max(
+        timed("no filters", lambda: search_jobs(db, user.id)),
+        timed("page 52 via cursor", lambda: search_jobs(db, user.id, cursor=deep_cursor)),
+        timed("region", lambda: search_jobs(db, user.id, location="New York")),
+        timed("region + level + type", lambda: search_jobs(
+            db, user.id, location="San Francisco Bay Area", experience_level="senior", employment_type="Contract")),
+        timed("text 'python'", lambda: search_jobs(db, user.id, query="python")),
+        timed("text 'secur' + level", lambda: search_jobs(db, user.id, query="secur", experience_level="lead")),
+        timed("has connections", lambda: search_jobs(db, user.id, has_connections=True)),
+        timed("company", lambda: search_jobs(db, user.id, company_id=first_page[0]["company_id"])),
+        timed("facets", lambda: (read_facets(db), connected_company_job_count(db, user.id))),
+    )
+    db.close()
+    if scratch:
+        os.remove(scratch.name)
+    print(f"worst p95 {worst:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Location Normalizer Benchmark and Regression Check
+Times normalize_location over generated raw locations, uncached and memoized,
+and checks a set of known cases: US state codes are qualifiers rather than
+places ("New Orleans, LA" is not Los Angeles), and ambiguous city names only
+match with their state or country ("Cambridge, United Kingdom" is not Boston).
+Exits 1 if a case fails.
+
+Uses the bundled gazetteer (app/data/locations.json), so it needs no database.
+
+Usage: python scripts/benchmark_location_normalizer.py --locations 50000
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.services.locations import UNKNOWN_LOCATION, normalize_location
+
+# (raw location, expected region)
+CASES = [
+    ("New Orleans, LA", UNKNOWN_LOCATION),
+    ("La Jolla, CA", UNKNOWN_LOCATION),
+    ("Arlington, TX", UNKNOWN_LOCATION),
+    ("Cambridge, United Kingdom", UNKNOWN_LOCATION),
+    ("Portland, ME", UNKNOWN_LOCATION),
+    ("Los Angeles, CA", "Los Angeles"),
+    ("Greater Los Angeles Area", "Los Angeles"),
+    ("Arlington, VA", "Washington DC"),
+    ("Washington, DC", "Washington DC"),
+    ("Washington D.C. Metro Area", "Washington DC"),
+    ("Cambridge, Massachusetts, United States", "Boston"),
+    ("Cambridge, MA", "Boston"),
+    ("Portland, Oregon, United States", "Portland"),
+    ("Portland, OR", "Portland"),
+    ("Brooklyn, NY", "New York"),
+    ("Palo Alto, California", "San Francisco Bay Area"),
+    ("London Area, United Kingdom", "London"),
+    ("Remote", "Remote"),
+    ("   ", None),
+]
+
+CITIES = ["San Francisco", "Oakland", "Brooklyn", "Seattle", "Austin", "Boston", "Cambridge", "Portland",
+          "Arlington", "Chicago", "Springfield", "Columbus", "Toronto", "London", "Berlin", "New Orleans"]
+QUALIFIERS = ["CA", "NY", "WA", "TX", "MA", "OR", "ME", "VA", "IL", "LA", "OH", "United States",
+              "United Kingdom", "Canada", "Germany"]
+
+
+def generate_locations(count: int) -> list:
+    random.seed(3)
+    locations = []
+    for i in range(count):
+        parts = [random.choice(CITIES)]
+        parts += random.sample(QUALIFIERS, random.randint(0, 2))
+        if i % 7 == 0:
+            parts[0] = f"Greater {parts[0]} Area"
+        locations.append(", ".join(parts) + (f" {i % 500}" if i % 3 == 0 else ""))
+    return locations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark location normalization")
+    parser.add_argument("--locations", type=int, default=50000, help="Generated raw locations")
+    args = parser.parse_args()
+
+    locations = generate_locations(args.locations)
+    normalize_location.cache_clear()
+    normalize_location("warm up the gazetteer index")
+    normalize_location.cache_clear()
+
+    for label in ("first pass", "memoized"):
+        started = time.perf_counter()
+        for raw in locations:
+            normalize_location(raw)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<10} {len(locations)} locations in {elapsed * 1000:7.0f} ms  "
+              f"{elapsed / len(locations) * 1e6:6.2f} us each")
+
+    failures = [
+        f"{raw!r}: expected {expected!r}, got {normalize_location(raw)!r}"
+        for raw, expected in CASES if normalize_location(raw) != expected
+    ]
+    if failures:
+        print("FAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"{len(CASES)} normalization cases OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Platform Stats Benchmark and Regression Check
+Seeds a scratch database, checks compute_platform_stats against per-platform
+COUNTs, and times it
+
+With --legacy the old single-join query is timed too, and the script shows how
+far its counts are inflated. Keep --connections small for that: its cost
+grows with accounts x connections per platform.
+
+Usage: python scripts/benchmark_platform_stats.py --connections 1000000
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser(description="Benchmark admin platform stats")
+parser.add_argument("--connections", type=int, default=1000000)
+parser.add_argument("--users", type=int, default=20000)
+parser.add_argument("--platforms", type=int, default=6)
+parser.add_argument("--database-url", help="Scratch database (defaults to a temporary SQLite file)")
+parser.add_argument("--legacy", action="store_true", help="Also time the old cartesian-join query")
+args = parser.parse_args()
+
+scratch = None
+if not args.database_url:
+    scratch = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+    args.database_url = f"sqlite:///{scratch.name}"
+os.environ["DATABASE_URL"] = args.database_url
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import func
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.connection import Connection
+from app.models.user import Platform, User, UserPlatformAccount
+from app.services.kpi_snapshots import compute_platform_stats
+
+def seed(db):
+    random.seed(7)
+    now = datetime.utcnow()
+    db.bulk_insert_mappings(Platform, [
+        {"name": f"platform-{i}", "base_url": f"https://p{i}.example.com"} for i in range(args.platforms)
+    ])
+    db.bulk_insert_mappings(User, [
+        {"email": f"user{i}@example.com", "username": f"user{i}", "password_hash": "x",
+         "first_name": "Bench", "last_name": str(i)}
+        for i in range(args.users)
+    ])
+    platform_ids = [platform_id for (platform_id,) in db.query(Platform.id)]
+    user_ids = [user_id for (user_id,) in db.query(User.id)]
+
+    # Skewed so platforms differ; the last platform has no accounts or connections
+    active_platforms = platform_ids[:-1] or platform_ids
+    accounts = []
+    for user_id in user_ids:
+        for platform_id in random.sample(active_platforms, random.randint(0, len(active_platforms))):
+            accounts.append({
+                "user_id": user_id, "platform_id": platform_id, "platform_username": f"u{user_id}",
+                "last_sync_at": now - timedelta(days=random.randint(0, 90))
+            })
+    db.bulk_insert_mappings(UserPlatformAccount, accounts)
+
+    batch = 100000
+    for start in range(0, args.connections, batch):
+        db.bulk_insert_mappings(Connection, [
+            {"user_id": random.choice(user_ids), "platform_id": random.choice(active_platforms + [None]),
+             "connection_name": f"c{i}"}
+            for i in range(start, min(start + batch, args.connections))
+        ])
+    db.commit()
+
+def expected_counts(db):
+    """Per-platform counts taken one table at a time"""
+    recent_cutoff = datetime.utcnow() - timedelta(days=30)
+    expected = {}
+    for (platform_id,) in db.query(Platform.id):
+        expected[platform_id] = (
+            db.query(func.count(UserPlatformAccount.id)).filter(UserPlatformAccount.platform_id == platform_id).scalar(),
+            db.query(func.count(Connection.id)).filter(Connection.platform_id == platform_id).scalar(),
+            db.query(func.count(UserPlatformAccount.id)).filter(
+                UserPlatformAccount.platform_id == platform_id, UserPlatformAccount.last_sync_at >= recent_cutoff
+            ).scalar(),
+        )
+    return expected
+
+def legacy_counts(db):
+    rows = db.query(
+        Platform.id,
+        func.count(UserPlatformAccount.id),
+        func.count(Connection.id)
+    ).outerjoin(UserPlatformAccount).outerjoin(Connection).group_by(Platform.id, Platform.name).all()
+    return {platform_id: (users, connections) for platform_id, users, connections in rows}
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.monotonic()
+        seed(db)
+        print(f"Seeded {args.users} users, {args.connections} connections in {time.monotonic() - started:.1f}s")
+
+        expected = expected_counts(db)
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            stats = compute_platform_stats(db)
+            timings.append(time.perf_counter() - started)
+        actual = {
+            row["platform_id"]: (row["connected_users"], row["total_connections"], row["recent_connections"])
+            for row in stats["platform_overview"]
+        }
+        print(f"compute_platform_stats: best {min(timings) * 1000:.0f} ms over {len(timings)} runs")
+
+        if actual != expected:
+            print("FAIL: platform stats do not match per-platform counts")
+            for platform_id in sorted(expected):
+                print(f"  platform {platform_id}: expected {expected[platform_id]}, got {actual.get(platform_id)}")
+            sys.exit(1)
+        print(f"OK: counts exact for {len(expected)} platforms")
+
+        if args.legacy:
+            started = time.perf_counter()
+            legacy = legacy_counts(db)
+            print(f"legacy join: {(time.perf_counter() - started) * 1000:.0f} ms")
+            for platform_id, (users, connections, _) in sorted(expected.items()):
+                print(f"  platform {platform_id}: users {legacy[platform_id][0]} (exact {users}), "
+                      f"connections {legacy[platform_id][1]} (exact {connections})")
+    finally:
+        db.close()
+        if scratch:
+            os.remove(scratch.name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Resume Text Extraction Benchmark and Regression Check
+Times extraction of generated PDF and DOCX documents with the old
+whole-document loop (string += per page) and with the streaming extractor,
+uncapped and with the production page and character caps. Checks that
+uncapped output matches the old loop and that capped output is a prefix of
+it. Exits 1 if either check fails.
+
+Usage: python scripts/benchmark_resume_extraction.py --pages 40
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import io
+import statistics
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import PyPDF2
+from docx import Document
+
+from app.core.config import settings
+from app.services.resume_parsing import extract_text
+
+LINE = "Senior Software Engineer at Example Inc. Built Python, SQL and AWS services for {n} customers."
+
+
+def make_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    """A minimal PDF with one text line per row, written by hand so no PDF writer is needed"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        rows = "".join(
+            f"BT /F1 9 Tf 40 {800 - row * 17} Td ({LINE.format(n=page * 100 + row)}) Tj ET\n"
+            for row in range(lines_per_page)
+        ).encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(rows) + rows + b"endstream")
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{kid} 0 R" for kid in kids).encode(), pages)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(paragraphs: int) -> bytes:
+    doc = Document()
+    for n in range(paragraphs):
+        doc.add_paragraph(LINE.format(n=n))
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def legacy_pdf(content: bytes) -> str:
+    """The loop extract_text_from_pdf used before streaming extraction"""
+    text = ""
+    for page in PyPDF2.PdfReader(io.BytesIO(content)).pages:
+        text += page.extract_text() + "\n"
+    return text
+
+
+def legacy_docx(content: bytes) -> str:
+    text = ""
+    for paragraph in Document(io.BytesIO(content)).paragraphs:
+        text += paragraph.text + "\n"
+    return text
+
+
+def timed(label: str, fn, repeat: int):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"  {label:<34} {statistics.median(samples):8.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resume text extraction")
+    parser.add_argument("--pages", type=int, default=40, help="Pages in the generated PDF")
+    parser.add_argument("--paragraphs", type=int, default=5000, help="Paragraphs in the generated DOCX")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    failures = []
+    caps = {"max_pages": settings.resume_max_pages, "max_chars": settings.resume_max_chars}
+    for label, file_type, content, legacy in (
+        (f"{args.pages}-page PDF", "pdf", make_pdf(args.pages), legacy_pdf),
+        (f"{args.paragraphs}-paragraph DOCX", "docx", make_docx(args.paragraphs), legacy_docx),
+    ):
+        print(f"{label} ({len(content) // 1024} KB), median of {args.repeat}:")
+        expected = timed("legacy loop", lambda: legacy(content), args.repeat)
+        full = timed("streaming, uncapped", lambda: extract_text(content, file_type), args.repeat)
+        capped = timed(
+            f"streaming, {caps['max_pages']} pages / {caps['max_chars']} chars",
+            lambda: extract_text(content, file_type, **caps), args.repeat
+        )
+        print(f"  capped read {capped.chunks_read}/{capped.chunks}, {len(capped.text)} chars, "
+              f"truncated={capped.truncated}, reported {capped.elapsed_ms:.1f} ms")
+        if full.text != expected:
+            failures.append(f"{label}: uncapped text differs from the legacy loop")
+        if not expected.startswith(capped.text) or len(capped.text) > caps["max_chars"]:
+            failures.append(f"{label}: capped text is not a prefix within the character cap")
+
+    if failures:
+        print("FAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("OK")
+
+if __name__ == "__main__":
+    main()
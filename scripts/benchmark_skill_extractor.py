@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Skill Extractor Benchmark and Regression Check
+Times skill extraction over generated resume text in MB/s against the old
+per-skill substring scan, and checks a set of known cases: whole-word
+matches only ("go" is not found in "good"), aliases resolve to canonical
+names, and phrases match across line breaks. Exits 1 if a case fails.
+
+Uses the bundled taxonomy (app/data/skills.json), so it needs no database.
+
+Usage: python scripts/benchmark_skill_extractor.py --megabytes 5
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import random
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.services.skills import SkillExtractor, read_taxonomy
+
+FILLER = [
+    "good", "maintain", "interest", "team", "delivered", "results", "across", "growth", "managed", "built",
+    "customers", "platform", "improved", "strategy", "reporting", "weekly", "launched", "ongoing", "going",
+    "pipeline", "design", "review", "stakeholders", "revenue", "mentored", "engineers", "quarterly",
+]
+
+# (text, skills that must be found, skills that must not be)
+CASES = [
+    ("Good at maintaining interest in the forest", [], ["go", "ai", "rest"]),
+    ("Built REST APIs in Go and Java", ["rest", "apis", "go", "java"], ["javascript"]),
+    ("Wrote JS and TypeScript; deployed on K8s with Golang services", ["javascript", "typescript", "kubernetes", "go"], []),
+    ("Applied machine\nlearning and artificial intelligence", ["machine learning", "ai"], []),
+    ("Shipped C++ and C# code, Node.js backends", ["c++", "c#", "node.js"], []),
+    ("Led Agile ceremonies as scrum master", ["agile", "scrum"], ["leadership"]),
+    ("React Native and ReactJS apps", ["react native", "react"], []),
+    ("Ruby on Rails, scikit-learn, CI/CD", ["ruby on rails", "scikit-learn", "ci/cd"], []),
+]
+
+
+def legacy_extract(skill_names, text):
+    """The substring scan extract_skills_from_text used before the compiled taxonomy"""
+    text_lower = text.lower()
+    return list({skill for skill in skill_names if skill in text_lower})
+
+
+def generate_text(megabytes: float, keywords) -> str:
+    random.seed(7)
+    words = []
+    size = 0
+    target = int(megabytes * 1024 * 1024)
+    while size < target:
+        word = random.choice(keywords) if random.random() < 0.05 else random.choice(FILLER)
+        words.append(word)
+        size += len(word) + 1
+        if random.random() < 0.08:
+            words.append("\n")
+    return " ".join(words)
+
+
+def timed(label: str, fn, text: str) -> list:
+    started = time.perf_counter()
+    result = fn(text)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1000:8.0f} ms  {len(text) / elapsed / 1024 / 1024:8.2f} MB/s  {len(result)} skills")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark skill extraction")
+    parser.add_argument("--megabytes", type=float, default=5, help="Generated text size")
+    args = parser.parse_args()
+
+    taxonomy = read_taxonomy()
+    started = time.perf_counter()
+    extractor = SkillExtractor(taxonomy)
+    print(f"{len(taxonomy)} skills, {extractor.keyword_count} keywords compiled in "
+          f"{(time.perf_counter() - started) * 1000:.1f} ms")
+
+    keywords = [skill["name"] for skill in taxonomy] + [alias for skill in taxonomy for alias in skill["aliases"]]
+    text = generate_text(args.megabytes, keywords)
+    names = [skill["name"] for skill in taxonomy]
+    timed("legacy substring scan", lambda body: legacy_extract(names, body), text)
+    timed("compiled trie", extractor.extract, text)
+
+    # Resume-sized texts, where per-call overhead counts
+    resumes = [text[start:start + 8 * 1024] for start in range(0, min(len(text), 4 * 1024 * 1024), 8 * 1024)]
+    started = time.perf_counter()
+    for resume in resumes:
+        extractor.extract(resume)
+    elapsed = time.perf_counter() - started
+    print(f"{len(resumes)} x 8 KB resumes          {elapsed / len(resumes) * 1000:8.2f} ms each  "
+          f"{sum(map(len, resumes)) / elapsed / 1024 / 1024:6.2f} MB/s")
+
+    failures = []
+    for text, expected, unexpected in CASES:
+        found = set(extractor.extract(text))
+        missing = [skill for skill in expected if skill not in found]
+        wrong = [skill for skill in unexpected if skill in found]
+        if missing or wrong:
+            failures.append(f"{text!r}: missing {missing}, unexpected {wrong}")
+    if failures:
+        print("FAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"{len(CASES)} extraction cases OK")
+
+if __name__ == "__main__":
+    main()
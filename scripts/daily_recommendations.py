@@ -1,21 +1,26 @@
 #!/usr/bin/env python3
 """
 Daily Connection Recommendations Cron Job
-Sends personalized connection suggestions to active users
+Generates personalized network recommendations for active users
+
+Eligible users are scored in chunks with vectorized NumPy batches and the
+top-k recommendations per user are bulk-inserted into network_recommendations.
 """
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import get_db
-from app.models.user import User
-from app.models.connection import Connection
-from app.core.recommendations import generate_recommendations
-from app.core.email import send_recommendation_email
+import argparse
 import logging
 from datetime import datetime, timedelta
 
+from sqlalchemy import or_
+
+from app.models.user import User
+from app.services.batch import add_batch_arguments, run_batch_job
+from app.services.recommendations import store_recommendations
+
 # Setup logging
 logging.basicConfig(
     filename='/var/log/connectme/daily_recommendations.log',
@@ -23,44 +28,34 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+def due_user_ids(db) -> list:
+    """Active users who haven't received recommendations in 24 hours"""
+    cutoff_time = datetime.utcnow() - timedelta(hours=24)
+    return [
+        user_id for (user_id,) in db.query(User.id).filter(
+            User.is_active == True,
+            or_(User.last_recommendation_sent.is_(None), User.last_recommendation_sent < cutoff_time)
+        )
+    ]
+
 def main():
-    """Send daily recommendations to active users"""
+    """Generate daily recommendations for active users"""
+    parser = argparse.ArgumentParser(description="Generate daily network recommendations")
+    add_batch_arguments(parser, checkpoint="daily_recommendations.checkpoint.json")
+    parser.add_argument("--limit", type=int, default=5, help="Recommendations kept per user")
+    parser.add_argument("--ttl-hours", type=int, default=24, help="Hours until recommendations expire")
+    args = parser.parse_args()
+
     try:
-        db = next(get_db())
-        
-        # Get active users who haven't received recommendations in 24 hours
-        cutoff_time = datetime.now() - timedelta(hours=24)
-        active_users = db.query(User).filter(
-            User.is_active == True,
-            User.last_recommendation_sent < cutoff_time
-        ).all()
-        
-        logging.info(f"Processing recommendations for {len(active_users)} users")
-        
-        for user in active_users:
-            try:
-                # Generate personalized recommendations
-                recommendations = generate_recommendations(user.id, limit=5)
-                
-                if recommendations:
-                    # Send email with recommendations
-                    send_recommendation_email(user.email, recommendations)
-                    
-                    # Update last sent timestamp
-                    user.last_recommendation_sent = datetime.now()
-                    db.commit()
-                    
-                    logging.info(f"Sent recommendations to user {user.id}")
-                
-            except Exception as e:
-                logging.error(f"Failed to send recommendations to user {user.id}: {e}")
-                continue
-        
-        logging.info("Daily recommendations job completed successfully")
-        
+        stats = run_batch_job(
+            "Daily recommendations", args, due_user_ids, store_recommendations,
+            k=args.limit, ttl_hours=args.ttl_hours
+        )
     except Exception as e:
         logging.error(f"Daily recommendations job failed: {e}")
         sys.exit(1)
+    if stats["failed"]:
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Network Insights Cron Job
+Computes connection insights for all active users and stores them in connection_insights
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+
+from app.services.batch import active_user_ids, add_batch_arguments, run_batch_job
+from app.services.insights import refresh_insights
+
+# Setup logging
+logging.basicConfig(
+    filename='/var/log/connectme/insights.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    """Recompute network insights for all active users"""
+    parser = argparse.ArgumentParser(description="Recompute network insights")
+    add_batch_arguments(parser, checkpoint="insights.checkpoint.json")
+    args = parser.parse_args()
+
+    try:
+        # Each chunk's active insights are replaced in one transaction
+        stats = run_batch_job("Insights generation", args, active_user_ids, refresh_insights)
+    except Exception as e:
+        logging.error(f"Insights generation job failed: {e}")
+        sys.exit(1)
+    if stats["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
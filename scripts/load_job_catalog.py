@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Job Catalog Loader
+Loads companies and job listings from a local JSON or CSV feed file
+
+With no arguments the bundled fixture (app/data/jobs.json) is loaded. The
+feed is diffed against the catalog by (company, feed id), so loading the same
+feed twice writes nothing; active jobs a feed no longer lists for its
+companies are deactivated unless --keep-missing is given. Only jobs loaded
+from files are deactivated this way; jobs written by registered feeds
+(scripts/update_company_data.py) are left to their own feed.
+
+Every run first deactivates jobs whose expiry has passed.
+
+Run with --rebuild-facets once after upgrading, to count jobs loaded before
+search facet counts were maintained.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+from app.core.database import SessionLocal, Base, engine, add_missing_columns
+from app.services.job_catalog import CATALOG_PATH, apply_feed, expire_jobs, read_feed
+from app.services.job_facets import rebuild_facet_counts
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    """Load one feed file into the job catalog in a single transaction"""
+    parser = argparse.ArgumentParser(description="Load a job feed file into the catalog")
+    parser.add_argument("feed", nargs="?", default=CATALOG_PATH, help="JSON or CSV feed file")
+    parser.add_argument("--keep-missing", action="store_true", help="Do not deactivate jobs missing from the feed")
+    parser.add_argument("--rebuild-facets", action="store_true", help="Recount search facets instead of loading a feed")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    db = SessionLocal()
+    try:
+        expired = expire_jobs(db)
+        if args.rebuild_facets:
+            values = rebuild_facet_counts(db)
+            db.commit()
+            logging.info(f"Rebuilt {values} search facet counts")
+            return
+
+        companies = read_feed(args.feed)
+        stats = apply_feed(db, companies, deactivate_missing=not args.keep_missing)
+        db.commit()
+        logging.info(
+            f"Loaded {stats['jobs']} jobs for {stats['companies']} companies from {args.feed}: "
+            f"{stats['inserted']} new, {stats['updated']} updated, {stats['deactivated']} deactivated, "
+            f"{stats['unchanged']} unchanged, {expired} expired"
+        )
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Job catalog load failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Skill Taxonomy Loader
+Loads skills and their aliases from a JSON file into the skills table
+
+With no arguments the bundled taxonomy (app/data/skills.json) is loaded.
+Skills are upserted by name; with --replace, skills the file does not list
+are deleted. Any change bumps the taxonomy version, and every worker
+recompiles its skill extractor on its next extraction.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+from app.core.database import SessionLocal, Base, engine, add_missing_columns
+from app.services.skills import TAXONOMY_PATH, load_taxonomy, read_taxonomy
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    """Load one taxonomy file into the skills table in a single transaction"""
+    parser = argparse.ArgumentParser(description="Load a skill taxonomy file")
+    parser.add_argument("taxonomy", nargs="?", default=TAXONOMY_PATH, help="JSON list of {name, category, aliases}")
+    parser.add_argument("--replace", action="store_true", help="Delete skills the file does not list")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+    db = SessionLocal()
+    try:
+        stats = load_taxonomy(db, read_taxonomy(args.taxonomy), replace=args.replace)
+        db.commit()
+        logging.info(
+            f"Loaded {stats['skills']} skills from {args.taxonomy}: {stats['inserted']} new, "
+            f"{stats['updated']} updated, {stats['deleted']} deleted, {stats['unchanged']} unchanged"
+        )
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Skill taxonomy load failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
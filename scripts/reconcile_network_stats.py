@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Network Stats Reconciliation Job
+Recounts connections and active platform accounts per user and repairs drifted counters
+
+Write paths keep user_network_stats.connection_count and active_platform_count
+up to date; this job catches anything that bypassed them and fills rows that
+predate the counters. Run it once after deploying the counters, then nightly.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+
+from app.models.user import User
+from app.services.batch import add_batch_arguments, run_batch_job
+from app.services.network_stats import reconcile_counts
+
+# Setup logging
+logging.basicConfig(
+    filename='/var/log/connectme/reconcile_network_stats.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def all_user_ids(db) -> list:
+    return [user_id for (user_id,) in db.query(User.id)]
+
+def reconcile_chunk(db, user_ids: list) -> None:
+    """Repair the counters of one chunk of users"""
+    fixed = reconcile_counts(db, user_ids)
+    if fixed:
+        logging.warning(f"Repairing counters for {fixed} users in {user_ids[0]}-{user_ids[-1]}")
+
+def main():
+    """Reconcile denormalized connection and platform counters for all users"""
+    parser = argparse.ArgumentParser(description="Reconcile user network counters")
+    add_batch_arguments(parser, checkpoint="reconcile_network_stats.checkpoint.json")
+    args = parser.parse_args()
+
+    try:
+        stats = run_batch_job("Counter reconciliation", args, all_user_ids, reconcile_chunk)
+    except Exception as e:
+        logging.error(f"Counter reconciliation job failed: {e}")
+        sys.exit(1)
+    if stats["failed"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
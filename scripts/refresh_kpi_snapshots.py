@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Admin KPI Snapshot Job
+Recomputes the admin dashboard totals, distributions and growth into admin_kpi_snapshots
+
+Runs once by default (for cron). With --loop it keeps refreshing every
+kpi_snapshot_refresh_seconds, for deployments without a scheduler.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+import time
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.kpi_snapshots import SNAPSHOTS, refresh_snapshot
+
+# Setup logging
+logging.basicConfig(
+    filename='/var/log/connectme/kpi_snapshots.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def refresh_all() -> bool:
+    """Refresh every snapshot; returns False if any failed"""
+    ok = True
+    db = SessionLocal()
+    try:
+        for name in SNAPSHOTS:
+            started = time.monotonic()
+            try:
+                refresh_snapshot(db, name)
+                db.commit()
+                logging.info(f"Refreshed {name} in {time.monotonic() - started:.2f}s")
+            except Exception as e:
+                db.rollback()
+                ok = False
+                logging.error(f"Failed to refresh {name}: {e}")
+    finally:
+        db.close()
+    return ok
+
+def main():
+    """Refresh admin KPI snapshots"""
+    parser = argparse.ArgumentParser(description="Refresh admin KPI snapshots")
+    parser.add_argument("--loop", action="store_true", help="Keep refreshing every kpi_snapshot_refresh_seconds")
+    args = parser.parse_args()
+
+    try:
+        if not args.loop:
+            if not refresh_all():
+                sys.exit(1)
+            logging.info("KPI snapshot job completed successfully")
+            return
+
+        while True:
+            refresh_all()
+            time.sleep(settings.kpi_snapshot_refresh_seconds)
+
+    except Exception as e:
+        logging.error(f"KPI snapshot job failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
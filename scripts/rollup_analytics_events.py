@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Analytics Event Rollup Cron Job
+Compacts raw analytics events into hourly and daily rollups, then applies retention
+
+Each run rebuilds the last --lookback-hours complete hours so late events are
+picked up, or everything from --since when backfilling. A --since older than
+events_raw_retention_days only rebuilds from that horizon on, since the raw
+events before it may already be gone. Raw events past
+events_raw_retention_days and hourly rollups past events_hourly_retention_days
+are deleted in small committed chunks; --archive keeps deleted raw events in a
+gzipped JSON-lines file.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.event_rollups import (
+    floor_hour, purge_hourly_rollups, purge_raw_events, rollup_events, rollup_horizons
+)
+
+# Setup logging
+logging.basicConfig(
+    filename='/var/log/connectme/event_rollups.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    """Roll up recent analytics events and purge expired data"""
+    parser = argparse.ArgumentParser(description="Roll up analytics events")
+    parser.add_argument("--lookback-hours", type=int, default=48, help="Complete hours to rebuild")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Rebuild from this UTC time instead (backfill)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows deleted per transaction")
+    parser.add_argument("--archive", help="Append purged raw events to this .jsonl.gz file")
+    parser.add_argument("--skip-retention", action="store_true", help="Only roll up, do not delete anything")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        end = floor_hour(datetime.utcnow())
+        start = args.since or end - timedelta(hours=args.lookback_hours)
+        raw_since, _ = rollup_horizons()
+        if start < raw_since:
+            logging.warning(
+                f"Raw events before {raw_since.isoformat()} may have been purged; "
+                f"keeping the existing rollups before it and rebuilding from there"
+            )
+            start = raw_since
+
+        # One day per transaction keeps backfills from holding a long write lock
+        window_start = start
+        while window_start < end:
+            window_end = min(window_start + timedelta(days=1), end)
+            counts = rollup_events(db, window_start, window_end)
+            db.commit()
+            logging.info(
+                f"Rolled up {window_start.isoformat()} - {window_end.isoformat()}: "
+                f"{counts['hourly_rows']} hourly rows, {counts['daily_rows']} daily rows"
+            )
+            window_start = window_end
+
+        if not args.skip_retention:
+            now = datetime.utcnow()
+            raw_deleted = purge_raw_events(
+                db, now - timedelta(days=settings.events_raw_retention_days),
+                chunk_size=args.chunk_size, archive_path=args.archive
+            )
+            hourly_deleted = purge_hourly_rollups(
+                db, now - timedelta(days=settings.events_hourly_retention_days), chunk_size=args.chunk_size
+            )
+            logging.info(f"Purged {raw_deleted} raw events and {hourly_deleted} hourly rollup rows")
+
+        logging.info("Analytics event rollup job completed successfully")
+
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Analytics event rollup job failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Company Data Update Job
+Refreshes job listings from the career feeds registered in job_feeds
+
+Feeds are fetched concurrently with conditional requests, so feeds that have
+not changed since the last run cost a 304 and no database writes. Changed
+feeds are diffed against job_opportunities and applied in bulk. Jobs whose
+expiry has passed are deactivated first, so search facets stop counting them.
+
+Register a feed with: python scripts/update_company_data.py --add URL [--format csv]
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+
+from app.core.database import SessionLocal, Base, engine, add_missing_columns
+from app.models.connection import JobFeed
+from app.services.job_feeds import run_ingest
+
+# Setup logging
+logging.basicConfig(
+    filename='/var/log/connectme/update_company_data.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def add_feed(url: str, fmt: str) -> None:
+    db = SessionLocal()
+    try:
+        feed = db.query(JobFeed).filter(JobFeed.url == url).first()
+        if feed:
+            feed.format = fmt
+            feed.is_active = True
+        else:
+            db.add(JobFeed(url=url, format=fmt, is_active=True))
+        db.commit()
+        logging.info(f"Registered job feed {url} ({fmt})")
+    finally:
+        db.close()
+
+def main():
+    """Fetch every active job feed and apply the ones that changed"""
+    parser = argparse.ArgumentParser(description="Refresh job listings from career feeds")
+    parser.add_argument("--add", metavar="URL", help="Register a feed URL and exit")
+    parser.add_argument("--format", choices=["json", "csv"], default="json", help="Format of the feed given with --add")
+    parser.add_argument("--feed-id", type=int, action="append", help="Only fetch these feeds (repeatable)")
+    parser.add_argument("--concurrency", type=int, help="Feeds fetched at once")
+    parser.add_argument("--host-rate", type=float, help="Requests per second per host")
+    args = parser.parse_args()
+
+    try:
+        Base.metadata.create_all(bind=engine)
+        add_missing_columns(engine)
+        if args.add:
+            add_feed(args.add, args.format)
+            return
+
+        summary = run_ingest(args.feed_id, concurrency=args.concurrency, host_rate=args.host_rate)
+        logging.info(
+            f"Fetched {summary['feeds']} feeds in {summary['elapsed']:.1f}s: {summary['applied']} applied, "
+            f"{summary['not_modified']} not modified, {summary['unchanged']} unchanged, {summary['error']} failed; "
+            f"jobs {summary['inserted']} new, {summary['updated']} updated, {summary['deactivated']} deactivated, "
+            f"{summary['expired']} expired"
+        )
+        if summary["error"]:
+            logging.error(f"{summary['error']} feeds failed; see job_feeds.last_error")
+            sys.exit(1)
+
+        logging.info("Company data update job completed successfully")
+
+    except Exception as e:
+        logging.error(f"Company data update job failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()